@@ -21,6 +21,8 @@ import surf.devices.ti as ti
 import AmcCarrierCore.AppHardware     as appHw
 import rogue
 
+from AmcCarrierCore.AppTop._AppTop import pipelinedLoad
+
 class AmcCryoCore(pr.Device):
     def __init__(   self,
             name        = "AmcCryoCore",
@@ -75,8 +77,12 @@ class AmcCryoCore(pr.Device):
                     if block.bulkEn:
                         block.backgroundTransaction(rogue.interfaces.memory.Write)
 
+        # Only this subtree is retired during a TopLevel pipelined load,
+        # the whole tree otherwise
+        retire = self if pipelinedLoad() else self._root
+
         # Retire any in-flight transactions before starting
-        self._root.checkBlocks(recurse=True)
+        retire.checkBlocks(recurse=True)
 
         # Note: Requires that AmcCryoCore: enable: 'True' in defaults.yml file
         self.enable.set(True)
@@ -97,7 +103,7 @@ class AmcCryoCore(pr.Device):
         self.ADC[0].writeBlocks(force=force, recurse=recurse, variable=variable)
         self.ADC[1].writeBlocks(force=force, recurse=recurse, variable=variable)
 
-        self._root.checkBlocks(recurse=True)
+        retire.checkBlocks(recurse=True)
         self.ADC[0].DigRst()
         self.ADC[1].DigRst()
 
@@ -19,6 +19,8 @@
 import pyrogue         as pr
 import surf.devices.ti as ti
 
+from AmcCarrierCore.AppTop._AppTop import pipelinedLoad
+
 class AmcCryoDemoCore(pr.Device):
     def __init__(   self,
             name        = "AmcCryoDemoCore",
@@ -45,8 +47,12 @@ class AmcCryoDemoCore(pr.Device):
     def writeBlocks(self, **kwargs):
         super().writeBlocks(**kwargs)
 
+        # Only this subtree is retired during a TopLevel pipelined load,
+        # the whole tree otherwise
+        retire = self if pipelinedLoad() else self._root
+
         # Retire any in-flight transactions before starting
-        self._root.checkBlocks(recurse=True)
+        retire.checkBlocks(recurse=True)
 
         self.enable.set(True)
         self.ADC[0].enable.set(True)
@@ -22,6 +22,8 @@ import surf.devices.ti            as ti
 import AmcCarrierCore.AppHardware as appHw
 import rogue
 
+from AmcCarrierCore.AppTop._AppTop import pipelinedLoad
+
 class AmcGenericAdcDacCore(pr.Device):
     def __init__(   self,
             name        = "AmcGenericAdcDacCore",
@@ -63,17 +65,21 @@ class AmcGenericAdcDacCore(pr.Device):
                     if block.bulkEn:
                         block.backgroundTransaction(rogue.interfaces.memory.Write)
 
+        # Only this subtree is retired during a TopLevel pipelined load,
+        # the whole tree otherwise
+        retire = self if pipelinedLoad() else self._root
+
         # Retire any in-flight transactions before starting
-        self._root.checkBlocks(recurse=True)
+        retire.checkBlocks(recurse=True)
 
         self.DBG.writeBlocks(force=force, recurse=recurse, variable=variable)
-        self._root.checkBlocks(recurse=True)
+        retire.checkBlocks(recurse=True)
 
         self.LMK.RESET.set(0x1)
         self.LMK.RESET.set(0x0)
 
         self.LMK.writeBlocks(force=force, recurse=recurse, variable=variable)
-        self._root.checkBlocks(recurse=True)
+        retire.checkBlocks(recurse=True)
         time.sleep(0.100)
         self.LMK.Init()
         time.sleep(0.100)
@@ -81,12 +87,12 @@ class AmcGenericAdcDacCore(pr.Device):
         for x in range(2):
             self.DAC.DacReg[2].set(0x2080) # Setup the SPI configuration
             self.DAC.writeBlocks(force=force, recurse=recurse, variable=variable)
-            self._root.checkBlocks(recurse=True)
+            retire.checkBlocks(recurse=True)
         self.DAC.Init()
 
         for i in range(2):
             self.ADC[i].writeBlocks(force=force, recurse=recurse, variable=variable)
-            self._root.checkBlocks(recurse=True)
+            retire.checkBlocks(recurse=True)
             self.ADC[i].CalibrateAdc()
 
         self.readBlocks(recurse=True)
@@ -21,6 +21,8 @@ import surf.devices.ti as ti
 import AmcCarrierCore.AppHardware     as appHw
 import rogue
 
+from AmcCarrierCore.AppTop._AppTop import pipelinedLoad
+
 class AmcMicrowaveMuxCore(pr.Device):
     def __init__(   self,
             name        = "AmcMicrowaveMuxCore",
@@ -92,8 +94,12 @@ class AmcMicrowaveMuxCore(pr.Device):
                     if block.bulkEn:
                         block.backgroundTransaction(rogue.interfaces.memory.Write)
 
+        # Only this subtree is retired during a TopLevel pipelined load,
+        # the whole tree otherwise
+        retire = self if pipelinedLoad() else self._root
+
         # Retire any in-flight transactions before starting
-        self._root.checkBlocks(recurse=True)
+        retire.checkBlocks(recurse=True)
 
         # Enables
         self.DBG.enable.set(True)
@@ -107,7 +113,7 @@ class AmcMicrowaveMuxCore(pr.Device):
 
         self.DBG.writeBlocks(force=force, recurse=recurse, variable=variable)
         self.ATT.writeBlocks(force=force, recurse=recurse, variable=variable)
-        self._root.checkBlocks(recurse=True)
+        retire.checkBlocks(recurse=True)
 
         for i in range(2):
             self.ADC[i].HW_RST.set(0x1)
@@ -118,7 +124,7 @@ class AmcMicrowaveMuxCore(pr.Device):
 
         for x in range(2):
             self.LMK.writeBlocks(force=force, recurse=recurse, variable=variable)
-            self._root.checkBlocks(recurse=True)
+            retire.checkBlocks(recurse=True)
 
         time.sleep(5.000)
         self.LMK.Init()
@@ -131,18 +137,18 @@ class AmcMicrowaveMuxCore(pr.Device):
 
         for i in range(4):
             self.PLL[i].writeBlocks(force=force, recurse=recurse, variable=variable)
-            self._root.checkBlocks(recurse=True)
+            retire.checkBlocks(recurse=True)
             self.PLL[i].RegInitSeq()
 
         for i in range(2):
             for x in range(2):
                 self.DAC[i].writeBlocks(force=force, recurse=recurse, variable=variable)
-                self._root.checkBlocks(recurse=True)
+                retire.checkBlocks(recurse=True)
 
         for i in range(2):
             self.ADC[i].Powerup_AnalogConfig()
             self.ADC[i].writeBlocks(force=force, recurse=recurse, variable=variable)
-            self._root.checkBlocks(recurse=True)
+            retire.checkBlocks(recurse=True)
 
         self.DBG.enable.set(False)
         # self.ATT.enable.set(False)
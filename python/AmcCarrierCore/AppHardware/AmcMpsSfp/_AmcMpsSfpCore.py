@@ -9,12 +9,13 @@
 #-----------------------------------------------------------------------------
 
 import pyrogue as pr
+import AmcCarrierCore as amcc
 import AmcCarrierCore.AppHardware.common as common
 import AmcCarrierCore.AppHardware.AmcMpsSfp as amcMpsSfp
 import surf.devices.transceivers as xceiver
 
 class AmcMpsSfpCore(pr.Device):
-    def __init__(self,EN_PLL_G=True,EN_HS_REPEATER_G=True,**kwargs):
+    def __init__(self,EN_PLL_G=True,EN_HS_REPEATER_G=True,lazyDevices=False,**kwargs):
         super().__init__(**kwargs)
 
         if EN_PLL_G:
@@ -35,7 +36,9 @@ class AmcMpsSfpCore(pr.Device):
 
         if EN_HS_REPEATER_G:
             for i in range(3):
-                self.add(amcMpsSfp.Ds125br401(
+                self.add(amcc.lazyDevice(
+                    deviceClass = amcMpsSfp.Ds125br401,
+                    lazy       = lazyDevices,
                     name       = f'HsRepeater[{i}]',
                     offset     = 0x0004_0000+i*0x0000_1000,
                 ))
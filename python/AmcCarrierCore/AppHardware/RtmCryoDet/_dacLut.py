@@ -17,8 +17,13 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
+import time
+import threading
+import numpy   as np
 import pyrogue as pr
 
+from AmcCarrierCore._BurstAccess import burstWrite
+
 class LutMem(pr.Device):
     def __init__(   self,
             name        = "LutMem",
@@ -28,43 +33,22 @@ class LutMem(pr.Device):
 
         super().__init__(name=name,description=description,**kwargs)
 
-        self.addRemoteVariables(
-            name        = 'MEM',
+        # One array variable covering the whole LUT: a single block
+        # transaction for the 2**ADDR_WIDTH_G 20-bit entries (32-bit stride)
+        self.add(pr.RemoteVariable(
+            name        = 'MemArray',
+            description = "LUT mem array",
             offset      = 0x0,
-            number      =  2**ADDR_WIDTH_G,
-            bitSize     =  20,
-            bitOffset   =  0,
-            stride      =  4,
+            numValues   = 2**ADDR_WIDTH_G,
+            valueBits   = 20,
+            valueStride = 32,
+            bitSize     = 32*(2**ADDR_WIDTH_G),
+            bitOffset   = 0,
             mode        = "RW",
-            base         = pr.Int,
+            base        = pr.Int,
             hidden      = True,
-        )
-
-        self.add(pr.LinkVariable(
-            name         = 'MemArray',
-            hidden       = True,
-            description  = "LUT mem array",
-            dependencies = [self.node(f'MEM[{i}]') for i in range(2**ADDR_WIDTH_G)],
-            linkedGet    = lambda dev, var, read: dev.getArray(dev, var, read),
-            linkedSet    = lambda dev, var, value: dev.setArray(dev, var, value),
-            typeStr      = "List[Int20]",
         ))
 
-    @staticmethod
-    def setArray(dev, var, value):
-        for variable, setpoint in zip(var.dependencies, value):
-            variable.set(setpoint, write=False)
-        dev.writeBlocks()
-        dev.verifyBlocks()
-        dev.checkBlocks()
-
-    @staticmethod
-    def getArray(dev, var, read):
-        if read:
-            dev.readBlocks(variable=var.dependencies)
-            dev.checkBlocks(variable=var.dependencies)
-        return [variable.value() for variable in var.dependencies]
-
 
 class LutCtrl(pr.Device):
     def __init__(   self,
@@ -259,6 +243,12 @@ class DacLut(pr.Device):
 
         super().__init__(name=name,description=description,**kwargs)
 
+        self._numCh    = NUM_CH_G
+        self._lutSize  = 2**ADDR_WIDTH_G
+        self._shadow   = [None] * NUM_CH_G
+        self._swapLock = threading.Lock()
+        self._lastSwap = {}
+
         self.add(LutCtrl(
             name         = 'Ctrl',
             offset       = 0x00000,
@@ -275,3 +265,125 @@ class DacLut(pr.Device):
                 ADDR_WIDTH_G = ADDR_WIDTH_G,
                 expand       = False,
             ))
+
+        self.add(pr.LocalVariable(
+            name         = 'SwapTimeout',
+            description  = 'Maximum time (seconds) swapLuts() waits for the pattern to complete',
+            mode         = 'RW',
+            value        = 1.0,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = 'LastSwap',
+            description  = 'Report of the last swapLuts(): trigger counter deltas, boundary and write time',
+            mode         = 'RO',
+            value        = {},
+            localGet     = lambda: self._lastSwap,
+        ))
+
+        @self.command(description="Clear the LUT cache, the next swap rewrites the full LUTs",)
+        def ClearLutCache():
+            self._shadow = [None] * self._numCh
+
+    def setLuts(self, values):
+        """
+        Write the LUT of each channel from a list of arrays (None skips the
+        channel). The channel writes are all issued before waiting.
+        """
+        luts = []
+        for i, value in enumerate(values):
+            if value is not None:
+                self.Lut[i].MemArray.set(np.asarray(value), write=False)
+                self._shadow[i] = None
+                luts.append(self.Lut[i])
+
+        for lut in luts:
+            lut.writeBlocks(variable=lut.MemArray)
+        for lut in luts:
+            lut.verifyBlocks(variable=lut.MemArray)
+        for lut in luts:
+            lut.checkBlocks(variable=lut.MemArray)
+
+    def _readCtrl(self, variables):
+        ctrl = self.Ctrl
+        ctrl.readBlocks(recurse=False, variable=variables)
+        ctrl.checkBlocks(recurse=False, variable=variables)
+        return [var.value() for var in variables]
+
+    def _writeLut(self, ch, data):
+        lut = self.Lut[ch]
+        old = self._shadow[ch]
+
+        # Changed entries only, closing gaps smaller than 8 entries. The entries
+        # never written through the shadow are unknown (NaN) and always differ.
+        idx = np.arange(data.size) if (old is None) else np.flatnonzero(old[:data.size] != data)
+        if idx.size > 0:
+            raw    = (data.astype(np.int64) & 0xFFFFF).astype('<u4')
+            split  = np.flatnonzero(np.diff(idx) > 8) + 1
+            starts = idx[np.concatenate([[0], split])]
+            stops  = idx[np.concatenate([split-1, [idx.size-1]])] + 1
+            burstWrite(lut,
+                [(int(4*start), int(4*(stop-start))) for start, stop in zip(starts, stops)],
+                np.concatenate([raw[start:stop] for start, stop in zip(starts, stops)]))
+
+        # Keep the shadows in sync with the RAM, the entries past data.size keep
+        # the previous pattern
+        full = np.full(self._lutSize, np.nan) if (old is None) else old.copy()
+        full[:data.size] = data
+        lut.MemArray.set(np.nan_to_num(full, nan=0).astype(np.int64), write=False)
+        self._shadow[ch] = full
+
+        return idx.size
+
+    def swapLuts(self, values, maxAddr=None):
+        """
+        Switch the playback to new LUT patterns, values being a list of
+        arrays (None keeps the channel pattern). The firmware always plays
+        the LUT from address 0 to MaxAddr, there is no second bank: in
+        triggered mode the swap waits for the end of the current pattern
+        (Busy = 0) and only rewrites the changed entries and MaxAddr, to
+        keep the window where a trigger sees a mixed pattern short.
+        Returns a report with the TrigCnt/DropTrigCnt deltas over the swap.
+        """
+        ctrl = self.Ctrl
+
+        with self._swapLock:
+            trigCnt, dropCnt, continuous, curMaxAddr = self._readCtrl([ctrl.TrigCnt, ctrl.DropTrigCnt, ctrl.Continuous, ctrl.MaxAddr])
+
+            data = {ch: np.asarray(v).astype(np.int64).ravel()[:self._lutSize] for ch, v in enumerate(values) if v is not None}
+            if maxAddr is None:
+                maxAddr = max([d.size for d in data.values()], default=curMaxAddr+1) - 1
+
+            # Wait for the trigger boundary (not available in continuous mode)
+            start    = time.monotonic()
+            boundary = False
+            trigWr   = trigCnt
+            if not continuous:
+                while True:
+                    busy, trigWr = self._readCtrl([ctrl.Busy, ctrl.TrigCnt])
+                    if not busy:
+                        boundary = True
+                        break
+                    if (time.monotonic() - start) > self.SwapTimeout.value():
+                        break
+                    time.sleep(0.001)
+
+            # Write the new patterns and the loop length
+            t0      = time.monotonic()
+            entries = {ch: self._writeLut(ch, d) for ch, d in data.items()}
+            if curMaxAddr != maxAddr:
+                ctrl.MaxAddr.set(maxAddr)
+            t1 = time.monotonic()
+
+            trigEnd, dropEnd, busy = self._readCtrl([ctrl.TrigCnt, ctrl.DropTrigCnt, ctrl.Busy])
+
+            self._lastSwap = {
+                'TrigCnt'     : (trigEnd - trigCnt) & 0xFFFF,
+                'DropTrigCnt' : (dropEnd - dropCnt) & 0xFFFF,
+                'Boundary'    : boundary,
+                'Overlap'     : bool(continuous or busy or (trigEnd != trigWr)), # a pattern may have played during the write
+                'Entries'     : entries,
+                'WaitTime'    : t0 - start,
+                'WriteTime'   : t1 - t0,
+            }
+            return self._lastSwap
@@ -16,9 +16,13 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
+import time
+import threading
 import pyrogue as pr
 import numpy as np
 
+from AmcCarrierCore._BurstAccess import burstWrite
+
 class SpiMax(pr.Device):
     def __init__(self,
             name        = "RtmSpiMax",
@@ -27,6 +31,10 @@ class SpiMax(pr.Device):
 
         super().__init__(name=name, description=description, **kwargs)
 
+        # Last TES bias DAC values written, None until known
+        self._biasShadow = None
+        self._biasLock   = threading.RLock()
+
         ##############################
         # Variables
         ##############################
@@ -121,9 +129,99 @@ class SpiMax(pr.Device):
             mode         = "RW",
         ))
 
+        self.add(pr.LocalVariable(
+            name         = "TesBiasRampRate",
+            description  = "TES bias ramp rate used by rampTesBias()",
+            mode         = "RW",
+            value        = 100000.0,
+            units        = "counts/s",
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "TesBiasRampStep",
+            description  = "Largest TES bias step of rampTesBias()",
+            mode         = "RW",
+            value        = 1000,
+            units        = "counts",
+        ))
+
         @self.command(description="Set all DACs to 0")
         def initializeAllDac():
             enable = np.array([2 for _ in range(32)], dtype=np.uint32)
             val    = np.array([0 for _ in range(32)], dtype=np.int32)
-            self.TesBiasDacCtrlRegCh.set(enable, write=True)
-            self.TesBiasDacDataRegCh.set(val, write=True)
+            with self._biasLock:
+                self.TesBiasDacCtrlRegCh.set(enable, write=True)
+                self.TesBiasDacDataRegCh.set(val, write=True)
+                self._biasShadow = val.astype(np.int64)
+
+        @self.command(description="Read back the TES bias DACs, the next setTesBias() diffs against the read values")
+        def ReadTesBias():
+            with self._biasLock:
+                self._biasShadow = np.array(self.TesBiasDacDataRegCh.get(read=True), dtype=np.int64)
+
+    def _biasTarget(self, values, mask):
+        if self._biasShadow is None:
+            self._biasShadow = np.array(self.TesBiasDacDataRegCh.get(read=True), dtype=np.int64)
+
+        values = np.broadcast_to(np.asarray(values, dtype=np.int64), (32,))
+        if mask is None:
+            return values.copy()
+        if np.isscalar(mask) or np.ndim(mask) == 0:
+            mask = ((int(mask) >> np.arange(32)) & 0x1).astype(bool)
+        return np.where(np.asarray(mask, dtype=bool), values, self._biasShadow)
+
+    def getTesBias(self):
+        """
+        Returns the TES bias DAC values last written
+        """
+        with self._biasLock:
+            return None if self._biasShadow is None else self._biasShadow.copy()
+
+    def setTesBias(self, values, mask=None):
+        """
+        Set the 32 TES bias DACs from an array (or a scalar for all of them).
+        mask (bool array or channel bit mask) selects the channels to set.
+        Only the channels differing from the shadow copy are written, with
+        all their transactions issued in a single round trip.
+        Returns the number of channels written.
+        """
+        with self._biasLock:
+            target  = self._biasTarget(values, mask)
+            changed = np.flatnonzero(target != self._biasShadow)
+
+            if changed.size > 0:
+                raw = (target[changed] & 0xFFFFF).astype('<u4')
+                burstWrite(self, [(int(32*ch + 4), 4) for ch in changed], raw)
+
+                self._biasShadow = target
+                self.TesBiasDacDataRegCh.set(target, write=False)
+
+            return changed.size
+
+    def rampTesBias(self, values, mask=None, rate=None, step=None):
+        """
+        Ramp the TES bias DACs to values, all the channels stepping together
+        by at most TesBiasRampStep counts at TesBiasRampRate counts/s.
+        Returns the number of steps.
+        """
+        rate = self.TesBiasRampRate.value() if rate is None else rate
+        step = self.TesBiasRampStep.value() if step is None else step
+
+        with self._biasLock:
+            target = self._biasTarget(values, mask)
+            start  = self._biasShadow.copy()
+            delta  = target - start
+            nsteps = max(1, int(np.ceil(np.abs(delta).max() / step)))
+
+            # (nsteps, 32) schedule, the last row is the exact target
+            frac     = np.arange(1, nsteps+1)[:,None] / nsteps
+            schedule = start + np.rint(delta * frac).astype(np.int64)
+            period   = step / rate if rate > 0 else 0.0
+
+            t0 = time.monotonic()
+            for i, row in enumerate(schedule):
+                self.setTesBias(row)
+                if i < nsteps-1 and period > 0:
+                    time.sleep(max(0.0, t0 + (i+1)*period - time.monotonic()))
+
+            return nsteps
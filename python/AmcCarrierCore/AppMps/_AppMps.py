@@ -19,11 +19,14 @@
 import pyrogue as pr
 from AmcCarrierCore.AppMps._AppMpsSalt import AppMpsSalt
 from AmcCarrierCore.AppMps._AppMpsThr  import AppMpsThr
+from AmcCarrierCore.AppMps._AppMpsLinkMonitor import AppMpsLinkMonitor
 
 class AppMps(pr.Device):
     def __init__(   self,
-            name        = "AppMps",
-            description = "MPS Application",
+            name           = "AppMps",
+            description    = "MPS Application",
+            statusSnapshot = False,
+            linkMonitor    = False,
             **kwargs):
         super().__init__(name=name, description=description, **kwargs)
 
@@ -32,9 +35,16 @@ class AppMps(pr.Device):
         ##############################
 
         self.add(AppMpsSalt(
-            offset       =  0x00000000,
+            offset         =  0x00000000,
+            statusSnapshot = statusSnapshot,
         ))
 
         self.add(AppMpsThr(
             offset       =  0x00010000,
         ))
+
+        if (linkMonitor):
+            self.add(AppMpsLinkMonitor(
+                salt     = self.AppMpsSalt,
+                snapshot = statusSnapshot,
+            ))
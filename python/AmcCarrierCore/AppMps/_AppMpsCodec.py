@@ -0,0 +1,269 @@
+#-----------------------------------------------------------------------------
+# Title      : PyRogue AmcCarrier MPS Message Codec
+#-----------------------------------------------------------------------------
+# File       : AppMpsCodec.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# Vectorized encoder/decoder of the AppMpsPkg.vhd MPS messages, working on
+# numpy structured arrays (one element per message).
+#
+# Two representations are supported:
+#    - the packed record vectors of AppMpsPkg toSlv()/toMpsMessage()/
+#      toMpsMitigationMsg(), as little-endian bytes (bit i of the vector is
+#      bit i%8 of byte i//8)
+#    - the 16-bit AXI stream frames of MpsMsgCore.vhd (update message) and
+#      MpsMitMsgRx.vhd (mitigation message)
+#
+# The update message record holds MPS_CHAN_COUNT_C (24) message bytes, the
+# packed vector is MPS_MESSAGE_BITS_C (303) bits with the unused upper bits
+# zero.
+#-----------------------------------------------------------------------------
+# This file is part of the rogue software platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue software platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import numpy as np
+
+MpsChanCount      = 24  # MPS_CHAN_COUNT_C
+MpsMessageBits    = 303 # MPS_MESSAGE_BITS_C
+MpsMitigationBits = 98  # MPS_MITIGATION_BITS_C
+MpsDestCount      = 16
+
+MpsMessageBytes    = (MpsMessageBits + 7) // 8
+MpsMitigationBytes = (MpsMitigationBits + 7) // 8
+
+# Mitigation frame: header, tag, timeStamp and 4 words of 4 power classes
+MpsMitigationWords = 7
+
+MpsMessageType = np.dtype([
+    ('valid',     'u1'),
+    ('version',   'u1'),             # 5 bits
+    ('lcls',      'u1'),             # 0 = LCLS-II, 1 = LCLS-I
+    ('inputType', 'u1'),             # 0 = Digital, 1 = Analog
+    ('timeStamp', '<u2'),
+    ('appId',     '<u2'),
+    ('message',   'u1', (MpsChanCount,)),
+    ('msgSize',   'u1'),             # In units of bytes
+])
+
+MpsMitigationMsgType = np.dtype([
+    ('strobe',    'u1'),
+    ('latchDiag', 'u1'),
+    ('tag',       '<u2'),
+    ('timeStamp', '<u2'),
+    ('class',     'u1', (MpsDestCount,)), # 4 bits per destination
+])
+
+def _u64(x):
+    return np.asarray(x).astype(np.uint64)
+
+###############################################################################
+# Packed record vectors
+###############################################################################
+
+def packMpsMessages(msgs):
+    """
+    Encode a MpsMessageType array into (N, MpsMessageBytes) packed vectors
+    """
+    # All the fields are byte aligned in the vector
+    vec = np.zeros((msgs.size, MpsMessageBytes), dtype=np.uint8)
+    vec[:,0] = (msgs['valid'] & 0x1) | ((msgs['version'] & 0x1F) << 1) | ((msgs['lcls'] & 0x1) << 6) | ((msgs['inputType'] & 0x1) << 7)
+    vec[:,1] = msgs['msgSize']
+    vec[:,2:4] = msgs['appId'].astype('<u2').view(np.uint8).reshape(-1, 2)
+    vec[:,4:6] = msgs['timeStamp'].astype('<u2').view(np.uint8).reshape(-1, 2)
+    vec[:,6:6+MpsChanCount] = msgs['message']
+    return vec
+
+def unpackMpsMessages(vec):
+    """
+    Decode (N, MpsMessageBytes) packed vectors into a MpsMessageType array
+    """
+    vec  = np.asarray(vec, dtype=np.uint8).reshape(-1, MpsMessageBytes)
+    msgs = np.zeros(vec.shape[0], dtype=MpsMessageType)
+    msgs['valid']     = vec[:,0] & 0x1
+    msgs['version']   = (vec[:,0] >> 1) & 0x1F
+    msgs['lcls']      = (vec[:,0] >> 6) & 0x1
+    msgs['inputType'] = (vec[:,0] >> 7) & 0x1
+    msgs['msgSize']   = vec[:,1]
+    msgs['appId']     = np.ascontiguousarray(vec[:,2:4]).view('<u2')[:,0]
+    msgs['timeStamp'] = np.ascontiguousarray(vec[:,4:6]).view('<u2')[:,0]
+    msgs['message']   = vec[:,6:6+MpsChanCount]
+    return msgs
+
+def _classWord(cls):
+    # 16 x 4-bit power classes into one 64-bit word, destination 0 in the LSBs
+    shift = np.arange(MpsDestCount, dtype=np.uint64) * np.uint64(4)
+    return np.bitwise_or.reduce((_u64(cls) & np.uint64(0xF)) << shift, axis=-1)
+
+def _classArray(word):
+    shift = np.arange(MpsDestCount, dtype=np.uint64) * np.uint64(4)
+    return ((_u64(word)[:,None] >> shift) & np.uint64(0xF)).astype(np.uint8)
+
+def packMpsMitigationMsgs(msgs):
+    """
+    Encode a MpsMitigationMsgType array into (N, MpsMitigationBytes) packed vectors
+    """
+    cls = _classWord(msgs['class'])
+    lo  = (_u64(msgs['strobe'] & 0x1) | (_u64(msgs['latchDiag'] & 0x1) << np.uint64(1)) |
+           (_u64(msgs['tag']) << np.uint64(2)) | (_u64(msgs['timeStamp']) << np.uint64(18)) |
+           (cls << np.uint64(34)))
+    hi  = cls >> np.uint64(30)
+    return np.ascontiguousarray(np.stack([lo, hi], axis=1).astype('<u8')).view(np.uint8)[:,:MpsMitigationBytes]
+
+def unpackMpsMitigationMsgs(vec):
+    """
+    Decode (N, MpsMitigationBytes) packed vectors into a MpsMitigationMsgType array
+    """
+    vec = np.asarray(vec, dtype=np.uint8).reshape(-1, MpsMitigationBytes)
+    buf = np.zeros((vec.shape[0], 16), dtype=np.uint8)
+    buf[:,:MpsMitigationBytes] = vec
+    lo, hi = buf.view('<u8').T
+
+    msgs = np.zeros(vec.shape[0], dtype=MpsMitigationMsgType)
+    msgs['strobe']    = lo & np.uint64(0x1)
+    msgs['latchDiag'] = (lo >> np.uint64(1)) & np.uint64(0x1)
+    msgs['tag']       = (lo >> np.uint64(2)) & np.uint64(0xFFFF)
+    msgs['timeStamp'] = (lo >> np.uint64(18)) & np.uint64(0xFFFF)
+    msgs['class']     = _classArray((lo >> np.uint64(34)) | (hi << np.uint64(30)))
+    return msgs
+
+###############################################################################
+# AXI stream frames (16-bit words)
+###############################################################################
+
+def encodeMpsStream(msgs):
+    """
+    Encode a MpsMessageType array into the MpsMsgCore frames.
+    Returns (words, offsets): the uint16 words of the frames back to back
+    and the frame boundaries. The messages with valid=0 or msgSize=0 are
+    skipped, as the firmware does not send them.
+    """
+    m    = msgs[(msgs['valid'] != 0) & (msgs['msgSize'] > 0)]
+    size = m['msgSize'].astype(np.int64)
+
+    offsets = np.zeros(m.size+1, dtype=np.int64)
+    np.cumsum(3 + (size+1)//2, out=offsets[1:])
+    words = np.zeros(offsets[-1], dtype=np.uint16)
+
+    start = offsets[:-1]
+    words[start+0] = ((m['lcls'].astype(np.uint16) & 0x1) << 14) | ((m['inputType'].astype(np.uint16) & 0x1) << 13) | \
+                     ((m['version'].astype(np.uint16) & 0x1F) << 8) | ((m['msgSize'].astype(np.uint16) + 5) & 0xFF)
+    words[start+1] = m['appId']
+    words[start+2] = m['timeStamp']
+
+    # Payload: two bytes per word, lower byte first, bytes beyond msgSize are zero
+    payload = np.where(np.arange(MpsChanCount) < size[:,None], m['message'], 0).astype(np.uint16)
+    pairs   = payload[:,0::2] | (payload[:,1::2] << 8)
+
+    if m.size and np.all(size == size[0]):
+        # Single application stream: constant frame size
+        nw = (int(size[0])+1)//2
+        words.reshape(m.size, 3+nw)[:,3:] = pairs[:,:nw]
+    else:
+        used = np.arange(MpsChanCount//2) < ((size[:,None]+1)//2)
+        rows, cols = np.nonzero(used)
+        words[start[rows] + 3 + cols] = pairs[rows, cols]
+
+    return words, offsets
+
+def decodeMpsStream(words, offsets=None):
+    """
+    Decode MpsMsgCore frames into a MpsMessageType array.
+    Without offsets the frames are located from the length field of
+    their header. Frames with the mitigation flag set are rejected.
+    """
+    words = np.asarray(words, dtype=np.uint16)
+
+    if offsets is None:
+        offsets = _frameOffsets(words)
+    offsets = np.asarray(offsets, dtype=np.int64)
+
+    start = offsets[:-1]
+    hdr   = words[start]
+    if np.any(hdr & 0x8000):
+        raise ValueError('decodeMpsStream(): mitigation message found in the update message stream')
+
+    msgs = np.zeros(start.size, dtype=MpsMessageType)
+    msgs['valid']     = 1
+    msgs['lcls']      = (hdr >> 14) & 0x1
+    msgs['inputType'] = (hdr >> 13) & 0x1
+    msgs['version']   = (hdr >> 8) & 0x1F
+    msgs['msgSize']   = ((hdr & 0xFF) - 5) & 0xFF
+    msgs['appId']     = words[start+1]
+    msgs['timeStamp'] = words[start+2]
+
+    # Payload words, clipped to the frame length
+    nwords = np.minimum(offsets[1:] - start - 3, MpsChanCount//2)
+    pairs  = np.zeros((start.size, MpsChanCount//2), dtype=np.uint16)
+
+    step = int(offsets[1] - offsets[0]) if start.size else 0
+    if start.size and np.all(np.diff(offsets) == step) and (offsets[-1] == words.size):
+        # Single application stream: constant frame size
+        nw = int(nwords[0])
+        pairs[:,:nw] = words[offsets[0]:].reshape(start.size, step)[:,3:3+nw]
+    else:
+        used = np.arange(MpsChanCount//2) < nwords[:,None]
+        rows, cols = np.nonzero(used)
+        pairs[rows, cols] = words[start[rows] + 3 + cols]
+
+    payload = np.empty((start.size, MpsChanCount), dtype=np.uint8)
+    payload[:,0::2] = pairs & 0xFF
+    payload[:,1::2] = pairs >> 8
+    msgs['message'] = np.where(np.arange(MpsChanCount) < msgs['msgSize'][:,None], payload, 0)
+
+    return msgs
+
+def _frameOffsets(words):
+    hdr  = words[0] if words.size else 0
+    size = ((int(hdr) & 0xFF) - 5) & 0xFF
+    step = 3 + (size+1)//2
+
+    # Single application stream: constant frame size
+    if (words.size % step) == 0 and np.all((words[::step] & 0xFF) == (hdr & 0xFF)):
+        return np.arange(0, words.size+1, step)
+
+    # Otherwise walk the length fields
+    offsets = [0]
+    while offsets[-1] < words.size:
+        size = ((int(words[offsets[-1]]) & 0xFF) - 5) & 0xFF
+        offsets.append(offsets[-1] + 3 + (size+1)//2)
+    if offsets[-1] != words.size:
+        raise ValueError('decodeMpsStream(): truncated frame at the end of the stream')
+    return np.array(offsets)
+
+def encodeMpsMitigationStream(msgs):
+    """
+    Encode a MpsMitigationMsgType array into (N, MpsMitigationWords) frames
+    """
+    frames = np.zeros((msgs.size, MpsMitigationWords), dtype=np.uint16)
+    frames[:,0] = 0x8000 | ((msgs['latchDiag'].astype(np.uint16) & 0x1) << 14) | 0x0E
+    frames[:,1] = msgs['tag']
+    frames[:,2] = msgs['timeStamp']
+
+    cls = msgs['class'].astype(np.uint16).reshape(-1, 4, 4) & 0xF
+    frames[:,3:] = cls[:,:,0] | (cls[:,:,1] << 4) | (cls[:,:,2] << 8) | (cls[:,:,3] << 12)
+    return frames
+
+def decodeMpsMitigationStream(frames):
+    """
+    Decode (N, MpsMitigationWords) frames (or the flat word stream) into a
+    MpsMitigationMsgType array. strobe is cleared for the frames failing the
+    MpsMitMsgRx header check.
+    """
+    frames = np.asarray(frames, dtype=np.uint16).reshape(-1, MpsMitigationWords)
+
+    msgs = np.zeros(frames.shape[0], dtype=MpsMitigationMsgType)
+    msgs['strobe']    = ((frames[:,0] & 0x80FF) == 0x800E)
+    msgs['latchDiag'] = (frames[:,0] >> 14) & 0x1
+    msgs['tag']       = frames[:,1]
+    msgs['timeStamp'] = frames[:,2]
+
+    shift = np.arange(4, dtype=np.uint16) * 4
+    msgs['class'] = ((frames[:,3:,None] >> shift) & 0xF).reshape(-1, MpsDestCount)
+    return msgs
@@ -0,0 +1,295 @@
+#-----------------------------------------------------------------------------
+# Title      : PyRogue AmcCarrier MPS Link Monitor Module
+#-----------------------------------------------------------------------------
+# File       : AppMpsLinkMonitor.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# Rolling statistics and alarms of the AppMpsSalt links (TX and RX[13:0]).
+#
+# The monitor is fed by the AppMpsSalt poll through variable listeners and
+# never reads registers itself. Per link, the last 'window' packet periods
+# and error count deltas are kept in fixed size ring buffers with running
+# sums, from which the period jitter (standard deviation / mean) and the
+# error rate (errors per second) are updated in constant time.
+#-----------------------------------------------------------------------------
+# This file is part of the rogue software platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue software platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import time
+import threading
+import collections
+import numpy   as np
+import pyrogue as pr
+
+from AmcCarrierCore.AppMps._AppMpsSalt import AppMpsSaltNumLinks
+
+AppMpsLinkNames = ['Tx'] + [f'Rx[{i}]' for i in range(AppMpsSaltNumLinks-1)]
+
+class _RollingWindow(object):
+    # Per link ring buffer of the last 'depth' samples with running sums
+    def __init__(self, links, depth):
+        self._ring  = np.zeros((links, depth))
+        self._pos   = np.zeros(links, dtype=np.int64)
+        self.count  = np.zeros(links, dtype=np.int64)
+        self.sum    = np.zeros(links)
+        self.sumSq  = np.zeros(links)
+
+    def push(self, links, values):
+        depth = self._ring.shape[1]
+        pos   = self._pos[links]
+        old   = np.where(self.count[links] == depth, self._ring[links, pos], 0.0)
+
+        self._ring[links, pos] = values
+        self.sum[links]   += values - old
+        self.sumSq[links] += values*values - old*old
+
+        self._pos[links]  = (pos + 1) % depth
+        self.count[links] = np.minimum(self.count[links] + 1, depth)
+
+    def reset(self):
+        self._pos[:]  = 0
+        self.count[:] = 0
+        self.sum[:]   = 0.0
+        self.sumSq[:] = 0.0
+
+class AppMpsLinkMonitor(pr.Device):
+    def __init__(   self,
+            name            = "AppMpsLinkMonitor",
+            description     = "MPS link health monitor",
+            salt            = None,  # AppMpsSalt device
+            snapshot        = False, # Feed from AppMpsSalt.StatusSnapshot instead of the individual variables
+            window          = 64,
+            maxPeriodJitter = 0.05,
+            maxErrorRate    = 0.0,
+            linkMask        = 0x7FFF,
+            historySize     = 256,
+            **kwargs):
+        super().__init__(name=name, description=description, **kwargs)
+
+        self._lock     = threading.Lock()
+        self._window   = window
+        self._period   = _RollingWindow(AppMpsSaltNumLinks, window)
+        self._errDelta = _RollingWindow(AppMpsSaltNumLinks, window)
+        self._errTime  = _RollingWindow(AppMpsSaltNumLinks, window)
+        self._lastErr  = np.full(AppMpsSaltNumLinks, -1, dtype=np.int64)
+        self._lastTime = np.zeros(AppMpsSaltNumLinks)
+        self._linkUp   = np.ones(AppMpsSaltNumLinks, dtype=bool)
+        self._extreme  = np.zeros((2, AppMpsSaltNumLinks), dtype=np.int64)
+        self._alarms   = {}
+        self._history  = collections.deque(maxlen=historySize)
+        self._alarmCnt = 0
+
+        ##############################
+        # Variables
+        ##############################
+
+        self.add(pr.LocalVariable(
+            name         = "Enable",
+            description  = "Enable the link monitor",
+            mode         = "RW",
+            value        = True,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "LinkMask",
+            description  = "Monitored links: bit 0 is TX, bits 1-14 are RX[13:0]",
+            mode         = "RW",
+            value        = linkMask,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "MaxPeriodJitter",
+            description  = "Period jitter alarm threshold (rolling standard deviation / mean of the packet period)",
+            mode         = "RW",
+            value        = maxPeriodJitter,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "MaxErrorRate",
+            description  = "Error rate alarm threshold (errors per second over the rolling window)",
+            mode         = "RW",
+            value        = maxErrorRate,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "LinkStats",
+            description  = "Per link rolling statistics (index 0 is TX, 1-14 are RX[13:0])",
+            mode         = "RO",
+            value        = {},
+            localGet     = self.linkStats,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "ActiveAlarms",
+            description  = "Active link alarms",
+            mode         = "RO",
+            value        = [],
+            localGet     = lambda: list(self._alarms.values()),
+            pollInterval = 1,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "AlarmCount",
+            description  = "Number of alarms raised",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self._alarmCnt,
+            pollInterval = 1,
+        ))
+
+        ##############################
+        # Commands
+        ##############################
+        @self.command(description="Reset the rolling statistics and clear the alarms",)
+        def ResetStats():
+            with self._lock:
+                for win in [self._period, self._errDelta, self._errTime]:
+                    win.reset()
+                self._lastErr[:] = -1
+                self._alarms.clear()
+
+        # Listen to the AppMpsSalt poll
+        if salt is not None:
+            if snapshot:
+                salt.StatusSnapshot.addListener(self._snapshotUpdated)
+            else:
+                self._listen(salt.MpsTxPktPeriod,    0, self._periodUpdated)
+                self._listen(salt.MpsTxEofeSentCnt,  0, self._errUpdated)
+                self._listen(salt.MpsTxPktPeriodMax, 0, self._extremeUpdated, 0)
+                self._listen(salt.MpsTxPktPeriodMin, 0, self._extremeUpdated, 1)
+                for i in range(AppMpsSaltNumLinks-1):
+                    self._listen(salt.MpsRxPktPeriod[i],    i+1, self._periodUpdated)
+                    self._listen(salt.MpsRxErrDetCnt[i],    i+1, self._errUpdated)
+                    self._listen(salt.MpsRxPktPeriodMax[i], i+1, self._extremeUpdated, 0)
+                    self._listen(salt.MpsRxPktPeriodMin[i], i+1, self._extremeUpdated, 1)
+                salt.MpsTxLinkUP.addListener(lambda path, varValue: self._linkUpUpdated(0x1, varValue.value))
+                salt.MpsRxLinkUP.addListener(lambda path, varValue: self._linkUpUpdated(0x7FFE, varValue.value << 1))
+
+    def _listen(self, var, link, func, *args):
+        var.addListener(lambda path, varValue: func(np.array([link]), np.array([varValue.value]), *args))
+
+    def _snapshotUpdated(self, path, varValue):
+        snap = varValue.value
+        if not snap:
+            return
+        links = np.arange(AppMpsSaltNumLinks)
+        self._linkUpUpdated(0x7FFF, int(np.dot(snap['LinkUp'], 1 << links)))
+        self._extremeUpdated(links, snap['PktPeriodMax'], 0)
+        self._extremeUpdated(links, snap['PktPeriodMin'], 1)
+        self._periodUpdated(links, snap['PktPeriod'])
+        self._errUpdated(links, snap['ErrCnt'])
+
+    def _linkUpUpdated(self, mask, value):
+        with self._lock:
+            links = np.flatnonzero((mask >> np.arange(AppMpsSaltNumLinks)) & 0x1)
+            self._linkUp[links] = ((value >> links) & 0x1).astype(bool)
+            self._evaluate(links)
+
+    def _extremeUpdated(self, links, values, which):
+        with self._lock:
+            self._extreme[which, links] = values
+
+    def _periodUpdated(self, links, values):
+        if not self.Enable.value():
+            return
+        with self._lock:
+            # A zero period means no packet received yet
+            links = links[values > 0]
+            self._period.push(links, values[values > 0].astype(np.float64))
+            self._evaluate(links)
+
+    def _errUpdated(self, links, values):
+        if not self.Enable.value():
+            return
+        now = time.monotonic()
+        with self._lock:
+            values = values.astype(np.int64)
+            seen   = self._lastErr[links] >= 0
+
+            # The first sample only sets the reference. A counter that decreased
+            # was reset (AppMpsSalt.CntRst), its delta is the count since the reset.
+            upd   = links[seen]
+            delta = values[seen] - self._lastErr[upd]
+            delta = np.where(delta < 0, values[seen], delta)
+            self._errDelta.push(upd, delta.astype(np.float64))
+            self._errTime.push(upd, now - self._lastTime[upd])
+
+            self._lastErr[links]  = values
+            self._lastTime[links] = now
+            self._evaluate(upd)
+
+    def _jitter(self):
+        cnt  = np.maximum(self._period.count, 1)
+        mean = self._period.sum / cnt
+        var  = np.maximum(self._period.sumSq / cnt - mean*mean, 0.0)
+        return mean, np.where(mean > 0, np.sqrt(var) / np.where(mean > 0, mean, 1.0), 0.0)
+
+    def _errorRate(self):
+        return np.where(self._errTime.sum > 0, self._errDelta.sum / np.where(self._errTime.sum > 0, self._errTime.sum, 1.0), 0.0)
+
+    def _evaluate(self, links):
+        if links.size == 0:
+            return
+
+        _, jitter = self._jitter()
+        rate      = self._errorRate()
+        minCnt    = max(2, self._window // 4)
+        maxJitter = self.MaxPeriodJitter.value()
+        maxRate   = self.MaxErrorRate.value()
+        monitored = ((self.LinkMask.value() >> np.arange(AppMpsSaltNumLinks)) & 0x1).astype(bool)
+
+        # (condition, value, threshold) per alarm type
+        checks = {
+            'LinkDown'     : (~self._linkUp, None, None),
+            'PeriodJitter' : ((self._period.count >= minCnt) & (jitter > maxJitter), jitter, maxJitter),
+            'ErrorRate'    : ((self._errTime.count > 0) & (rate > maxRate), rate, maxRate),
+        }
+
+        for kind, (active, value, threshold) in checks.items():
+            active = active & monitored
+            for link in links.tolist():
+                key = (link, kind)
+                if active[link] and key not in self._alarms:
+                    alarm = {
+                        'Link'      : AppMpsLinkNames[link],
+                        'Type'      : kind,
+                        'Value'     : None if value is None else float(value[link]),
+                        'Threshold' : threshold,
+                        'Time'      : time.time(),
+                    }
+                    self._alarms[key] = alarm
+                    self._history.append(alarm)
+                    self._alarmCnt += 1
+                    self._log.warning(f'{self.path}: MPS link {alarm["Link"]} {kind} alarm (value={alarm["Value"]}, threshold={threshold})')
+                elif (not active[link]) and key in self._alarms:
+                    del self._alarms[key]
+
+    def linkStats(self):
+        """
+        Returns the per link arrays of the rolling statistics
+        """
+        with self._lock:
+            mean, jitter = self._jitter()
+            return {
+                'LinkUp'       : self._linkUp.copy(),
+                'PeriodMean'   : mean,
+                'PeriodJitter' : jitter,
+                'PeriodMax'    : self._extreme[0].copy(),
+                'PeriodMin'    : self._extreme[1].copy(),
+                'ErrorRate'    : self._errorRate(),
+                'Samples'      : self._period.count.copy(),
+            }
+
+    def alarmHistory(self):
+        """
+        Returns the last alarms raised, oldest first
+        """
+        with self._lock:
+            return list(self._history)
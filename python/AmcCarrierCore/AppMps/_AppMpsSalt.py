@@ -16,15 +16,36 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
+import time
+import threading
+import numpy   as np
 import pyrogue as pr
 
+from AmcCarrierCore._BurstAccess import burstRead, burstVariables, burstUpdateRanges
+
+# Each statistics group maps TX at entry 0 and RX[13:0] at entries 1-14,
+# the rest of the 0x80 group and 0x70C-0x713 return a decode error
+AppMpsSaltNumLinks   = 15
+AppMpsSaltStatGroups = ['LinkUpCnt', 'PktCnt', 'ErrCnt', 'PktPeriod', 'PktPeriodMax', 'PktPeriodMin']
+AppMpsSaltCounters   = ['LinkUpCnt', 'PktCnt', 'ErrCnt']
+AppMpsSaltStatusRanges = [(0x80*i, 4*AppMpsSaltNumLinks) for i in range(len(AppMpsSaltStatGroups))] + \
+                         [(0x700, 0xC), (0x714, 0x8)]
+
 class AppMpsSalt(pr.Device):
     def __init__(   self,
-            name        = "AppMpsSalt",
-            description = "AmcCarrier MPS PHY Module",
+            name           = "AppMpsSalt",
+            description    = "AmcCarrier MPS PHY Module",
+            statusSnapshot = False,
             **kwargs):
         super().__init__(name=name, description=description, **kwargs)
 
+        self._snapLock = threading.Lock()
+        self._snapPrev = None
+
+        # In snapshot mode the status registers are not polled individually,
+        # they are set from the StatusSnapshot burst instead
+        statusPoll = 0 if statusSnapshot else 1
+
         ##############################
         # Variables
         ##############################
@@ -37,7 +58,7 @@ class AppMpsSalt(pr.Device):
             bitOffset    =  0x00,
             base         = pr.UInt,
             mode         = "RO",
-            pollInterval = 1,
+            pollInterval = statusPoll,
         ))
 
         self.addRemoteVariables(
@@ -50,7 +71,7 @@ class AppMpsSalt(pr.Device):
             mode         = "RO",
             number       =  14,
             stride       =  4,
-            pollInterval = 1,
+            pollInterval = statusPoll,
         )
 
         self.add(pr.RemoteVariable(
@@ -61,7 +82,7 @@ class AppMpsSalt(pr.Device):
             bitOffset    =  0x00,
             base         = pr.UInt,
             mode         = "RO",
-            pollInterval = 1,
+            pollInterval = statusPoll,
         ))
 
         self.addRemoteVariables(
@@ -74,7 +95,7 @@ class AppMpsSalt(pr.Device):
             mode         = "RO",
             number       =  14,
             stride       =  4,
-            pollInterval = 1,
+            pollInterval = statusPoll,
         )
 
         self.add(pr.RemoteVariable(
@@ -85,7 +106,7 @@ class AppMpsSalt(pr.Device):
             bitOffset    =  0x00,
             base         = pr.UInt,
             mode         = "RO",
-            pollInterval = 1,
+            pollInterval = statusPoll,
         ))
 
         self.addRemoteVariables(
@@ -98,7 +119,7 @@ class AppMpsSalt(pr.Device):
             mode         = "RO",
             number       =  14,
             stride       =  4,
-            pollInterval = 1,
+            pollInterval = statusPoll,
         )
 
         self.add(pr.RemoteVariable(
@@ -109,7 +130,7 @@ class AppMpsSalt(pr.Device):
             bitOffset    =  0x00,
             base         = pr.UInt,
             mode         = "RO",
-            pollInterval = 1,
+            pollInterval = statusPoll,
         ))
 
         self.addRemoteVariables(
@@ -122,7 +143,7 @@ class AppMpsSalt(pr.Device):
             mode         = "RO",
             number       =  14,
             stride       =  4,
-            pollInterval = 1,
+            pollInterval = statusPoll,
         )
 
         self.add(pr.RemoteVariable(
@@ -133,7 +154,7 @@ class AppMpsSalt(pr.Device):
             bitOffset    =  0x00,
             base         = pr.UInt,
             mode         = "RO",
-            pollInterval = 1,
+            pollInterval = statusPoll,
         ))
 
         self.addRemoteVariables(
@@ -146,7 +167,7 @@ class AppMpsSalt(pr.Device):
             mode         = "RO",
             number       =  14,
             stride       =  4,
-            pollInterval = 1,
+            pollInterval = statusPoll,
         )
 
         self.add(pr.RemoteVariable(
@@ -157,7 +178,7 @@ class AppMpsSalt(pr.Device):
             bitOffset    =  0x00,
             base         = pr.UInt,
             mode         = "RO",
-            pollInterval = 1,
+            pollInterval = statusPoll,
         ))
 
         self.addRemoteVariables(
@@ -170,7 +191,7 @@ class AppMpsSalt(pr.Device):
             mode         = "RO",
             number       =  14,
             stride       =  4,
-            pollInterval = 1,
+            pollInterval = statusPoll,
         )
 
         self.add(pr.RemoteVariable(
@@ -181,7 +202,7 @@ class AppMpsSalt(pr.Device):
             bitOffset    =  0x00,
             base         = pr.UInt,
             mode         = "RO",
-            pollInterval = 1,
+            pollInterval = statusPoll,
         ))
 
         self.add(pr.RemoteVariable(
@@ -192,7 +213,7 @@ class AppMpsSalt(pr.Device):
             bitOffset    =  0x01,
             base         = pr.UInt,
             mode         = "RO",
-            pollInterval = 1,
+            pollInterval = statusPoll,
         ))
 
         self.add(pr.RemoteVariable(
@@ -203,7 +224,6 @@ class AppMpsSalt(pr.Device):
             bitOffset    =  0x00,
             base         = pr.UInt,
             mode         = "RO",
-            pollInterval = 1,
         ))
 
         self.add(pr.RemoteVariable(
@@ -214,7 +234,6 @@ class AppMpsSalt(pr.Device):
             bitOffset    =  0x00,
             base         = pr.UInt,
             mode         = "RO",
-            pollInterval = 1,
         ))
 
         self.add(pr.RemoteVariable(
@@ -225,7 +244,7 @@ class AppMpsSalt(pr.Device):
             bitOffset    =  0x00,
             base         = pr.UInt,
             mode         = "RO",
-            pollInterval = 1,
+            pollInterval = statusPoll,
         ))
 
         self.add(pr.RemoteVariable(
@@ -236,7 +255,7 @@ class AppMpsSalt(pr.Device):
             bitOffset    =  0x00,
             base         = pr.UInt,
             mode         = "RO",
-            pollInterval = 1,
+            pollInterval = statusPoll,
         ))
 
         self.add(pr.RemoteVariable(
@@ -269,6 +288,15 @@ class AppMpsSalt(pr.Device):
             mode         = "WO",
         ))
 
+        self.add(pr.LocalVariable(
+            name         = "StatusSnapshot",
+            description  = "All the status registers, per link arrays (index 0 is TX, 1-14 are RX[13:0]) with the counter deltas and rates since the previous read, the status variables are updated from it",
+            mode         = "RO",
+            value        = {},
+            localGet     = self.readStatusSnapshot,
+            pollInterval = 1 if statusSnapshot else 0,
+        ))
+
         ##############################
         # Commands
         ##############################
@@ -279,3 +307,44 @@ class AppMpsSalt(pr.Device):
         @self.command(name="RstPll", description="PLL Reset",)
         def RstPll():
             self.PllRst.set(1)
+
+        # RO status variables updated by readStatusSnapshot()
+        self._statusVariables = burstVariables(self, AppMpsSaltStatusRanges)
+
+    def readStatusSnapshot(self):
+        raw  = burstRead(self, AppMpsSaltStatusRanges)
+        burstUpdateRanges(self._statusVariables, raw, AppMpsSaltStatusRanges)
+        w    = raw.view('<u4')
+        now  = time.monotonic()
+        stat = w[:len(AppMpsSaltStatGroups)*AppMpsSaltNumLinks].reshape(len(AppMpsSaltStatGroups), AppMpsSaltNumLinks)
+        cnt  = np.append(stat[:len(AppMpsSaltCounters)].ravel(), w[-1])
+        link = int(w[-5])
+
+        ret = {name: stat[i] for i, name in enumerate(AppMpsSaltStatGroups)}
+        ret.update({
+            'LinkUp'            : ((link >> np.arange(AppMpsSaltNumLinks)) & 0x1).astype(bool),
+            'MPS_SLOT_G'        : int(w[-4]) & 0x1,
+            'APP_TYPE_G'        : int(w[-3]) & 0x7F,
+            'MpsPllLocked'      : int(w[-2]) & 0x1,
+            'DiagnosticStrbCnt' : int(w[-1]),
+        })
+
+        # Counter deltas (modulo 2^32) and rates since the previous snapshot
+        with self._snapLock:
+            prev, self._snapPrev = self._snapPrev, (now, cnt)
+
+        if prev is None:
+            delta = np.zeros_like(cnt)
+            dt    = 0.0
+        else:
+            delta = cnt - prev[1]
+            dt    = now - prev[0]
+        rate = delta / dt if dt > 0 else np.zeros(cnt.size)
+
+        for i, name in enumerate(AppMpsSaltCounters):
+            ret[name + 'Delta'] = delta[i*AppMpsSaltNumLinks:(i+1)*AppMpsSaltNumLinks]
+            ret[name + 'Rate']  = rate[i*AppMpsSaltNumLinks:(i+1)*AppMpsSaltNumLinks]
+        ret['DiagnosticStrbRate'] = rate[-1]
+        ret['Interval']           = dt
+
+        return ret
@@ -0,0 +1,223 @@
+#-----------------------------------------------------------------------------
+# Title      : PyRogue AmcCarrier MPS Threshold Reference Model
+#-----------------------------------------------------------------------------
+# File       : AppMpsThrModel.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# Vectorized reference model of the AppMpsSelect.vhd/AppMpsEncoder.vhd
+# threshold evaluation, producing the MpsMessageType messages of a sequence
+# of diagnostic strobes.
+#
+# The channel configuration (MpsChanConfigType, from getMpsAppConfig() of
+# the application type) and the threshold tables (MpsChanRegType) are given
+# as numpy structured arrays, the core configuration is the AppMpsThr one.
+# Every sample is a valid diagnostic strobe. The threshold memory holding a
+# tripped bit for 15 strobes is carried from one evaluate() call to the next.
+# Not modeled: a LCLS-I threshold trip clearing the threshold 0 memory armed
+# by an earlier channel error.
+#-----------------------------------------------------------------------------
+# This file is part of the rogue software platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue software platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import numpy as np
+
+from AmcCarrierCore.AppMps._AppMpsCodec import MpsChanCount, MpsMessageType
+
+MpsTholdCount = 8
+MpsTholdHold  = 15 # Strobes a tripped bit is held (4-bit threshold memory)
+
+MpsChanConfigType = np.dtype([
+    ('tholdCount', 'u1'),   # THOLD_COUNT_C
+    ('lcls1En',    '?'),    # LCLS1_EN_C
+    ('idleEn',     '?'),    # IDLE_EN_C
+    ('altEn',      '?'),    # ALT_EN_C
+    ('byteMap',    'u1'),   # BYTE_MAP_C
+])
+
+MpsChanTholdType = np.dtype([
+    ('minTholdEn', '?'),
+    ('maxTholdEn', '?'),
+    ('minThold',   '<i4'),
+    ('maxThold',   '<i4'),
+])
+
+MpsChanRegType = np.dtype([
+    ('stdTholds',  MpsChanTholdType, (MpsTholdCount,)),
+    ('lcls1Thold', MpsChanTholdType),
+    ('idleThold',  MpsChanTholdType),
+    ('idleEn',     '?'),
+    ('altTholds',  MpsChanTholdType, (MpsTholdCount,)),
+])
+
+def _compare(thold, value):
+    # compareTholds(): signed 32-bit compare against the enabled limits
+    return (thold['maxTholdEn'] & (value > thold['maxThold'])) | \
+           (thold['minTholdEn'] & (value < thold['minThold']))
+
+def _hold(trip, mem):
+    """
+    Apply the threshold memory to a (N, ...) trip array: a bit is set on the
+    strobe it trips and the MpsTholdHold following ones. mem holds the
+    remaining hold strobes from the previous call, it is updated in place.
+    """
+    n   = trip.shape[0]
+    cnt = np.concatenate([np.zeros((1,) + trip.shape[1:], dtype=np.int64), np.cumsum(trip, axis=0)])
+    idx = np.arange(n)
+    lo  = np.maximum(idx - MpsTholdHold, 0)
+
+    # Any trip in [t-15, t]
+    held = (cnt[idx+1] - cnt[lo]) > 0
+    held |= idx.reshape((-1,) + (1,)*(trip.ndim-1)) < mem
+
+    # Remaining hold after the last strobe
+    last = np.where(trip.any(axis=0), n - 1 - np.argmax(trip[::-1], axis=0), -1)
+    mem[...] = np.maximum(mem - n, np.where(last >= 0, MpsTholdHold - (n - 1 - last), 0))
+    mem[mem < 0] = 0
+    return held
+
+class AppMpsThrModel(object):
+    def __init__(   self,
+            chanConfig = None,  # MpsChanConfigType array, MpsChanCount entries
+            byteCount  = 0,     # BYTE_COUNT_C
+            lcls1Count = 0,     # LCLS1_COUNT_C
+            lcls2Count = 0,     # LCLS2_COUNT_C
+            digital    = False): # DIGITAL_EN_C
+        self.chanConfig = np.zeros(MpsChanCount, dtype=MpsChanConfigType) if chanConfig is None else np.asarray(chanConfig, dtype=MpsChanConfigType)
+        self.chanReg    = np.zeros(MpsChanCount, dtype=MpsChanRegType)
+        self.byteCount  = byteCount
+        self.lcls1Count = lcls1Count
+        self.lcls2Count = lcls2Count
+        self.digital    = digital
+
+        # AppMpsThr configuration
+        self.mpsEnable    = True
+        self.mpsAppId     = 0
+        self.mpsVersion   = 0
+        self.lcls1Mode    = False
+        self.beamDestMask = 0
+        self.altDestMask  = 0
+
+        self.reset()
+
+    def reset(self):
+        """
+        Clear the threshold memory, the trip values and the trip pulse IDs
+        """
+        self._tholdMem   = np.zeros((MpsChanCount, MpsTholdCount), dtype=np.int64)
+        self.tripValue   = np.zeros(MpsChanCount, dtype=np.int32)
+        self.tripPulseId = np.zeros(MpsChanCount, dtype=np.uint64)
+
+    def loadConfig(self, thr):
+        """
+        Load the core configuration from an AppMpsThr device
+        """
+        variables = [thr.MpsEnable, thr.MpsAppId, thr.MpsVersion, thr.Lcls1Mode, thr.BeamDestMask, thr.AltDestMask]
+        thr.readBlocks(recurse=False, variable=variables)
+        thr.checkBlocks(recurse=False, variable=variables)
+
+        self.mpsEnable    = bool(thr.MpsEnable.value())
+        self.mpsAppId     = thr.MpsAppId.value()
+        self.mpsVersion   = thr.MpsVersion.value()
+        self.lcls1Mode    = bool(thr.Lcls1Mode.value())
+        self.beamDestMask = thr.BeamDestMask.value()
+        self.altDestMask  = thr.AltDestMask.value()
+
+    def evaluate(self, pulseId, beamDest=None, chanData=None, sevr=None, ignore=None, digitalBus=None):
+        """
+        Evaluate N diagnostic strobes and return their MpsMessageType messages.
+           pulseId    : (N,) timing pulse IDs
+           beamDest   : (N,) beam destinations, timingMessage.beamRequest(7:4)
+           chanData   : (N, MpsChanCount) signed 32-bit channel data (analog)
+           sevr       : (N, MpsChanCount) channel severities, non zero is an error
+           ignore     : (N, MpsChanCount) channel MPS ignore flags
+           digitalBus : (N,) 64-bit digital inputs, diagnostic data 31 & 30 (digital)
+        """
+        pulseId = np.asarray(pulseId, dtype=np.uint64)
+        n       = pulseId.size
+
+        msgs = np.zeros(n, dtype=MpsMessageType)
+        msgs['valid']     = self.mpsEnable
+        msgs['version']   = self.mpsVersion
+        msgs['lcls']      = self.lcls1Mode
+        msgs['timeStamp'] = pulseId & np.uint64(0xFFFF)
+        msgs['appId']     = self.mpsAppId
+        msgs['msgSize']   = self.lcls1Count if self.lcls1Mode else self.lcls2Count
+
+        if self.digital:
+            msgs['inputType'] = 0
+            # digitalBit() sets bit j of message byte 0 for the bit j of every
+            # input byte. Its 15 clock memory is shorter than the strobe period.
+            bus  = np.asarray(digitalBus, dtype=np.uint64)[:,None] >> np.arange(64, dtype=np.uint64)
+            bits = (bus & np.uint64(0x1)).astype(bool)[:,:8*self.byteCount].reshape(n, -1, 8).any(axis=1)
+            msgs['message'][:,0] = np.packbits(bits, axis=1, bitorder='little')[:,0] if self.byteCount else 0
+            return msgs
+
+        msgs['inputType'] = 1
+        chanData = np.asarray(chanData, dtype=np.int64).astype(np.int32)
+        sevr     = np.zeros((n, MpsChanCount), dtype=bool) if sevr   is None else (np.asarray(sevr) != 0)
+        ignore   = np.zeros((n, MpsChanCount), dtype=bool) if ignore is None else (np.asarray(ignore) != 0)
+
+        # AppMpsSelect table selection
+        dest       = np.left_shift(1, np.asarray(beamDest, dtype=np.int64) & 0xF)
+        selectIdle = (dest & self.beamDestMask) == 0
+        selectAlt  = (dest & self.altDestMask) != 0
+
+        # (N, chan, thold) trips that arm the threshold memory, and the bits only set this strobe
+        trip  = np.zeros((n, MpsChanCount, MpsTholdCount), dtype=bool)
+        once  = np.zeros((n, MpsChanCount, MpsTholdCount), dtype=bool)
+        anyTrip = np.zeros((n, MpsChanCount), dtype=bool)
+
+        for chan in np.flatnonzero(self.chanConfig['tholdCount'] > 0):
+            cfg   = self.chanConfig[chan]
+            reg   = self.chanReg[chan]
+            value = chanData[:,chan]
+            ok    = ~ignore[:,chan]
+            error = sevr[:,chan] & ok
+
+            # Channel error: all the bits, threshold 0 memory armed
+            once[:,chan,:]  |= error[:,None]
+            trip[:,chan,0]  |= error
+            rest = ~error
+
+            if cfg['lcls1En'] and self.lcls1Mode:
+                # LCLS-I table, bit 0, not held
+                hit = rest & ok & _compare(reg['lcls1Thold'], value)
+                once[:,chan,0] |= hit
+                anyTrip[:,chan] |= hit
+                continue
+
+            # LCLS-II idle table, bit 7
+            idle = rest & selectIdle if (cfg['idleEn'] and reg['idleEn']) else np.zeros(n, dtype=bool)
+            hit  = idle & ok & _compare(reg['idleThold'], value)
+            trip[:,chan,7]  |= hit
+            anyTrip[:,chan] |= hit
+
+            # Standard or alternate tables
+            alt = selectAlt if cfg['altEn'] else np.zeros(n, dtype=bool)
+            for thold in range(cfg['tholdCount']):
+                hit = rest & ~idle & ok & np.where(alt, _compare(reg['altTholds'][thold], value), _compare(reg['stdTholds'][thold], value))
+                trip[:,chan,thold] |= hit
+                anyTrip[:,chan]    |= hit
+
+        bits = _hold(trip, self._tholdMem) | once
+
+        # Message bytes, BYTE_MAP_C per channel
+        for chan in np.flatnonzero(self.chanConfig['tholdCount'] > 0):
+            byte = np.packbits(bits[:,chan,:], axis=1, bitorder='little')[:,0]
+            msgs['message'][:,self.chanConfig[chan]['byteMap']] |= byte
+        msgs['message'][:,self.byteCount:] = 0
+
+        # Last trip value and pulse ID per channel
+        tripped = anyTrip.any(axis=0)
+        last    = n - 1 - np.argmax(anyTrip[::-1], axis=0)
+        self.tripValue[tripped]   = chanData[last[tripped], np.flatnonzero(tripped)]
+        self.tripPulseId[tripped] = pulseId[last[tripped]]
+
+        return msgs
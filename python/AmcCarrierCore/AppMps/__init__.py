@@ -1,3 +1,6 @@
 from AmcCarrierCore.AppMps._AppMps import *
 from AmcCarrierCore.AppMps._AppMpsSalt import *
 from AmcCarrierCore.AppMps._AppMpsThr import *
+from AmcCarrierCore.AppMps._AppMpsLinkMonitor import *
+from AmcCarrierCore.AppMps._AppMpsCodec import *
+from AmcCarrierCore.AppMps._AppMpsThrModel import *
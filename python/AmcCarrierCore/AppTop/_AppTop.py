@@ -14,7 +14,11 @@
 #-----------------------------------------------------------------------------
 
 import time
+import threading
+import contextlib
+import concurrent.futures
 import pyrogue   as pr
+from AmcCarrierCore._StartupProfiler   import profileContext, adoptProfileContext
 from AmcCarrierCore.AppTop._AppCore    import AppCore
 from AmcCarrierCore.AppTop._AppTopJesd import AppTopJesd
 import AmcCarrierCore.DacSigGen as dacSigGen
@@ -23,6 +27,70 @@ import AmcCarrierCore.DaqMuxV2  as daqMuxV2
 import surf.devices.ti         as ti
 import surf.protocols.jesd204b as jesd
 
+# Load state of the calling thread, inherited by the _runConcurrent() workers
+# with the open startup profiler phases
+_loadState = threading.local()
+
+def pipelinedLoad():
+    """
+    Returns True within a TopLevel pipelined load. The writeBlocks()
+    overrides then only retire the transactions of their own subtree.
+    """
+    return getattr(_loadState, 'pipelined', False)
+
+@contextlib.contextmanager
+def _pipelined(pipelined=True):
+    prev = pipelinedLoad()
+    _loadState.pipelined = pipelined
+    try:
+        yield
+    finally:
+        _loadState.pipelined = prev
+
+def _runConcurrent(funcs):
+    if len(funcs) <= 1:
+        for func in funcs:
+            func()
+        return
+
+    pipelined = pipelinedLoad()
+    context   = profileContext()
+    def worker(func):
+        with _pipelined(pipelined), adoptProfileContext(context):
+            return func()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(funcs)) as pool:
+        for fut in [pool.submit(worker, func) for func in funcs]:
+            fut.result()
+
+def _timed(timing, key, func, *args, **kwargs):
+    start = time.monotonic()
+    ret = func(*args, **kwargs)
+    if timing is not None:
+        timing[key] = time.monotonic() - start
+    return ret
+
+def _writeSubtree(dev, **kwargs):
+    dev.writeBlocks(recurse=True, **kwargs)
+    dev.checkBlocks(recurse=True)
+
+# Dac38J84 per channel error registers checked by JesdHealth()
+DacHealthRegisters = [
+    'LinkErrCnt',
+    'ReadFifoEmpty',
+    'ReadFifoUnderflow',
+    'ReadFifoFull',
+    'ReadFifoOverflow',
+    'DispErr',
+    'NotitableErr',
+    'CodeSyncErr',
+    'FirstDataMatchErr',
+    'ElasticBuffOverflow',
+    'LinkConfigErr',
+    'FrameAlignErr',
+    'MultiFrameAlignErr',
+]
+
 class AppTop(pr.Device):
     def __init__(   self,
             name           = "AppTop",
@@ -34,6 +102,7 @@ class AppTop(pr.Device):
             sizeSigGen     = [0,0],
             modeSigGen     = [False,False],
             numWaveformBuffers  = 4,
+            daqMuxStatusSnapshot = False,
             **kwargs):
         super().__init__(name=name, description=description, **kwargs)
 
@@ -46,6 +115,8 @@ class AppTop(pr.Device):
         self._numSigGen  = numSigGen
         self._sizeSigGen = sizeSigGen
         self._init       = False
+        self._dacAlarms  = None
+        self._jesdHealthReport = {}
 
         self.add(pr.LocalVariable(
             name         = "BypassSysRefMinMax",
@@ -54,6 +125,13 @@ class AppTop(pr.Device):
             value        = False,
         ))
 
+        self.add(pr.LocalVariable(
+            name         = "GtResetHold",
+            description  = "Minimum time (seconds) the JESD GTs are held in reset by Init(), before polling for the links to drop",
+            mode         = "RW",
+            value        = 1.000,
+        ))
+
         self.add(pr.LocalVariable(
             name         = 'JesdHealthStatus',
             mode         = 'RO',
@@ -62,6 +140,14 @@ class AppTop(pr.Device):
             pollInterval = 0, # 0 by default for SMuRF because already have a function to check this status which is called from the high level application
         ))
 
+        self.add(pr.LocalVariable(
+            name         = 'JesdHealthReport',
+            description  = "Register values per device and per lane from the last JesdHealth() call",
+            mode         = 'RO',
+            localGet     = lambda: self._jesdHealthReport,
+            value        = {},
+        ))
+
         ##############################
         # Devices
         ##############################
@@ -71,6 +157,7 @@ class AppTop(pr.Device):
                 name       = f'DaqMuxV2[{i}]',
                 offset     =  0x20000000 + (i * 0x10000000),
                 numBuffers =  numWaveformBuffers,
+                statusSnapshot = daqMuxStatusSnapshot,
                 expand     =  False,
             ))
 
@@ -105,12 +192,11 @@ class AppTop(pr.Device):
             jesdTxDevices = self.find(typ=jesd.JesdTx)
             dacDevices    = self.find(typ=ti.Dac38J84)
 
-            dacEnables = [dac.enable.get() for dac in dacDevices]
-
             ##################
             ## Local Variables
             ##################
             maxRxCnt = 4 if (self._init) else 0
+            report   = {}
 
             ###########################
             # JESD Link Health Checking
@@ -118,118 +204,74 @@ class AppTop(pr.Device):
             linkLock = True
 
             if (self._init):
-                for en, dac in zip(dacEnables,dacDevices):
+                dacEnables = [dac.enable.get() for dac in dacDevices]
+                for dac in dacDevices:
                     dac.enable.set(True)
-                    for ch in dac.LinkErrCnt:
-                        ######################################################################
-                        if (dac.LinkErrCnt[ch].get() != 0):
-                            print(f'AppTop.Init(): {dac.path}.LinkErrCnt[{ch}] = {dac.LinkErrCnt[ch].value()}')
-                            linkLock = False
-                        ######################################################################
-                        if (dac.ReadFifoEmpty[ch].get() != 0):
-                            print(f'AppTop.Init(): {dac.path}.ReadFifoEmpty[{ch}] = {dac.ReadFifoEmpty[ch].value()}')
-                            linkLock = False
-                        ######################################################################
-                        if (dac.ReadFifoUnderflow[ch].get() != 0):
-                            print(f'AppTop.Init(): {dac.path}.ReadFifoUnderflow[{ch}] = {dac.ReadFifoUnderflow[ch].value()}')
-                            linkLock = False
-                        ######################################################################
-                        if (dac.ReadFifoFull[ch].get() != 0):
-                            print(f'AppTop.Init(): {dac.path}.ReadFifoFull[{ch}] = {dac.ReadFifoFull[ch].value()}')
-                            linkLock = False
-                        ######################################################################
-                        if (dac.ReadFifoOverflow[ch].get() != 0):
-                            print(f'AppTop.Init(): {dac.path}.ReadFifoOverflow[{ch}] = {dac.ReadFifoOverflow[ch].value()}')
-                            linkLock = False
-                        ######################################################################
-                        if (dac.DispErr[ch].get() != 0):
-                            print(f'AppTop.Init(): {dac.path}.DispErr[{ch}] = {dac.DispErr[ch].value()}')
-                            linkLock = False
-                        ######################################################################
-                        if (dac.NotitableErr[ch].get() != 0):
-                            print(f'AppTop.Init(): {dac.path}.NotitableErr[{ch}] = {dac.NotitableErr[ch].value()}')
-                            linkLock = False
-                        ######################################################################
-                        if (dac.CodeSyncErr[ch].get() != 0):
-                            print(f'AppTop.Init(): {dac.path}.CodeSyncErr[{ch}] = {dac.CodeSyncErr[ch].value()}')
-                            linkLock = False
-                        ######################################################################
-                        if (dac.FirstDataMatchErr[ch].get() != 0):
-                            print(f'AppTop.Init(): {dac.path}.FirstDataMatchErr[{ch}] = {dac.FirstDataMatchErr[ch].value()}')
-                            linkLock = False
-                        ######################################################################
-                        if (dac.ElasticBuffOverflow[ch].get() != 0):
-                            print(f'AppTop.Init(): {dac.path}.ElasticBuffOverflow[{ch}] = {dac.ElasticBuffOverflow[ch].value()}')
-                            linkLock = False
-                        ######################################################################
-                        if (dac.LinkConfigErr[ch].get() != 0):
-                            print(f'AppTop.Init(): {dac.path}.LinkConfigErr[{ch}] = {dac.LinkConfigErr[ch].value()}')
-                            linkLock = False
-                        ######################################################################
-                        if (dac.FrameAlignErr[ch].get() != 0):
-                            print(f'AppTop.Init(): {dac.path}.FrameAlignErr[{ch}] = {dac.FrameAlignErr[ch].value()}')
-                            linkLock = False
-                        ######################################################################
-                        if (dac.MultiFrameAlignErr[ch].get() != 0):
-                            print(f'AppTop.Init(): {dac.path}.MultiFrameAlignErr[{ch}] = {dac.MultiFrameAlignErr[ch].value()}')
-                            linkLock = False
-                        ######################################################################
+
+                # Queue all the DAC error register reads and retire them together
+                self._bulkRead({dac: [getattr(dac,name)[ch] for name in DacHealthRegisters for ch in dac.LinkErrCnt] for dac in dacDevices})
+
+                for en, dac in zip(dacEnables,dacDevices):
+                    report[dac.path] = {name: [getattr(dac,name)[ch].value() for ch in dac.LinkErrCnt] for name in DacHealthRegisters}
+                    for name in DacHealthRegisters:
+                        for ch, value in zip(dac.LinkErrCnt, report[dac.path][name]):
+                            if (value != 0):
+                                print(f'AppTop.Init(): {dac.path}.{name}[{ch}] = {value}')
+                                linkLock = False
                     dac.enable.set(en)
 
-            if (self._init):
-                time.sleep(2.000)
+                self._waitFor(lambda: self._jesdLocked(jesdRxDevices+jesdTxDevices), timeout=2.000)
 
-            for tx in jesdTxDevices:
-                ######################################################################
-                if (tx.SysRefPeriodmin.get() != tx.SysRefPeriodmax.get()):
-                    if self.BypassSysRefMinMax.value() is False:
-                        print(f'AppTop.Init().{tx.path}: Link Not Locked: SysRefPeriodmin = {tx.SysRefPeriodmin.value()}, SysRefPeriodmax = {tx.SysRefPeriodmax.value()}')
-                        linkLock = False
-                    else:
-                        print(f'AppTop.Init().{tx.path}: Warning: SysRefPeriodmin = {tx.SysRefPeriodmin.value()}, SysRefPeriodmax = {tx.SysRefPeriodmax.value()}')
-                ######################################################################
-                if ( tx.DataValid.get() != tx.Enable.get() ):
-                    print(f'AppTop.Init(): Link Not Locked: {tx.path}.DataValid = {tx.DataValid.value()} ')
-                    linkLock = False
-                ######################################################################
+            # Queue all the JESD status register reads and retire them together
+            jesdVars = {}
+            for dev in jesdTxDevices+jesdRxDevices:
+                jesdVars[dev] = [dev.SysRefPeriodmin, dev.SysRefPeriodmax, dev.DataValid, dev.Enable]
                 if (self._init):
-                    ##################################################################
-                    for ch in tx.StatusValidCnt:
-                        if (tx.StatusValidCnt[ch].get() > 0):
-                            print(f'AppTop.Init(): {tx.path}.StatusValidCnt[{ch}] = {tx.StatusValidCnt[ch].value()}')
-                            linkLock = False
-                    ##################################################################
-                    tx.CmdClearErrors()
-                    ##################################################################
+                    jesdVars[dev] += [dev.StatusValidCnt[ch] for ch in dev.StatusValidCnt]
+                    if dev in jesdRxDevices:
+                        jesdVars[dev] += [dev.PositionErr, dev.AlignErr]
+            self._bulkRead(jesdVars)
+
+            for dev in jesdTxDevices+jesdRxDevices:
+                isRx = dev in jesdRxDevices
+                ok   = True
+                rep  = {name: getattr(dev,name).value() for name in ['SysRefPeriodmin','SysRefPeriodmax','DataValid','Enable']}
+                report[dev.path] = rep
                 ######################################################################
-
-            for rx in jesdRxDevices:
-                ######################################################################
-                if (rx.SysRefPeriodmin.get() != rx.SysRefPeriodmax.get()):
+                if (rep['SysRefPeriodmin'] != rep['SysRefPeriodmax']):
                     if self.BypassSysRefMinMax.value() is False:
-                        print(f'AppTop.Init().{rx.path}: Link Not Locked: SysRefPeriodmin = {rx.SysRefPeriodmin.value()}, SysRefPeriodmax = {rx.SysRefPeriodmax.value()}')
-                        linkLock = False
+                        print(f'AppTop.Init().{dev.path}: Link Not Locked: SysRefPeriodmin = {rep["SysRefPeriodmin"]}, SysRefPeriodmax = {rep["SysRefPeriodmax"]}')
+                        ok = False
                     else:
-                        print(f'AppTop.Init().{rx.path}: Warning: SysRefPeriodmin = {rx.SysRefPeriodmin.value()}, SysRefPeriodmax = {rx.SysRefPeriodmax.value()}')
+                        print(f'AppTop.Init().{dev.path}: Warning: SysRefPeriodmin = {rep["SysRefPeriodmin"]}, SysRefPeriodmax = {rep["SysRefPeriodmax"]}')
                 ######################################################################
-                if ( rx.DataValid.get() != rx.Enable.get() ):
-                    print(f'AppTop.Init(): Link Not Locked: {rx.path}.DataValid = {rx.DataValid.value()} ')
-                    linkLock = False
+                if ( rep['DataValid'] != rep['Enable'] ):
+                    print(f'AppTop.Init(): Link Not Locked: {dev.path}.DataValid = {rep["DataValid"]} ')
+                    ok = False
                 ######################################################################
                 if (self._init):
                     ##################################################################
-                    if (rx.PositionErr.get() != 0) or (rx.AlignErr.get() != 0):
-                        print(f'AppTop.Init().{rx.path}: Link Not Locked: PositionErr = {rx.PositionErr.value()}, AlignErr = {rx.AlignErr.value()}')
-                        linkLock = False
+                    if isRx:
+                        rep['PositionErr'] = dev.PositionErr.value()
+                        rep['AlignErr']    = dev.AlignErr.value()
+                        if (rep['PositionErr'] != 0) or (rep['AlignErr'] != 0):
+                            print(f'AppTop.Init().{dev.path}: Link Not Locked: PositionErr = {rep["PositionErr"]}, AlignErr = {rep["AlignErr"]}')
+                            ok = False
                     ##################################################################
-                    for ch in rx.StatusValidCnt:
-                        if (rx.StatusValidCnt[ch].get() > maxRxCnt):
-                            print(f'AppTop.Init(): {rx.path}.StatusValidCnt[{ch}] = {rx.StatusValidCnt[ch].value()}')
-                            linkLock = False
+                    rep['StatusValidCnt'] = [dev.StatusValidCnt[ch].value() for ch in dev.StatusValidCnt]
+                    for ch, value in zip(dev.StatusValidCnt, rep['StatusValidCnt']):
+                        if (value > (maxRxCnt if isRx else 0)):
+                            print(f'AppTop.Init(): {dev.path}.StatusValidCnt[{ch}] = {value}')
+                            ok = False
                     ##################################################################
-                    rx.CmdClearErrors()
+                    dev.CmdClearErrors()
                     ##################################################################
                 ######################################################################
+                rep['Locked'] = ok
+                linkLock &= ok
+
+            report['LinkLock'] = linkLock
+            self._jesdHealthReport = report
 
             # Return the result
             return linkLock
@@ -251,6 +293,13 @@ class AppTop(pr.Device):
             txEnables  = [tx.Enable.get()  for tx  in jesdTxDevices]
             dacEnables = [dac.enable.get() for dac in dacDevices]
 
+            # Group the JESD devices by bay (common parent), bays are brought up concurrently
+            bays = {}
+            for en, rx in zip(rxEnables, jesdRxDevices):
+                bays.setdefault(rx.parent, ([],[]))[0].append((en,rx))
+            for en, tx in zip(txEnables, jesdTxDevices):
+                bays.setdefault(tx.parent, ([],[]))[1].append((en,tx))
+
             retryCnt = 0
             retryCntMax = 8
             while ( retryCnt < retryCntMax ):
@@ -263,41 +312,17 @@ class AppTop(pr.Device):
                 for core in appCore:
                     core.Init()
 
-                for rx in jesdRxDevices:
-                    rx.ResetGTs.set(1) # tx.ResetGTs/rx.ResetGTs OR'd together in FW
-                for tx in jesdTxDevices:
-                    tx.ResetGTs.set(1) # tx.ResetGTs/rx.ResetGTs OR'd together in FW
-
-                time.sleep(1.000)
-
-                for tx in jesdTxDevices:
-                    tx.ResetGTs.set(0) # tx.ResetGTs/rx.ResetGTs OR'd together in FW
-                for rx in jesdRxDevices:
-                    rx.ResetGTs.set(0) # tx.ResetGTs/rx.ResetGTs OR'd together in FW
-
-                time.sleep(1.000)
+                _runConcurrent([lambda rxs=rxs, txs=txs: self._jesdBayInit(rxs, txs) for rxs, txs in bays.values()])
 
-                for en, tx in zip(txEnables, jesdTxDevices):
-                    tx.Enable.set(en)
-
-                for en, rx in zip(rxEnables, jesdRxDevices):
-                    rx.CmdClearErrors()
-                    rx.Enable.set(en)
-
-                time.sleep(2.000)
-
-                for en, dac in zip(dacEnables,dacDevices):
-                    dac.enable.set(True)
-                    dac.Init()
-                    dac.ClearAlarms()
-                    dac.NcoSync()
-                    dac.ClearAlarms()
-                    dac.enable.set(en)
+                _runConcurrent([lambda en=en, dac=dac: self._dacInit(dac, en) for en, dac in zip(dacEnables,dacDevices)])
 
                 for tx in jesdTxDevices:
                     tx.CmdClearErrors()
 
-                time.sleep(2.000)
+                # Wait for the DAC alarm counters to settle
+                if dacDevices:
+                    self._dacAlarms = None
+                    self._waitFor(lambda: self._dacAlarmsSettled(dacDevices), timeout=2.000)
 
                 if ( self.JesdHealth() ):
                     self._init = False
@@ -315,7 +340,112 @@ class AppTop(pr.Device):
                 if ( sigGen.CsvFilePath.get() != "" ):
                     sigGen.LoadCsvFile("")
 
+    def _bulkRead(self, devVars):
+        """
+        Issue the reads of {device: [variables]} as background transactions
+        then retire them all before returning
+        """
+        for dev, variables in devVars.items():
+            if variables:
+                dev.readBlocks(recurse=False, variable=variables)
+        for dev, variables in devVars.items():
+            if variables:
+                dev.checkBlocks(recurse=False, variable=variables)
+
+    def _waitFor(self, cond, timeout, period=0.050):
+        """
+        Poll cond() until it returns True or timeout (seconds) expires
+        """
+        start = time.monotonic()
+        while not cond():
+            if (time.monotonic() - start) >= timeout:
+                return False
+            time.sleep(period)
+        return True
+
+    def _jesdLocked(self, devices):
+        self._bulkRead({dev: [dev.DataValid, dev.Enable, dev.SysRefPeriodmin, dev.SysRefPeriodmax] for dev in devices})
+        for dev in devices:
+            if (dev.DataValid.value() != dev.Enable.value()):
+                return False
+            if (dev.SysRefPeriodmin.value() != dev.SysRefPeriodmax.value()) and (self.BypassSysRefMinMax.value() is False):
+                return False
+        return True
+
+    def _jesdBayInit(self, rxs, txs):
+        for en, rx in rxs:
+            rx.ResetGTs.set(1) # tx.ResetGTs/rx.ResetGTs OR'd together in FW
+        for en, tx in txs:
+            tx.ResetGTs.set(1) # tx.ResetGTs/rx.ResetGTs OR'd together in FW
+
+        # Hold the GTs in reset for the minimum time, then until the links drop
+        time.sleep(self.GtResetHold.value())
+        self._waitFor(lambda: all(dev.DataValid.get() == 0 for _, dev in rxs+txs), timeout=1.000)
+
+        for en, tx in txs:
+            tx.ResetGTs.set(0) # tx.ResetGTs/rx.ResetGTs OR'd together in FW
+        for en, rx in rxs:
+            rx.ResetGTs.set(0) # tx.ResetGTs/rx.ResetGTs OR'd together in FW
+
+        for en, tx in txs:
+            tx.Enable.set(en)
+
+        for en, rx in rxs:
+            rx.CmdClearErrors()
+            rx.Enable.set(en)
+
+        # Wait for the links to lock, bounded by the GT reset (1 s) and lock (2 s) times
+        self._waitFor(lambda: self._jesdLocked([dev for _, dev in rxs+txs]), timeout=3.000)
+
+        # Clear the errors counted while the GTs were coming out of reset
+        for en, rx in rxs:
+            rx.CmdClearErrors()
+
+    def _dacInit(self, dac, en):
+        dac.enable.set(True)
+        dac.Init()
+        dac.ClearAlarms()
+        dac.NcoSync()
+        dac.ClearAlarms()
+        dac.enable.set(en)
+
+    def _dacAlarmsSettled(self, dacDevices):
+        """
+        Returns True once the DAC alarm counters read the same twice in a row
+        """
+        dacEnables = [dac.enable.get() for dac in dacDevices]
+        for dac in dacDevices:
+            dac.enable.set(True)
+
+        alarmVars = {dac: [getattr(dac,name)[ch] for name in DacHealthRegisters[:5] for ch in dac.LinkErrCnt] for dac in dacDevices}
+        self._bulkRead(alarmVars)
+        alarms = [var.value() for variables in alarmVars.values() for var in variables]
+
+        for en, dac in zip(dacEnables,dacDevices):
+            dac.enable.set(en)
+
+        settled = (alarms == self._dacAlarms)
+        self._dacAlarms = alarms
+        return settled
+
     def writeBlocks(self, **kwargs):
+        self.writeConfig(**kwargs)
+
+        # Retire any in-flight transactions before starting
+        self._root.checkBlocks(recurse=True)
+
+        # Perform the device init
+        self.Init()
+
+        self.checkBlocks(recurse=True)
+
+    def writeConfig(self, pipelined=False, timing=None, appCore=True, **kwargs):
+        """
+        Load the YAML configuration without the JESD Init(). In pipelined
+        mode the child devices are written concurrently and timing (dict)
+        receives the time spent per child in seconds. With appCore False the
+        AppCore children (AMC hardware) are left to the caller.
+        """
         print(f'{self.path}.writeBlocks()')
 
         # Put GTs into reset before LMK configured and initialized
@@ -326,13 +456,16 @@ class AppTop(pr.Device):
         for tx in jesdTxDevices:
             tx.ResetGTs.set(1)
 
-        # Load the YAML configuration
-        super().writeBlocks(**kwargs)
+        if not pipelined:
+            # Load the YAML configuration
+            super().writeBlocks(**kwargs)
+            return
 
-        # Retire any in-flight transactions before starting
-        self._root.checkBlocks(recurse=True)
-
-        # Perform the device init
-        self.Init()
+        # Local blocks first, then the independent child subtrees concurrently
+        kwargs.pop('recurse', None)
+        super().writeBlocks(recurse=False, **kwargs)
+        devices = [dev for dev in self.devices.values() if appCore or not isinstance(dev, AppCore)]
+        _runConcurrent([lambda dev=dev: _timed(timing, dev.path, _writeSubtree, dev, **kwargs) for dev in devices])
 
+        # Retire the in-flight transactions of this subtree
         self.checkBlocks(recurse=True)
@@ -0,0 +1,172 @@
+#-----------------------------------------------------------------------------
+# Title      : AmcCarrierCore Crate Manager
+#-----------------------------------------------------------------------------
+# File       : CrateManager.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# Brings up the carriers of an ATCA crate concurrently: one root and
+# TopLevel per carrier IP, identified by AmcCarrierBsi CrateId/SlotNumber.
+#
+# The slots go through the stages Connect (root start), Identify, Load (YAML
+# configuration, which runs AppTop.Init() through AppTop.writeBlocks()) or
+# Init (AppTop.Init() when there is no configuration), at most maxConcurrent
+# slots at a time. A failing slot does not stop the others, its stage and
+# error are reported with the per-stage timing of every slot.
+#-----------------------------------------------------------------------------
+# This file is part of the AmcCarrier Core. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the AmcCarrierCore, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import time
+import threading
+import concurrent.futures
+import pyrogue
+
+from AmcCarrierCore._LazyDevice           import buildLazyDevices
+from AmcCarrierCore.AppTop._TopLevel      import TopLevel
+from AmcCarrierCore.AppTop._RootTransport import RootTransport
+
+class CrateManager(object):
+    def __init__(   self,
+            ips           = [],
+            commType      = 'eth-rssi-interleaved',
+            topLevel      = TopLevel,
+            topLevelArgs  = None,  # TopLevel kwargs, or a callable(ip) returning them
+            config        = None,  # YAML configuration file(s), or {ip: file(s)}
+            crateId       = None,  # Expected CrateId, None to accept any
+            maxConcurrent = 4,
+            pool          = None,
+            startArgs     = None,  # Root.start() kwargs
+            profile       = False): # Startup profiler per root (RootTransport profile)
+        self._log          = pyrogue.logInit(cls=self)
+        self._ips          = list(ips)
+        self._commType     = commType
+        self._topLevel     = topLevel
+        self._topLevelArgs = topLevelArgs or {}
+        self._config       = config
+        self._crateId      = crateId
+        self._pool         = pool
+        self._startArgs    = startArgs or {}
+        self._profile      = profile
+        self.maxConcurrent = maxConcurrent
+        self.roots         = {}
+        self.report        = {}
+        self.wallTime      = None
+        self._lock         = threading.Lock()
+
+    def _bringUp(self, ip):
+        rep = {'CrateId': None, 'SlotNumber': None, 'Timing': {}, 'Stage': None, 'Error': None}
+        with self._lock:
+            self.report[ip] = rep
+
+        start = time.monotonic()
+        try:
+            rep['Stage'] = 'Connect'
+            args = self._topLevelArgs(ip) if callable(self._topLevelArgs) else self._topLevelArgs
+            root = RootTransport(commType=self._commType, ip=ip, pool=self._pool, profile=self._profile, name=f'Carrier_{ip.replace(".","_")}', description=f'Carrier {ip}')
+            root.add(self._topLevel(memBase=root.srp, **args))
+            with self._lock:
+                self.roots[ip] = root
+            config = self._config.get(ip) if isinstance(self._config, dict) else self._config
+            if config is not None:
+                buildLazyDevices(root, config)
+            root.start(**self._startArgs)
+            self._stage(rep, 'Connect', start)
+
+            rep['Stage'] = 'Identify'
+            top = root.find(typ=self._topLevel)[0]
+            bsi = top.AmcCarrierCore.AmcCarrierBsi
+            variables = [bsi.CrateId, bsi.SlotNumber]
+            bsi.readBlocks(recurse=False, variable=variables)
+            bsi.checkBlocks(recurse=False, variable=variables)
+            rep['CrateId']    = bsi.CrateId.value()
+            rep['SlotNumber'] = bsi.SlotNumber.value()
+            if (self._crateId is not None) and (rep['CrateId'] != self._crateId):
+                raise pyrogue.DeviceError(f'{ip}: CrateId = {rep["CrateId"]}, expected {self._crateId}')
+            self._stage(rep, 'Identify', start)
+
+            if config is not None:
+                rep['Stage'] = 'Load'
+                root.LoadConfig(config)
+                self._stage(rep, 'Load', start)
+            else:
+                rep['Stage'] = 'Init'
+                top.AppTop.Init()
+                self._stage(rep, 'Init', start)
+
+            rep['Stage'] = 'Done'
+
+        except Exception as e:
+            rep['Error'] = f'{type(e).__name__}: {e}'
+            self._log.error(f'CrateManager: {ip} failed at {rep["Stage"]}: {rep["Error"]}')
+
+        rep['Timing']['Total'] = time.monotonic() - start
+        return rep
+
+    def _stage(self, rep, name, start):
+        # Stage durations from the end of the previous stage
+        rep['Timing'][name] = (time.monotonic() - start) - sum(v for k, v in rep['Timing'].items())
+
+    def start(self):
+        """
+        Bring up all the slots concurrently, at most maxConcurrent at a time.
+        Returns {ip: report}, the failures are reported instead of raised.
+        """
+        start = time.monotonic()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self.maxConcurrent)) as pool:
+            for fut in [pool.submit(self._bringUp, ip) for ip in self._ips]:
+                fut.result()
+
+        self.wallTime = time.monotonic() - start
+        self._checkSlots()
+        return self.report
+
+    def _checkSlots(self):
+        # Two carriers answering with the same crate slot are both failed
+        seen = {}
+        for ip, rep in self.report.items():
+            if rep['Error'] is None:
+                seen.setdefault((rep['CrateId'], rep['SlotNumber']), []).append(ip)
+        for (crate, slot), ips in seen.items():
+            if len(ips) > 1:
+                for ip in ips:
+                    self.report[ip]['Stage'] = 'Identify'
+                    self.report[ip]['Error'] = f'Crate {crate} slot {slot} also reported by {[i for i in ips if i != ip]}'
+
+    def slots(self):
+        """
+        Returns {(CrateId, SlotNumber): root} of the slots brought up
+        """
+        return {(rep['CrateId'], rep['SlotNumber']): self.roots[ip] for ip, rep in self.report.items() if rep['Error'] is None}
+
+    def failures(self):
+        """
+        Returns {ip: (stage, error)} of the failed slots
+        """
+        return {ip: (rep['Stage'], rep['Error']) for ip, rep in self.report.items() if rep['Error'] is not None}
+
+    def stop(self):
+        """
+        Stop all the roots, releasing their transports
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self.maxConcurrent)) as pool:
+            futs = {ip: pool.submit(root.stop) for ip, root in self.roots.items()}
+            for ip, fut in futs.items():
+                try:
+                    fut.result()
+                except Exception as e:
+                    self._log.error(f'CrateManager: {ip} stop failed: {e}')
+        self.roots.clear()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
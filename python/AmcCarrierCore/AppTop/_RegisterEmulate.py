@@ -0,0 +1,489 @@
+#-----------------------------------------------------------------------------
+# Title      : AmcCarrierCore Behavioural Register Emulator
+#-----------------------------------------------------------------------------
+# File       : RegisterEmulate.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# Memory slave emulating the AmcCarrierCore register map without hardware.
+#
+# The backing store is sparse RAM (4 kB pages). Behavioural models, bound to
+# the devices of the tree on the first transaction, hook the register writes
+# and a periodic tick to emulate the firmware:
+#    JesdEmulateModel   : JesdRx/JesdTx DataValid follows Enable (GT reset held low)
+#    DaqMuxEmulateModel : DaqMuxV2 software trigger counts and streams a waveform
+#    RingEmulateModel   : AxiStreamDmaRingWrite rings fill, wrap, trigger and freeze
+# Every transaction can be delayed by a configurable latency.
+#-----------------------------------------------------------------------------
+# This file is part of the AmcCarrier Core. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the AmcCarrierCore, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import time
+import heapq
+import bisect
+import threading
+import numpy as np
+import pyrogue
+import rogue.interfaces.memory as rim
+import rogue.interfaces.stream as ris
+
+import surf.axi                as axi
+import surf.protocols.jesd204b as jesd
+import AmcCarrierCore.DaqMuxV2 as daqMuxV2
+
+from AmcCarrierCore.AppTop._RootTransport import Transport, registerTransport
+
+EmulatePageSize = 0x1000
+
+class EmulateField(object):
+    # Bit field of a RemoteVariable in the emulator backing store
+    def __init__(self, emu, var):
+        bitOffset = var.bitOffset if isinstance(var.bitOffset, (list,tuple)) else [var.bitOffset]
+        bitSize   = var.bitSize   if isinstance(var.bitSize,   (list,tuple)) else [var.bitSize]
+        self._emu    = emu
+        self.address = var.address + (bitOffset[0] // 8)
+        self._shift  = bitOffset[0] % 8
+        self._mask   = (1 << bitSize[0]) - 1
+        self._nbytes = (self._shift + bitSize[0] + 7) // 8
+
+    def get(self):
+        raw = int.from_bytes(self._emu.peek(self.address, self._nbytes), 'little')
+        return (raw >> self._shift) & self._mask
+
+    def set(self, value):
+        raw = int.from_bytes(self._emu.peek(self.address, self._nbytes), 'little')
+        raw = (raw & ~(self._mask << self._shift)) | ((int(value) & self._mask) << self._shift)
+        self._emu.poke(self.address, raw.to_bytes(self._nbytes, 'little'))
+
+class EmulateStream(object):
+    """
+    Stream side of the emulator, mirroring the application(dest) interface
+    of pyrogue.protocols.UdpRssiPack
+    """
+    def __init__(self):
+        self._masters = {}
+
+    def application(self, dest):
+        if dest not in self._masters:
+            self._masters[dest] = ris.Master()
+        return self._masters[dest]
+
+    def send(self, dest, data, frameSize=4096, header=None, eofe=False):
+        """
+        Send header followed by the bytes of data to dest in frames of at most
+        frameSize bytes, returns the number of frames. The frames carry the
+        DaqLane.vhd SSI framing: SOF (firstUser bit 1) on every frame, EOFE
+        (lastUser bit 0) on the last one if eofe is set.
+        """
+        master = self.application(dest)
+        data   = np.ascontiguousarray(data).view(np.uint8)
+        if header is not None:
+            data = np.concatenate([np.ascontiguousarray(header).view(np.uint8), data])
+        count  = 0
+        for pos in range(0, data.size, frameSize):
+            chunk = data[pos:pos+frameSize]
+            frame = master._reqFrame(chunk.size, True)
+            frame.write(bytearray(chunk.tobytes()), 0)
+            frame.setChannel(dest & 0xFF)
+            frame.setFirstUser(0x2)
+            frame.setLastUser(0x1 if (eofe and (pos+frameSize >= data.size)) else 0x0)
+            master._sendFrame(frame)
+            count += 1
+        return count
+
+class EmulateModel(object):
+    """
+    Base class of the behavioural models. bind() is called once the tree is
+    started and hooks the registers of the devices found under root with
+    emu.watch(), tick(now) is called every emu tickPeriod.
+    """
+    def bind(self, emu, root):
+        pass
+
+    def tick(self, now):
+        pass
+
+class JesdEmulateModel(EmulateModel):
+    def __init__(self, lockTime=0.0, sysRefPeriod=256):
+        self._lockTime     = lockTime
+        self._sysRefPeriod = sysRefPeriod
+        self._links        = []
+
+    def bind(self, emu, root):
+        for dev in root.find(typ=jesd.JesdRx) + root.find(typ=jesd.JesdTx):
+            link = {
+                'Enable'    : emu.field(dev.Enable),
+                'ResetGTs'  : emu.field(dev.ResetGTs),
+                'DataValid' : emu.field(dev.DataValid),
+                'State'     : None,
+                'Due'       : None,
+            }
+            for name in ['SysRefPeriodmin', 'SysRefPeriodmax']:
+                emu.field(getattr(dev, name)).set(self._sysRefPeriod)
+            emu.watch(dev.Enable,   lambda link=link: self._update(link))
+            emu.watch(dev.ResetGTs, lambda link=link: self._update(link))
+            self._links.append(link)
+
+    def _update(self, link):
+        # Other fields share the register words, act on Enable/ResetGTs changes only
+        state = (link['Enable'].get(), link['ResetGTs'].get())
+        if state == link['State']:
+            return
+        link['State'] = state
+
+        # Links drop at once and lock lockTime after the GT reset is released
+        link['DataValid'].set(0)
+        link['Due'] = None
+        if (not link['ResetGTs'].get()) and link['Enable'].get():
+            link['Due'] = time.monotonic() + self._lockTime
+            self.tick(time.monotonic())
+
+    def tick(self, now):
+        for link in self._links:
+            if (link['Due'] is not None) and (now >= link['Due']):
+                link['DataValid'].set(link['Enable'].get())
+                link['Due'] = None
+
+class DaqMuxEmulateModel(EmulateModel):
+    def __init__(self, destBase=0x80, frameSize=4096, waveform=None):
+        self._destBase  = destBase
+        self._frameSize = frameSize
+        self._waveform  = waveform if waveform is not None else self.ramp
+
+    @staticmethod
+    def ramp(mux, buffer, trigCount, size):
+        """
+        Default waveform: a 32-bit ramp offset by the trigger count
+        """
+        return (np.arange(size, dtype=np.uint32) + np.uint32(trigCount)).astype('<u4')
+
+    def bind(self, emu, root):
+        for mux, dev in enumerate(root.find(typ=daqMuxV2.DaqMuxV2)):
+            nbuf = len(dev.FrameCnt)
+            for j in range(nbuf):
+                for name in ['StreamReady', 'InputDataValid', 'StreamEnabled']:
+                    emu.field(getattr(dev, name)[j]).set(1)
+            emu.watch(dev.TriggerSw,          lambda emu=emu, dev=dev, mux=mux: self._trigger(emu, dev, mux), edge=True)
+            emu.watch(dev.TriggerHwArm,       lambda emu=emu, dev=dev: emu.field(dev.TriggerHwArmed).set(1), edge=True)
+            emu.watch(dev.TriggerClearStatus, lambda emu=emu, dev=dev: self._clear(emu, dev), edge=True)
+
+    def _clear(self, emu, dev):
+        for var in [dev.TriggerSwStatus, dev.TriggerCascStatus, dev.TriggerHwStatus, dev.TriggerStatus]:
+            emu.field(var).set(0)
+
+    def _trigger(self, emu, dev, mux):
+        trigCount = emu.field(dev.TrigCount)
+        count     = (trigCount.get() + 1) & 0xFFFFFFFF
+        trigCount.set(count)
+        emu.field(dev.TriggerSwStatus).set(1)
+        emu.field(dev.TriggerStatus).set(1)
+
+        # Seconds:nanoseconds timing timestamp
+        now       = time.time()
+        timestamp = (int(now) << 32) | int((now % 1) * 1e9)
+        emu.field(dev.Timestamp[0]).set(timestamp >> 32)
+        emu.field(dev.Timestamp[1]).set(timestamp & 0xFFFFFFFF)
+
+        size = emu.field(dev.DataBufferSize).get()
+        if size == 0:
+            return
+
+        hdrEn   = emu.field(dev.PacketHeaderEn).get()
+        rateDiv = emu.field(dev.DecimationRateDiv).get()
+
+        nbuf = len(dev.FrameCnt)
+        for j in range(nbuf):
+            data   = self._waveform(mux, j, count, size)
+            header = self._header(data, timestamp, mux & 0x1, j, rateDiv, emu.field(dev.FormatDataWidth[j]).get()) if hdrEn else None
+            frames = -(-(data.nbytes + (0 if header is None else header.nbytes)) // self._frameSize)
+            frameCnt = emu.field(dev.FrameCnt[j])
+            frameCnt.set(frameCnt.get() + frames)
+
+            # Frames are sent once the emulator lock is released
+            dest = self._destBase + mux*nbuf + j
+            emu.defer(lambda dest=dest, data=data, header=header: emu.stream.send(dest, data, self._frameSize, header))
+
+    @staticmethod
+    def _header(data, timestamp, bay, axiNum, rateDiv, data16):
+        # DaqLane.vhd packet header, packetSize in 32-bit words with the header
+        hdr = np.zeros(1, dtype=daqMuxV2.DaqMuxV2HeaderType)
+        hdr['timestamp']  = [timestamp & 0xFFFFFFFF, timestamp >> 32]
+        hdr['packetSize'] = (hdr.nbytes + data.nbytes + 3) // 4
+        hdr['flags']      = (data16 << 23) | (bay << 20) | (axiNum << 16) | (rateDiv & 0xFFFF)
+        return hdr
+
+class RingEmulateModel(EmulateModel):
+    def __init__(self, fillRate=1.0e6, dram=None):
+        self._fillRate = fillRate
+        self._dram     = dram
+        self._rings    = []
+        self._last     = None
+
+    def bind(self, emu, root):
+        dram = self._dram if self._dram is not None else emu
+        for dev in root.find(typ=axi.AxiStreamDmaRingWrite):
+            for j in range(len(dev.WrAddr)):
+                ring = {name: emu.field(getattr(dev, name)[j]) for name in ['StartAddr', 'EndAddr', 'WrAddr', 'Enabled', 'Full', 'Done', 'Empty', 'Triggered']}
+                ring['Dram'] = dram
+                ring['Fill'] = 0.0
+                emu.watch(dev.Init[j],        lambda ring=ring: self._init(ring),    edge=True)
+                emu.watch(dev.SoftTrigger[j], lambda ring=ring: self._trigger(ring), edge=True)
+                self._init(ring)
+                self._rings.append(ring)
+
+    def _init(self, ring):
+        ring['WrAddr'].set(ring['StartAddr'].get())
+        for name in ['Full', 'Done', 'Triggered']:
+            ring[name].set(0)
+        ring['Empty'].set(1)
+        ring['Fill'] = 0.0
+
+    def _trigger(self, ring):
+        ring['Triggered'].set(1)
+        ring['Done'].set(1)
+
+    def tick(self, now):
+        dt = 0.0 if self._last is None else (now - self._last)
+        self._last = now
+
+        for ring in self._rings:
+            start = ring['StartAddr'].get()
+            end   = ring['EndAddr'].get()
+            if (not ring['Enabled'].get()) or ring['Done'].get() or (end <= start):
+                continue
+
+            # Whole 32-bit words written since the last tick
+            ring['Fill'] = min(ring['Fill'] + self._fillRate * dt, end - start)
+            nbytes = min(int(ring['Fill']) & ~0x3, end - start)
+            if nbytes == 0:
+                continue
+            ring['Fill'] -= nbytes
+
+            wr = ring['WrAddr'].get()
+            if not (start <= wr < end):
+                wr = start
+
+            # Write a ramp of the DDR word addresses, split at the end of the ring
+            first = min(nbytes, end - wr)
+            for addr, size in [(wr, first), (start, nbytes - first)]:
+                if size > 0:
+                    ring['Dram'].poke(addr, (np.arange(addr >> 2, (addr + size) >> 2, dtype=np.uint64) & np.uint64(0xFFFFFFFF)).astype('<u4').tobytes())
+
+            if nbytes >= (end - wr):
+                ring['Full'].set(1)
+            ring['WrAddr'].set((wr + nbytes) if nbytes < (end - wr) else (start + nbytes - (end - wr)))
+            ring['Empty'].set(0)
+
+class RegisterEmulate(rim.Slave):
+    """
+    Behavioural memory slave, models default to the JESD, DaqMuxV2 and DMA
+    ring models. latency (seconds) delays the completion of every transaction.
+    """
+    def __init__(self, *, minWidth=4, maxSize=0xFFFFFFFF, latency=0.0, tickPeriod=0.1, models=None):
+        rim.Slave.__init__(self, minWidth, maxSize)
+        self._log        = pyrogue.logInit(cls=self)
+        self._minWidth   = minWidth
+        self._maxSize    = maxSize
+        self._pages      = {}
+        self._lock       = threading.RLock()
+        self._watchAddr  = []
+        self._watchFunc  = {}
+        self._deferred   = []
+        self._root       = None
+        self._bound      = False
+        self._queue      = []
+        self._seq        = 0
+        self._cond       = threading.Condition()
+        self._running    = False
+        self._tickPeriod = tickPeriod
+        self.latency     = latency
+        self.stream      = EmulateStream()
+        self.models      = models if models is not None else [JesdEmulateModel(), DaqMuxEmulateModel(), RingEmulateModel()]
+
+    def _doMinAccess(self):
+        return self._minWidth
+
+    def _doMaxAccess(self):
+        return self._maxSize
+
+    def attach(self, root):
+        """
+        Bind the models to the devices of root, done on the first transaction
+        """
+        self._root = root
+        self._bound = False
+        self._start()
+
+    def _start(self):
+        with self._cond:
+            if not self._running:
+                self._running = True
+                threading.Thread(target=self._worker, daemon=True).start()
+
+    def _stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    ##############################
+    # Backing store
+    ##############################
+
+    def peek(self, address, size):
+        """
+        Returns size bytes at address
+        """
+        out = bytearray(size)
+        pos = 0
+        while pos < size:
+            page, off = divmod(address + pos, EmulatePageSize)
+            n = min(size - pos, EmulatePageSize - off)
+            if page in self._pages:
+                out[pos:pos+n] = self._pages[page][off:off+n]
+            pos += n
+        return out
+
+    def poke(self, address, data):
+        """
+        Write the bytes of data at address
+        """
+        data = memoryview(data).cast('B')
+        pos  = 0
+        while pos < len(data):
+            page, off = divmod(address + pos, EmulatePageSize)
+            n = min(len(data) - pos, EmulatePageSize - off)
+            self._pages.setdefault(page, bytearray(EmulatePageSize))[off:off+n] = data[pos:pos+n]
+            pos += n
+
+    def field(self, var):
+        return EmulateField(self, var)
+
+    ##############################
+    # Model hooks
+    ##############################
+
+    def watch(self, var, func, edge=False):
+        """
+        Call func() after every write overlapping the register of var, or
+        with edge only when the value of var goes from 0 to non zero
+        """
+        field = self.field(var)
+        addr  = field.address & ~0x3
+
+        if edge:
+            level = [field.get()]
+            def risingEdge(func=func):
+                prev, level[0] = level[0], field.get()
+                if level[0] and not prev:
+                    func()
+            func = risingEdge
+
+        if addr not in self._watchFunc:
+            bisect.insort(self._watchAddr, addr)
+            self._watchFunc[addr] = []
+        self._watchFunc[addr].append(func)
+
+    def defer(self, func):
+        """
+        Run func() once the current transaction is completed
+        """
+        self._deferred.append(func)
+
+    def _bind(self):
+        if self._bound or (self._root is None):
+            return
+        self._bound = True
+        for model in self.models:
+            model.bind(self, self._root)
+
+    ##############################
+    # Transactions
+    ##############################
+
+    def _doTransaction(self, transaction):
+        if self.latency > 0:
+            with self._cond:
+                heapq.heappush(self._queue, (time.monotonic() + self.latency, self._seq, transaction))
+                self._seq += 1
+                self._cond.notify()
+        else:
+            self._service(transaction)
+
+    def _service(self, transaction):
+        with self._lock:
+            self._bind()
+            with transaction.lock():
+                if transaction.expired():
+                    return
+
+                address = transaction.address()
+                size    = transaction.size()
+
+                if transaction.type() in (rim.Write, rim.Post):
+                    data = bytearray(size)
+                    transaction.getData(data, 0)
+                    self.poke(address, data)
+
+                    lo = bisect.bisect_left(self._watchAddr, address & ~0x3)
+                    hi = bisect.bisect_left(self._watchAddr, address + size)
+                    for addr in self._watchAddr[lo:hi]:
+                        for func in self._watchFunc[addr]:
+                            func()
+                else:
+                    transaction.setData(self.peek(address, size), 0)
+
+                transaction.done()
+
+            deferred, self._deferred = self._deferred, []
+
+        for func in deferred:
+            try:
+                func()
+            except Exception as e:
+                self._log.exception(e)
+
+    def _worker(self):
+        nextTick = time.monotonic()
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                now  = time.monotonic()
+                due  = self._queue[0][0] if self._queue else nextTick
+                if min(due, nextTick) > now:
+                    self._cond.wait(min(due, nextTick) - now)
+                    continue
+                ready = []
+                while self._queue and (self._queue[0][0] <= now):
+                    ready.append(heapq.heappop(self._queue)[2])
+
+            for transaction in ready:
+                self._service(transaction)
+
+            if now >= nextTick:
+                nextTick = now + self._tickPeriod
+                with self._lock:
+                    if self._bound:
+                        for model in self.models:
+                            try:
+                                model.tick(now)
+                            except Exception as e:
+                                self._log.exception(e)
+                    deferred, self._deferred = self._deferred, []
+                for func in deferred:
+                    try:
+                        func()
+                    except Exception as e:
+                        self._log.exception(e)
+
+def _emulate(ip, latency=0.0, models=None):
+    emu = RegisterEmulate(latency=latency, models=models)
+    return Transport(emu, emu.stream, emulate=emu)
+
+registerTransport('emulate', _emulate)
@@ -16,25 +16,14 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
-import pyrogue
-import rogue.protocols.udp
-import rogue.protocols.srp
-
+from AmcCarrierCore.AppTop._RootTransport import RootTransport
 from AmcCarrierCore.AppTop import TopLevel as FpgaTopLevel
 
-class RootFsbl(pyrogue.Root):
+class RootFsbl(RootTransport):
     def __init__(self, *, ipAddr='10.0.0.1', name='base', description = '', **kwargs):
 
-        pyrogue.Root.__init__(self, name=name, description=description, **kwargs)
-
-        self.srp=pyrogue.interfaces.simulation.MemEmulate()
-
-        # UDP only
-        self.udp = rogue.protocols.udp.Client(ipAddr,8192,0)
-
-        # Connect the SRPv0 to RAW UDP
-        self.srp = rogue.protocols.srp.SrpV0()
-        pyrogue.streamConnectBiDir( self.srp, self.udp )
+        # SRPv0 on RAW UDP
+        RootTransport.__init__(self, commType='eth-fsbl', ip=ipAddr, name=name, description=description, **kwargs)
 
         self.stream = None
 
@@ -16,18 +16,37 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
-import pyrogue
 import pyrogue.interfaces.simulation
 
-class RootMemEmulate(pyrogue.Root):
-    def __init__(self, *, name='base', description = '', **kwargs):
+from AmcCarrierCore.AppTop._RootTransport   import RootTransport, Transport, TransportPool, registerTransport
+from AmcCarrierCore.AppTop._RegisterEmulate import RegisterEmulate
 
-        pyrogue.Root.__init__(self, name=name, description=description, **kwargs)
+# Plain RAM
+registerTransport('mem-emulate', lambda ip: Transport(pyrogue.interfaces.simulation.MemEmulate()))
 
-        self.srp=pyrogue.interfaces.simulation.MemEmulate()
-        self.stream = None
+class RootMemEmulate(RootTransport):
+    def __init__(self, *, name='base', description = '', behavioural=True, latency=0.0, models=None, ipAddr=None, pool=None, **kwargs):
+
+        # An emulated carrier is private to the root unless it is given an ipAddr
+        if (pool is None) and (ipAddr is None):
+            pool = TransportPool()
+
+        # Register map emulation with the JESD, DaqMuxV2 and DMA ring models, or plain RAM
+        RootTransport.__init__(self,
+                               commType      = 'emulate' if behavioural else 'mem-emulate',
+                               ip            = ipAddr,
+                               pool          = pool,
+                               transportArgs = {'latency': latency, 'models': models} if behavioural else None,
+                               name          = name,
+                               description   = description,
+                               **kwargs)
 
         # Top level module should be added here.
         # Top level is a sub-class of AmcCarrierCore.AppTop.TopLevel
         # SRP interface should be passed as an arg
         # self.add(FpgaTopLevel(memBase=self.srp))
+
+    def start(self, **kwargs):
+        if isinstance(self._transport.srp, RegisterEmulate):
+            self._transport.srp.attach(self)
+        RootTransport.start(self, **kwargs)
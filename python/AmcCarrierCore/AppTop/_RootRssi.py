@@ -16,24 +16,14 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
-import pyrogue
-import pyrogue.protocols
-import rogue.protocols.srp
+from AmcCarrierCore.AppTop._RootTransport import RootTransport
 
-class RootRssi(pyrogue.Root):
+class RootRssi(RootTransport):
     def __init__(self, *, ipAddr='10.0.0.1', name='base', description = '', **kwargs):
 
-        pyrogue.Root.__init__(self, name=name, description=description, **kwargs)
-
-        # Create SRP/ASYNC_MSG interface
-        self.rudp = pyrogue.protocols.UdpRssiPack( name='rudpReg', host=ipAddr, port=8193, packVer = 1, jumbo = False)
-
-        # Connect the SRPv3 to tDest = 0x0
-        self.srp = rogue.protocols.srp.SrpV3()
-        pyrogue.streamConnectBiDir( self.srp, self.rudp.application(dest=0x0) )
-
-        # Create stream interface
-        self.stream = pyrogue.protocols.UdpRssiPack( name='rudpData', host=ipAddr, port=8194, packVer = 1, jumbo = False)
+        # SRPv3 on RSSI port 8193 (tDest = 0x0) and the stream interface on RSSI port 8194,
+        # shared with the other roots of the process on the same carrier
+        RootTransport.__init__(self, commType='eth-rssi-non-interleaved', ip=ipAddr, name=name, description=description, **kwargs)
 
         # Top level module should be added here.
         # Top level is a sub-class of AmcCarrierCore.AppTop.TopLevel
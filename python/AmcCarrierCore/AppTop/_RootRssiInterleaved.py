@@ -16,21 +16,14 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
-import pyrogue
-import pyrogue.protocols
-import rogue.protocols.srp
+from AmcCarrierCore.AppTop._RootTransport import RootTransport
 
-class RootRssiInterleaved(pyrogue.Root):
+class RootRssiInterleaved(RootTransport):
     def __init__(self, *, ipAddr='10.0.0.1', name='base', description = '', **kwargs):
 
-        pyrogue.Root.__init__(self, name=name, description=description, **kwargs)
-
-        # Create Interleaved RSSI interface
-        self.rudp = self.stream = pyrogue.protocols.UdpRssiPack( name='rudp', host=ipAddr, port=8198, packVer = 2, jumbo = True)
-
-        # Connect the SRPv3 to tDest = 0x0
-        self.srp = rogue.protocols.srp.SrpV3()
-        pyrogue.streamConnectBiDir( self.srp, self.rudp.application(dest=0x0) )
+        # SRPv3 (tDest = 0x0) and streams on the interleaved RSSI port 8198,
+        # shared with the other roots of the process on the same carrier
+        RootTransport.__init__(self, commType='eth-rssi-interleaved', ip=ipAddr, name=name, description=description, **kwargs)
 
         # Top level module should be added here.
         # Top level is a sub-class of AmcCarrierCore.AppTop.TopLevel
@@ -0,0 +1,229 @@
+#-----------------------------------------------------------------------------
+# Title      : AmcCarrierCore Root Transports
+#-----------------------------------------------------------------------------
+# File       : RootTransport.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# Registry of the carrier transports (SRP memory interface and data stream)
+# selected by commType, and a reference counted pool sharing one transport
+# (UDP/RSSI clients, SRP and their receive threads) per carrier IP between
+# all the roots of a process.
+#
+# A transport factory is a callable(ip, **kwargs) returning a Transport.
+# Local stand-in transports register themselves with registerTransport().
+#-----------------------------------------------------------------------------
+# This file is part of the AmcCarrier Core. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the AmcCarrierCore, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import time
+import threading
+import pyrogue
+import pyrogue.protocols
+import rogue.protocols.udp
+import rogue.protocols.srp
+
+from AmcCarrierCore._StartupProfiler import StartupProfiler
+
+_transportTypes = {}
+
+_log = pyrogue.logInit(name='RootTransport')
+
+def registerTransport(commType, factory):
+    """
+    Register factory(ip, **kwargs) -> Transport for commType
+    """
+    _transportTypes[commType] = factory
+
+def transportTypes():
+    """
+    Returns the registered commType names
+    """
+    return sorted(_transportTypes.keys())
+
+class Transport(object):
+    """
+    srp is the memory interface, stream the data stream interface (None if
+    not available). links holds the underlying objects by name (udp, rudp,
+    ...), stopped by close(). The links are shared by all the users of the
+    transport and must not be added to a tree: a root stops the devices it
+    holds (UdpRssiPack is a pyrogue Device) when it stops.
+    """
+    def __init__(self, srp, stream=None, **links):
+        self.srp     = srp
+        self.stream  = stream
+        self.links   = links
+        self._closed = False
+
+    def isLink(self, node):
+        """
+        Returns True if node is one of the links of the transport
+        """
+        return any(node is link for link in self.links.values())
+
+    def close(self):
+        """
+        Stop the links once, a link already stopped is skipped
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        # The same object may be registered under several names (rudp/stream)
+        for link in {id(link): link for link in self.links.values()}.values():
+            try:
+                link._stop()
+            except Exception as e:
+                _log.warning(f'Transport link {link} stop failed: {e}')
+
+class TransportPool(object):
+    """
+    Reference counted transports, one per (commType, ip)
+    """
+    def __init__(self):
+        self._lock       = threading.Lock()
+        self._transports = {}
+
+    def acquire(self, commType, ip, **kwargs):
+        """
+        Returns the transport of commType to ip, opened on the first use.
+        kwargs are only used to open it.
+        """
+        if commType not in _transportTypes:
+            raise ValueError("Invalid type (%s)" % (commType) )
+
+        with self._lock:
+            key = (commType, ip)
+            if key not in self._transports:
+                self._transports[key] = [_transportTypes[commType](ip, **kwargs), 0]
+            entry = self._transports[key]
+            entry[1] += 1
+            return entry[0]
+
+    def release(self, transport):
+        """
+        Release a transport, closed when its last user releases it
+        """
+        with self._lock:
+            for key, entry in self._transports.items():
+                if entry[0] is transport:
+                    entry[1] -= 1
+                    if entry[1] == 0:
+                        del self._transports[key]
+                        transport.close()
+                    return
+
+    def usage(self):
+        """
+        Returns {(commType, ip): users}
+        """
+        with self._lock:
+            return {key: entry[1] for key, entry in self._transports.items()}
+
+defaultTransportPool = TransportPool()
+
+class RootTransport(pyrogue.Root):
+    """
+    Root on a pooled transport: self.srp and self.stream are those of the
+    transport, and the named links are set as attributes (self.udp,
+    self.rudp, ...). The transport is released when the root stops. The
+    links are shared with the other roots of the pool, add() refuses them.
+
+    With profile set, self.profiler (StartupProfiler) records the root
+    construction, start(), LoadConfig() and the writeBlocks()/Init phases,
+    with the transactions counted on self.srp. The per phase summary is the
+    StartupProfile variable.
+    """
+    def __init__(self, *, commType, ip, pool=None, transportArgs=None, profile=False, **kwargs):
+
+        self._constructStart = time.monotonic()
+        self.profiler        = StartupProfiler() if profile else None
+
+        pyrogue.Root.__init__(self, **kwargs)
+
+        self._pool      = pool if pool is not None else defaultTransportPool
+        self._transport = self._pool.acquire(commType, ip, **(transportArgs or {}))
+
+        self.srp    = self._transport.srp
+        self.stream = self._transport.stream
+        for name, link in self._transport.links.items():
+            setattr(self, name, link)
+
+        if self.profiler is not None:
+            self.srp = self.profiler.hub(self._transport.srp)
+
+            self.add(pyrogue.LocalVariable(
+                name         = "StartupProfile",
+                description  = "Wall time, transactions, bytes and sleep time (seconds) per startup phase",
+                mode         = "RO",
+                value        = {},
+                localGet     = lambda: self.profiler.summary(),
+            ))
+
+    def add(self, node):
+        # A root stops its devices when it stops, a pooled link would be stopped for all its users
+        transport = getattr(self, '_transport', None)
+        for n in (node if isinstance(node, list) else [node]):
+            if (transport is not None) and transport.isLink(n):
+                raise pyrogue.NodeError(f'{self.path}: the pooled transport link {n.name} is shared between roots and cannot be added to the tree')
+        pyrogue.Root.add(self, node)
+
+    def start(self, **kwargs):
+        if self.profiler is None:
+            pyrogue.Root.start(self, **kwargs)
+            return
+
+        # The devices are added between the construction and start()
+        self.profiler.record(f'{self.name}.construct', self._constructStart, time.monotonic())
+        self.profiler.instrument(self)
+        with self.profiler.phase(f'{self.name}.start'):
+            pyrogue.Root.start(self, **kwargs)
+
+    def stop(self):
+        pyrogue.Root.stop(self)
+        if self._transport is not None:
+            self._pool.release(self._transport)
+            self._transport = None
+
+def _ethFsbl(ip):
+    # UDP only
+    udp = rogue.protocols.udp.Client(ip,8192,0)
+
+    # Connect the SRPv0 to RAW UDP
+    srp = rogue.protocols.srp.SrpV0()
+    pyrogue.streamConnectBiDir( srp, udp )
+
+    return Transport(srp, udp=udp)
+
+def _ethRssiNonInterleaved(ip):
+    # Create SRP/ASYNC_MSG interface
+    rudp = pyrogue.protocols.UdpRssiPack( name='rudpReg', host=ip, port=8193, packVer = 1, jumbo = False)
+
+    # Connect the SRPv3 to tDest = 0x0
+    srp = rogue.protocols.srp.SrpV3()
+    pyrogue.streamConnectBiDir( srp, rudp.application(dest=0x0) )
+
+    # Create stream interface
+    stream = pyrogue.protocols.UdpRssiPack( name='rudpData', host=ip, port=8194, packVer = 1, jumbo = False)
+
+    return Transport(srp, stream, rudp=rudp, rudpData=stream)
+
+def _ethRssiInterleaved(ip):
+    # Create Interleaved RSSI interface
+    rudp = pyrogue.protocols.UdpRssiPack( name='rudp', host=ip, port=8198, packVer = 2, jumbo = True)
+
+    # Connect the SRPv3 to tDest = 0x0
+    srp = rogue.protocols.srp.SrpV3()
+    pyrogue.streamConnectBiDir( srp, rudp.application(dest=0x0) )
+
+    return Transport(srp, rudp, rudp=rudp)
+
+registerTransport('eth-fsbl',                 _ethFsbl)
+registerTransport('eth-rssi-non-interleaved', _ethRssiNonInterleaved)
+registerTransport('eth-rssi-interleaved',     _ethRssiInterleaved)
@@ -25,12 +25,14 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
+import time
 import pyrogue as pr
 # import pyrogue.interfaces.simulation
 # import pyrogue.protocols
 # import pyrogue.utilities.fileio
 import AmcCarrierCore as amccCore
-from AmcCarrierCore.AppTop._AppTop import AppTop
+from AmcCarrierCore.AppTop._AppTop  import AppTop, _runConcurrent, _timed, _writeSubtree, _pipelined
+from AmcCarrierCore.AppTop._AppCore import AppCore
 
 class TopLevel(pr.Device):
     def __init__(   self,
@@ -49,6 +51,12 @@ class TopLevel(pr.Device):
             enableBsa       = False,
             enableMps       = False,
             numWaveformBuffers  = 4,
+            daqMuxStatusSnapshot = False,
+            mpsStatusSnapshot    = False,
+            mpsLinkMonitor       = False,
+            pipelineLoad    = False,
+            lazyDevices     = False,
+            adaptivePoll    = False,
             expand          = True,
             enableTpgMini   = True,
             **kwargs):
@@ -57,6 +65,7 @@ class TopLevel(pr.Device):
         self._numRxLanes = numRxLanes
         self._numTxLanes = numTxLanes
         self._numWaveformBuffers = numWaveformBuffers
+        self._loadTiming = {}
 
         # Add devices
         self.add(amccCore.AmcCarrierCore(
@@ -64,8 +73,11 @@ class TopLevel(pr.Device):
             enablePwrI2C      = enablePwrI2C,
             enableBsa         = enableBsa,
             enableMps         = enableMps,
+            mpsStatusSnapshot = mpsStatusSnapshot,
+            mpsLinkMonitor    = mpsLinkMonitor,
             numWaveformBuffers= numWaveformBuffers,
             enableTpgMini     = enableTpgMini,
+            lazyDevices       = lazyDevices,
         ))
         self.add(AppTop(
             offset       = 0x80000000,
@@ -76,9 +88,29 @@ class TopLevel(pr.Device):
             sizeSigGen   = sizeSigGen,
             modeSigGen   = modeSigGen,
             numWaveformBuffers = numWaveformBuffers,
+            daqMuxStatusSnapshot = daqMuxStatusSnapshot,
             expand       = True
         ))
 
+        # Coalesced, adaptive polling of the pollInterval variables of this FPGA
+        if adaptivePoll:
+            self.add(amccCore.PollScheduler(scope=self))
+
+        self.add(pr.LocalVariable(
+            name         = "PipelineLoad",
+            description  = "Write the independent subtrees concurrently during writeBlocks() and only retire transactions at the ordering dependencies",
+            mode         = "RW",
+            value        = pipelineLoad,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "LoadTiming",
+            description  = "Time spent (seconds) per subtree and per stage during the last writeBlocks()",
+            mode         = "RO",
+            value        = {},
+            localGet     = lambda: self._loadTiming,
+        ))
+
         # Define SW trigger command
         @self.command(description="Software Trigger for DAQ MUX",)
         def SwDaqMuxTrig():
@@ -86,34 +118,56 @@ class TopLevel(pr.Device):
                 self.AppTop.DaqMuxV2[i].TriggerDaq.call()
 
     def writeBlocks(self, **kwargs):
+        # Only a full recursive load is staged, a variable set() writes its block
+        if self.PipelineLoad.value() and kwargs.get('recurse', True) and (kwargs.get('variable') is None):
+            with _pipelined():
+                self._pipelinedWriteBlocks(**kwargs)
+            return
+
+        start = time.monotonic()
         super().writeBlocks(**kwargs)
 
         # Retire any in-flight transactions before starting
         self._root.checkBlocks(recurse=True)
 
-        # Calculate the BsaWaveformEngine buffer sizes
-        size    = [[0]*self._numWaveformBuffers,[0]*self._numWaveformBuffers]
-        for i in range(2):
-            if ((self._numRxLanes[i] > 0) or (self._numTxLanes[i] > 0)):
-                for j in range(self._numWaveformBuffers):
-                    waveBuff = self.AmcCarrierCore.AmcCarrierBsa.BsaWaveformEngine[i].WaveformEngineBuffers
-                    if ( (waveBuff.Enabled[j].get() > 0) and (waveBuff.EndAddr[j].get() > waveBuff.StartAddr[j].get()) ):
-                        size[i][j] = waveBuff.EndAddr[j].get() - waveBuff.StartAddr[j].get()
+        self._setDaqMuxBufferSize()
+        self._loadTiming = {'Total': time.monotonic() - start}
 
-        # Calculate the
-        minSize = [size[0][0],size[1][0]]
-        for i in range(2):
-            if ((self._numRxLanes[i] > 0) or (self._numTxLanes[i] > 0)):
-                for j in range(self._numWaveformBuffers):
-                    if ( size[i][j]<minSize[i] ):
-                        minSize[i] = size[i][j]
+    def _pipelinedWriteBlocks(self, **kwargs):
+        timing = {}
+        start  = time.monotonic()
+        kwargs.pop('recurse', None)
+
+        # Local blocks
+        super().writeBlocks(recurse=False, **kwargs)
+
+        # Stage 1: AmcCarrierCore and the AppTop configuration have no ordering dependency,
+        # the AMC hardware (AppCore) is left to stage 2
+        others = [dev for dev in self.devices.values() if dev not in [self.AmcCarrierCore, self.AppTop]]
+        _runConcurrent(
+            [lambda: _timed(timing, self.AmcCarrierCore.path, self.AmcCarrierCore.writeBlocks, recurse=True, pipelined=True, **kwargs),
+             lambda: _timed(timing, self.AppTop.path, self.AppTop.writeConfig, pipelined=True, timing=timing, appCore=False, **kwargs)] +
+            [lambda dev=dev: _timed(timing, dev.path, _writeSubtree, dev, **kwargs) for dev in others])
+
+        # Stage 2: the AMC clock configuration (LMK) depends on the carrier timing configuration
+        cores = [dev for dev in self.AppTop.devices.values() if isinstance(dev, AppCore)]
+        _runConcurrent([lambda dev=dev: _timed(timing, dev.path, _writeSubtree, dev, **kwargs) for dev in cores])
+
+        # Stage 3: the DaqMuxV2 buffer sizes depend on the BsaWaveformEngine configuration
+        # and the JESD Init() depends on the AMC hardware configuration
+        _timed(timing, 'BufferSize', self._setDaqMuxBufferSize)
+        _timed(timing, f'{self.AppTop.path}.Init', self.AppTop.Init)
+        self.AppTop.checkBlocks(recurse=True)
+
+        timing['Total'] = time.monotonic() - start
+        self._loadTiming = timing
 
-        # Set the DAQ MUX buffer sizes to match the BsaWaveformEngine buffer sizes
+    def _setDaqMuxBufferSize(self):
+        # Set the DAQ MUX buffer sizes to match the smallest BsaWaveformEngine buffer size
         for i in range(2):
             if ((self._numRxLanes[i] > 0) or (self._numTxLanes[i] > 0)):
+                minSize = self.AmcCarrierCore.AmcCarrierBsa.BsaWaveformEngine[i].bufferGeometry()['MinSize']
                 # Convert from bytes to words
-                minSize[i] = minSize[i] >> 2
-                # Set the DAQ MUX buffer sizes
-                self.AppTop.DaqMuxV2[i].DataBufferSize.set(minSize[i])
+                self.AppTop.DaqMuxV2[i].DataBufferSize.set(minSize >> 2)
 
         self.checkBlocks(recurse=True)
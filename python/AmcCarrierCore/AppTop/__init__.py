@@ -5,9 +5,11 @@ from AmcCarrierCore.AppTop._TopLevel import *
 from AmcCarrierCore.AppTop._AppCore  import *
 
 
+from AmcCarrierCore.AppTop._RootTransport       import *
+from AmcCarrierCore.AppTop._RegisterEmulate     import *
 from AmcCarrierCore.AppTop._RootBase            import *
 from AmcCarrierCore.AppTop._RootFsbl            import *
 from AmcCarrierCore.AppTop._RootMemEmulate      import *
 from AmcCarrierCore.AppTop._RootRssi            import *
 from AmcCarrierCore.AppTop._RootRssiInterleaved import *
-
+from AmcCarrierCore.AppTop._CrateManager        import *
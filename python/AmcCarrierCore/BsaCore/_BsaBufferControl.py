@@ -16,34 +16,113 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
+import threading
+import numpy    as np
 import pyrogue  as pr
 import surf.axi as axi
 
+from AmcCarrierCore._BurstAccess import burstRead
+
+# Decoded BSA timestamp table entry. The timing timestamp is seconds(63:32)
+# and nanoseconds(31:0), pulseId uses the LCLS-I convention of the pulse ID
+# held in the 17 LSBs of the nanoseconds.
+BsaTimestampType = np.dtype([
+    ('timestamp',   np.uint64),
+    ('seconds',     np.uint32),
+    ('nanoseconds', np.uint32),
+    ('pulseId',     np.uint32),
+])
+
 class BsaBufferControl(pr.Device):
     def __init__(   self,
             name        = "BsaBufferControl",
             description = "Configuration and status of the BSA diagnostic buffers",
+            numBuffers  = 64, # BSA_BUFFERS_G
             **kwargs):
         super().__init__(name=name, description=description, **kwargs)
 
+        self._numBuffers = numBuffers
+        self._tsLock     = threading.Lock()
+        self._tsRaw      = np.zeros(numBuffers, dtype=np.uint64)
+        self._tsTable    = np.zeros(numBuffers, dtype=BsaTimestampType)
+        self._tsChanged  = np.zeros(numBuffers, dtype=bool)
+
         ##############################
         # Variables
         ##############################
 
-        self.add(pr.RemoveVariable(
+        self.add(pr.RemoteVariable(
             name        = 'Timestamps',
-            description = '',
+            description = 'Timestamp of the last bsaDone per EDEF',
             offset      = 0x00,
-            bitSize     = 8*8*64, # Units of bits
-            numValues   = 64,
+            bitSize     = 64*numBuffers, # Units of bits
+            numValues   = numBuffers,
             valueBits   = 64,
             valueStride = 64,
-            verify      = False,
+            base        = pr.UInt,
             mode        = "RO",
         ))
 
+        self.add(pr.LocalVariable(
+            name        = 'TimestampTable',
+            description = 'Decoded timestamp table and the mask of the entries changed by the last refresh',
+            mode        = 'RO',
+            value       = {},
+            localGet    = lambda: self._timestampTableDict(self.refreshTimestamps()),
+        ))
+
         self.add(axi.AxiStreamDmaRingWrite(
             offset     =  0x00001000,
             name       = "BsaBuffers",
-            numBuffers =  1,
+            numBuffers =  numBuffers,
         ))
+
+    def refreshTimestamps(self, edefs=None):
+        """
+        Read the timestamp table in one burst and return the decoded table
+        (BsaTimestampType array). When edefs (bitmask or list of indexes) is
+        given only those entries are read. changedTimestamps() returns the
+        entries changed by this refresh.
+        """
+        if edefs is None:
+            idx = np.arange(self._numBuffers)
+        elif isinstance(edefs, int):
+            idx = np.flatnonzero([(edefs >> i) & 0x1 for i in range(self._numBuffers)])
+        else:
+            idx = np.unique(np.asarray(edefs, dtype=np.int64))
+
+        with self._tsLock:
+            self._tsChanged[:] = False
+            if idx.size == 0:
+                return self._tsTable.copy()
+
+            # Contiguous ranges of entries
+            split  = np.flatnonzero(np.diff(idx) > 1) + 1
+            starts = idx[np.concatenate([[0], split])]
+            stops  = idx[np.concatenate([split-1, [idx.size-1]])] + 1
+            raw    = burstRead(self, [(int(8*start), int(8*(stop-start))) for start, stop in zip(starts, stops)]).view('<u8')
+
+            changed = raw != self._tsRaw[idx]
+            self._tsRaw[idx]     = raw
+            self._tsChanged[idx] = changed
+
+            upd = idx[changed]
+            ts  = self._tsRaw[upd]
+            self._tsTable['timestamp'][upd]   = ts
+            self._tsTable['seconds'][upd]     = ts >> np.uint64(32)
+            self._tsTable['nanoseconds'][upd] = ts & np.uint64(0xFFFFFFFF)
+            self._tsTable['pulseId'][upd]     = ts & np.uint64(0x1FFFF)
+
+            return self._tsTable.copy()
+
+    def changedTimestamps(self):
+        """
+        Return the indexes of the entries changed by the last refresh
+        """
+        with self._tsLock:
+            return np.flatnonzero(self._tsChanged)
+
+    def _timestampTableDict(self, table):
+        ret = {name: table[name] for name in BsaTimestampType.names}
+        ret['changed'] = self.changedTimestamps()
+        return ret
@@ -0,0 +1,239 @@
+#-----------------------------------------------------------------------------
+# Title      : PyRogue BSA Ring Buffer Drain Engine
+#-----------------------------------------------------------------------------
+# File       : BsaRingDrain.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# Incremental reader of the BsaBufferControl DDR ring buffers (one per EDEF).
+#
+# Each BSA record written by BsaAccumulator is 32 entries of 96 bits:
+#    entry 0     : header, pulseId(15:0) in sum(31:16) and pulseId(63:16) in sumSq
+#    entry 1-31  : accumulated diagnostic channels 0-30
+# Entry fields:
+#    (12:0)  nacc
+#    (13)    sum exception
+#    (14)    variance exception
+#    (15)    fixed
+#    (47:16) sum
+#    (95:48) sum of squares
+#
+# The write pointer lapping the read pointer between two drains is detected
+# with the record drained last: the writer overwrites it before reaching the
+# read pointer, so its header no longer holds the pulse ID drained. The
+# overrun is counted and the reading restarts at the write pointer.
+#-----------------------------------------------------------------------------
+# This file is part of the rogue software platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue software platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import threading
+import concurrent.futures
+import numpy   as np
+import pyrogue as pr
+
+BsaEntryType = np.dtype([
+    ('w0', '<u4'),
+    ('w1', '<u4'),
+    ('w2', '<u4'),
+])
+
+BsaRecordEntries = 32 # NUM_ACCUMULATIONS_C + header
+BsaRecordSize    = BsaRecordEntries * BsaEntryType.itemsize
+
+def decodeBsaRecords(block):
+    """
+    Decode a (records, BsaRecordEntries) BsaEntryType block into a dict
+    of arrays. pulseId has one value per record, the other fields one
+    value per record and channel (header entry removed).
+    """
+    w0 = block['w0'].astype(np.uint64)
+    w1 = block['w1'].astype(np.uint64)
+    w2 = block['w2'].astype(np.uint64)
+
+    raw   = ((w0 >> np.uint64(16)) | ((w1 & np.uint64(0xFFFF)) << np.uint64(16))).astype(np.uint32)
+    sumSq = (w1 >> np.uint64(16)) | (w2 << np.uint64(16))
+
+    return {
+        'pulseId' : (sumSq[:,0] << np.uint64(16)) | (raw[:,0] >> np.uint32(16)).astype(np.uint64),
+        'nacc'    : (w0[:,1:] & np.uint64(0x1FFF)).astype(np.uint16),
+        'sumExc'  : ((w0[:,1:] >> np.uint64(13)) & np.uint64(0x1)).astype(bool),
+        'varExc'  : ((w0[:,1:] >> np.uint64(14)) & np.uint64(0x1)).astype(bool),
+        'fixed'   : ((w0[:,1:] >> np.uint64(15)) & np.uint64(0x1)).astype(bool),
+        'sum'     : raw[:,1:].view(np.int32),
+        'sumSq'   : sumSq[:,1:],
+    }
+
+class BsaRingDrain(pr.Device):
+    def __init__(   self,
+            name          = "BsaRingDrain",
+            description   = "BSA DDR ring buffer drain engine",
+            bufferControl = None, # BsaBufferControl device
+            dram          = None, # AmcCarrierDram device
+            chunkSize     = 0x60000,
+            doubleBuffer  = True,
+            **kwargs):
+        super().__init__(name=name, description=description, **kwargs)
+
+        self._bufferControl = bufferControl
+        self._dram          = dram
+        self._rdAddr        = {}
+        self._lastPulseId   = {}
+        self._lock          = threading.Lock()
+        self._recordCount   = 0
+        self._wrapCount     = 0
+        self._overrunCount  = 0
+
+        ##############################
+        # Variables
+        ##############################
+
+        self.add(pr.LocalVariable(
+            name         = "ChunkSize",
+            description  = "Maximum number of bytes per DDR read, rounded down to whole records",
+            mode         = "RW",
+            value        = chunkSize,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "DoubleBuffer",
+            description  = "Read the next chunk while the current one is processed",
+            mode         = "RW",
+            value        = doubleBuffer,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "RecordCount",
+            description  = "Number of records drained",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self._recordCount,
+            pollInterval = 1,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "WrapCount",
+            description  = "Number of ring wrap-arounds handled",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self._wrapCount,
+            pollInterval = 1,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "OverrunCount",
+            description  = "Number of drains that found the records not yet drained overwritten by the write pointer",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self._overrunCount,
+            pollInterval = 1,
+        ))
+
+        ##############################
+        # Commands
+        ##############################
+        @self.command(description="Reset the read pointers, the next drain starts from the current write pointers",)
+        def ResetPointers():
+            with self._lock:
+                self._rdAddr.clear()
+                self._lastPulseId.clear()
+
+    def _overrun(self, edef, start, end, rd):
+        # The record before the read pointer is the last one drained
+        with self._lock:
+            last = self._lastPulseId.get(edef)
+        if last is None:
+            return False
+        prev = (rd if rd > start else end) - BsaRecordSize
+        raw  = self._dram.read([(prev, BsaEntryType.itemsize)])
+        return decodeBsaRecords(raw.view(BsaEntryType).reshape(1, 1))['pulseId'][0] != last
+
+    def _readRing(self, buf, start, end, addr, nbytes):
+        # Split the read at the end of the ring
+        first  = min(nbytes, end-addr)
+        ranges = [(addr, first)]
+        if nbytes > first:
+            ranges.append((start, nbytes-first))
+        return self._dram.read(ranges, out=buf[:nbytes])
+
+    def drain(self, edef, fromStart=False):
+        """
+        Generator of the records written to the EDEF ring since the last
+        drain, as (records, BsaRecordEntries) BsaEntryType blocks of at most
+        ChunkSize bytes. A block is a view of an internal buffer and is only
+        valid until the generator is resumed (twice with DoubleBuffer).
+        On the first drain the reading starts at the current write pointer,
+        or at the start of the ring if fromStart is set.
+        """
+        ring      = self._bufferControl.BsaBuffers
+        variables = [ring.StartAddr[edef], ring.EndAddr[edef], ring.WrAddr[edef]]
+        ring.readBlocks(recurse=False, variable=variables)
+        ring.checkBlocks(recurse=False, variable=variables)
+        start, end, wr = [var.value() for var in variables]
+
+        with self._lock:
+            rd = self._rdAddr.get(edef)
+            if (rd is None) or not (start <= rd < end):
+                rd = start if fromStart else wr
+                self._rdAddr[edef] = rd
+                self._lastPulseId.pop(edef, None)
+
+        # The records not drained were overwritten, restart at the write pointer
+        if self._overrun(edef, start, end, rd):
+            self._log.warning(f'{self.path}: EDEF {edef} ring overrun, the write pointer lapped the read pointer, records lost')
+            self._overrunCount += 1
+            rd = wr
+            with self._lock:
+                self._rdAddr[edef] = rd
+                self._lastPulseId.pop(edef, None)
+
+        # Whole records available, accounting for the wrap-around
+        avail = (wr - rd) if (wr >= rd) else ((end - rd) + (wr - start))
+        nrec  = avail // BsaRecordSize
+        chunk = max(1, self.ChunkSize.value() // BsaRecordSize)
+
+        reqs = []
+        while nrec > 0:
+            n = min(nrec, chunk)
+            reqs.append((rd, n*BsaRecordSize))
+            rd += n*BsaRecordSize
+            if rd >= end:
+                rd = start + (rd - end)
+            nrec -= n
+
+        # With DoubleBuffer the chunk being prefetched, the one yielded and the
+        # previous one (still valid for the consumer) each have a buffer
+        double  = self.DoubleBuffer.value() and (len(reqs) > 1)
+        buffers = [np.empty(min(chunk, avail // BsaRecordSize)*BsaRecordSize, dtype=np.uint8) for _ in range(3 if double else 1)]
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+            fut = None
+            for i, (addr, nbytes) in enumerate(reqs):
+                buf = buffers[i % len(buffers)]
+                if double:
+                    if fut is None:
+                        fut = pool.submit(self._readRing, buf, start, end, addr, nbytes)
+                    data = fut.result()
+                    # Prefetch the next chunk into the next buffer
+                    if (i+1) < len(reqs):
+                        fut = pool.submit(self._readRing, buffers[(i+1) % 3], start, end, *reqs[i+1])
+                else:
+                    data = self._readRing(buf, start, end, addr, nbytes)
+
+                nxt = addr + nbytes
+                if nxt >= end:
+                    nxt = start + (nxt - end)
+                    self._wrapCount += 1
+
+                block = data.view(BsaEntryType).reshape(-1, BsaRecordEntries)
+                with self._lock:
+                    self._rdAddr[edef]      = nxt
+                    self._lastPulseId[edef] = decodeBsaRecords(block[-1:])['pulseId'][0]
+                self._recordCount += nbytes // BsaRecordSize
+
+                yield block
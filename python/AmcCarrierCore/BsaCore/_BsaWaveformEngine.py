@@ -6,6 +6,9 @@
 #-----------------------------------------------------------------------------
 # Description:
 # PyRogue BSA Waveform Engine Module
+#
+# The waveform buffers are read out of the carrier DDR through an
+# AmcCarrierDram device (the DDR SRPv3, not the register SRPv3).
 #-----------------------------------------------------------------------------
 # This file is part of the rogue software platform. It is subject to
 # the license terms in the LICENSE.txt file found in the top-level directory
@@ -16,14 +19,50 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
+import threading
+import numpy    as np
 import pyrogue  as pr
 import surf.axi as axi
 
+def readWaveformBuffers(engines, buffers=None, doneOnly=True, dram=None, dtype=np.uint8):
+    """
+    Read the waveform buffers of a list of BsaWaveformEngine devices.
+    The buffers of all the engines are read in one burst (in bounded
+    chunks, see AmcCarrierDram) into one array. Returns one {buffer: array} dict per engine, each array being
+    a view of the common array in chronological order.
+    """
+    plans = [eng.bufferRanges(buffers=buffers, doneOnly=doneOnly) for eng in engines]
+
+    # Group the engines sharing the same DDR window into one burst
+    groups = {}
+    for eng, plan in zip(engines, plans):
+        mem = dram if (dram is not None) else eng._dram
+        if mem is None:
+            raise pr.DeviceError(f'{eng.path}.readBuffers(): no AmcCarrierDram device')
+        groups.setdefault(id(mem), (mem, []))[1].append(plan)
+
+    for mem, grpPlans in groups.values():
+        ranges = [rng for plan in grpPlans for j in plan for rng in plan[j]]
+        if not ranges:
+            continue
+
+        data = mem.read(ranges)
+
+        pos = 0
+        for plan in grpPlans:
+            for j in plan:
+                size    = sum(n for _, n in plan[j])
+                plan[j] = data[pos:pos+size].view(dtype)
+                pos    += size
+
+    return plans
+
 class BsaWaveformEngine(pr.Device):
     def __init__(   self,
             name        = "BsaWaveformEngine",
             description = "Configuration and status of the BSA dignosic buffers",
             numBuffers  = 4,
+            dram        = None, # AmcCarrierDram device
             **kwargs):
         super().__init__(name=name, description=description, **kwargs)
 
@@ -32,3 +71,100 @@ class BsaWaveformEngine(pr.Device):
             offset     = 0x00000000,
             numBuffers = numBuffers,
         ))
+
+        self._numBuffers     = numBuffers
+        self._dram           = dram
+        self._geometry       = None
+        self._geometryValues = {}
+        self._geometryLock   = threading.Lock()
+
+        self.add(pr.LocalVariable(
+            name         = "MinBufferSize",
+            description  = "Smallest waveform buffer size in bytes (0 if any buffer is disabled or empty)",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self.bufferGeometry()['MinSize'],
+        ))
+
+    def _geometryVariables(self):
+        buf = self.WaveformEngineBuffers
+        return [buf.Enabled[j] for j in range(self._numBuffers)] + \
+               [buf.StartAddr[j] for j in range(self._numBuffers)] + \
+               [buf.EndAddr[j] for j in range(self._numBuffers)]
+
+    def bufferGeometry(self):
+        """
+        Returns the Enabled, StartAddr, EndAddr and Size (bytes) arrays of the
+        ring buffers and their MinSize. The address tables are read in one
+        pass and cached while the shadow values of the ring configuration
+        are unchanged, compared on every call.
+        """
+        with self._geometryLock:
+            variables = self._geometryVariables()
+            if (self._geometry is None) or any(self._geometryValues.get(var.path) != var.value() for var in variables):
+                buf = self.WaveformEngineBuffers
+                buf.readBlocks(recurse=False, variable=variables)
+                buf.checkBlocks(recurse=False, variable=variables)
+
+                values  = np.array([var.value() for var in variables], dtype=np.int64).reshape(3, self._numBuffers)
+                enabled = values[0] > 0
+                size    = np.where(enabled & (values[2] > values[1]), values[2] - values[1], 0)
+
+                self._geometryValues = {var.path: var.value() for var in variables}
+                self._geometry = {
+                    'Enabled'   : enabled,
+                    'StartAddr' : values[1],
+                    'EndAddr'   : values[2],
+                    'Size'      : size,
+                    'MinSize'   : int(size.min()),
+                }
+            return self._geometry
+
+    def bufferRanges(self, buffers=None, doneOnly=True):
+        """
+        Returns {buffer: [(address, size), ...]} the DDR ranges holding the
+        data of the enabled buffers, oldest data first. The write pointers
+        and status are read in one pass. With doneOnly, only the buffers
+        frozen after a trigger (or full in DoneWhenFull mode) are returned.
+        """
+        geo = self.bufferGeometry()
+        buf = self.WaveformEngineBuffers
+
+        if buffers is None:
+            buffers = range(self._numBuffers)
+        buffers = [j for j in buffers if geo['Size'][j] > 0]
+
+        variables = [buf.WrAddr[j] for j in buffers] + \
+                    [buf.Full[j] for j in buffers] + \
+                    [buf.Done[j] for j in buffers]
+        buf.readBlocks(recurse=False, variable=variables)
+        buf.checkBlocks(recurse=False, variable=variables)
+
+        ret = {}
+        for j in buffers:
+            if doneOnly and not buf.Done[j].value():
+                continue
+
+            start = int(geo['StartAddr'][j])
+            end   = int(geo['EndAddr'][j])
+            wr    = buf.WrAddr[j].value()
+
+            if not (start <= wr <= end):
+                continue
+
+            # Once wrapped, the oldest data is at the write pointer
+            if buf.Full[j].value():
+                ret[j] = [(wr, end-wr), (start, wr-start)] if (start < wr < end) else [(start, end-start)]
+            elif wr > start:
+                ret[j] = [(start, wr-start)]
+
+        return ret
+
+    def readBuffers(self, buffers=None, doneOnly=True, dram=None, dtype=np.uint8):
+        """
+        Read the enabled waveform buffers from DDR in a single burst.
+        Returns {buffer: array}, zero-copy views of one common array, in
+        chronological order. With doneOnly (default), buffers still being
+        written are skipped.
+        """
+        return readWaveformBuffers([self], buffers=buffers, doneOnly=doneOnly, dram=dram, dtype=dtype)[0]
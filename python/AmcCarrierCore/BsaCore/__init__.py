@@ -1,2 +1,3 @@
 from AmcCarrierCore.BsaCore._BsaBufferControl import *
 from AmcCarrierCore.BsaCore._BsaWaveformEngine import *
+from AmcCarrierCore.BsaCore._BsaRingDrain import *
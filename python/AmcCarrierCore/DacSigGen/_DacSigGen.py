@@ -16,9 +16,13 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
+import os
+import hashlib
+import numpy   as np
 import pyrogue as pr
 import click
-import csv
+
+from AmcCarrierCore._BurstAccess import burstWrite
 
 class DacSigGen(pr.Device):
     def __init__(   self,
@@ -31,8 +35,13 @@ class DacSigGen(pr.Device):
         super().__init__(name=name, description=description, **kwargs)
 
         self._numOfChs = numOfChs
+        self._fillMode = fillMode
         self._buffSize = (buffSize<<1) if (fillMode) else buffSize
 
+        # Last waveform loaded per channel (RAM content and its digest)
+        self._shadow   = [None] * numOfChs
+        self._digest   = [None] * numOfChs
+
         ##############################
         # Variables
         ##############################
@@ -118,7 +127,6 @@ class DacSigGen(pr.Device):
             bitOffset    =  0x00,
             base         = pr.UInt,
             mode         = "RO",
-            pollInterval =  1,
         ))
 
         self.addRemoteVariables(
@@ -166,7 +174,7 @@ class DacSigGen(pr.Device):
             self.SoftwareTrigger.set(trigAllCh)
             self.SoftwareTrigger.set(0x00)
 
-        @self.command(value='',description="Load the .CSV",)
+        @self.command(value='',description="Load the waveform file (.csv, .npy or raw little-endian interleaved .bin/.dat, int16 in fill mode, int32 otherwise)",)
         def LoadCsvFile(arg):
             # Check if non-empty argument
             if (arg != ""):
@@ -175,46 +183,140 @@ class DacSigGen(pr.Device):
                 # Use the variable path instead
                 path = self.CsvFilePath.get()
 
-            # Open the .CSV file
-            with open(path) as csvfile:
-                reader = csv.reader(csvfile, delimiter=',', quoting=csv.QUOTE_NONE)
-                idx     = 0
-                cnt     = 0
-                csvData = []
-                # Loop through the rows in the CSV file
-                for row in reader:
-                    if ( idx<self._buffSize ):
-                        entry = []
-                        for ch in range(self._numOfChs):
-                            entry.append(row[ch])
-                        csvData.append(entry)
-                        # Increment the counter
-                        idx  += 1
-                    # Increment the counter
-                    cnt  += 1
-                # User friendly print message
-                click.secho( ('LoadCsvFile(): %d samples per channel found' % idx ), fg='green')
-                if ( cnt>idx ):
-                    click.secho( ('\tHowever %d of samples detected in the CSV file' % cnt ), fg='red')
-                    click.secho( ('\tCSV data dropped because firmware only support up to %d samples' % idx ), fg='red')
-                # Check for 32-bit fill mode and odd number of samples
-                if (fillMode) and ( (cnt%2) == 1 ):
-                    csvData.append(csvData[cnt-1])
-                    cnt += 1
-                # Get the current enable mask value
-                enableMask = self.EnableMask.get()
-                # Reset the enable mask during the load
-                self.EnableMask.set(0x0)
-                # Loop through the channels
-                for ch in range(self._numOfChs):
-                    data = []
-                    for row in csvData:
-                        data.append(int(row[ch]))
-
-                    self.Waveform[ch].set(0x000000000,data,write=True)
-
-                    v = getattr(self, 'PeriodSize[%i]'%ch)
-                    v.set(((cnt>>1)-1) if (fillMode) else (cnt-1))
-
-                # Restore the enable mask value
-                self.EnableMask.set(enableMask)
+            self.LoadWaveforms(self.ReadWaveformFile(path))
+
+        @self.command(description="Clear the waveform cache, the next load rewrites the full waveforms",)
+        def ClearWaveformCache():
+            self._clearCache()
+
+    def _clearCache(self):
+        self._shadow = [None] * self._numOfChs
+        self._digest = [None] * self._numOfChs
+
+    def _start(self):
+        # The RAM content is unknown after a reprogram or a new root
+        super()._start()
+        self._clearCache()
+
+    def _cacheValid(self, ch):
+        # A direct Waveform[ch].set() leaves the variable shadow different from the cache
+        shadow = self._shadow[ch]
+        if shadow is None:
+            return False
+        value = np.asarray(self.Waveform[ch].value())
+        return (value.size >= shadow.size) and np.array_equal(value[:shadow.size], shadow)
+
+    def ReadWaveformFile(self, path):
+        """
+        Read a waveform file into a (samples, channels) integer array. The
+        raw files hold 16-bit samples in fill mode, 32-bit samples otherwise.
+        """
+        ext = os.path.splitext(path)[1].lower()
+        if ext == '.npy':
+            data = np.load(path)
+        elif ext in ['.bin', '.dat', '.raw']:
+            data = np.fromfile(path, dtype='<i2' if self._fillMode else '<i4').reshape(-1, self._numOfChs)
+        else:
+            data = np.loadtxt(path, delimiter=',', dtype=np.int64, usecols=range(self._numOfChs), ndmin=2)
+        return data.reshape(data.shape[0], -1)
+
+    def LoadWaveforms(self, data):
+        """
+        Load a (samples, channels) array, one column per channel
+        """
+        data = np.asarray(data)
+        if data.ndim == 1:
+            data = data.reshape(-1, 1)
+        if data.shape[1] < self._numOfChs:
+            raise pr.DeviceError(f'{self.path}.LoadWaveforms(): {data.shape[1]} channels found, {self._numOfChs} expected')
+
+        self._upload({ch: self._prepare(data[:,ch], verbose=(ch==0)) for ch in range(self._numOfChs)})
+
+    def LoadArray(self, ch, data):
+        """
+        Load a single channel waveform from a 1D array
+        """
+        if not (0 <= ch < self._numOfChs):
+            raise pr.DeviceError(f'{self.path}.LoadArray(): channel {ch} out of range, {self._numOfChs} channels')
+        self._upload({ch: self._prepare(np.asarray(data).ravel())})
+
+    def _prepare(self, data, verbose=True):
+        cnt  = data.size
+        data = data[:self._buffSize].astype(np.int64)
+
+        # User friendly print message
+        if verbose:
+            click.secho( ('LoadCsvFile(): %d samples per channel found' % data.size ), fg='green')
+            if ( cnt>data.size ):
+                click.secho( ('\tHowever %d of samples detected in the CSV file' % cnt ), fg='red')
+                click.secho( ('\tCSV data dropped because firmware only support up to %d samples' % data.size ), fg='red')
+
+        # Check for 32-bit fill mode and odd number of samples
+        if (self._fillMode) and ( (data.size%2) == 1 ):
+            data = np.append(data, data[-1])
+
+        return data
+
+    def _upload(self, waves):
+        # Skip the channels already holding the same waveform
+        changed = {}
+        for ch, data in waves.items():
+            if not self._cacheValid(ch):
+                self._shadow[ch] = None
+                self._digest[ch] = None
+            digest = hashlib.sha1(data.tobytes()).digest()
+            if digest != self._digest[ch]:
+                changed[ch] = (data, digest)
+
+        # Only disable the channels being reloaded
+        mask       = sum(1<<ch for ch in changed)
+        enableMask = self.EnableMask.get() if changed else 0
+        if (enableMask & mask):
+            self.EnableMask.set(enableMask & ~mask)
+
+        for ch, (data, digest) in changed.items():
+            self._writeChannel(ch, data)
+            self._digest[ch] = digest
+
+        # The period sizes are checked even if the waveforms are unchanged (a YAML load may change them)
+        for ch, data in waves.items():
+            v = getattr(self, 'PeriodSize[%i]'%ch)
+            size = ((data.size>>1)-1) if (self._fillMode) else (data.size-1)
+            if (v.value() != size):
+                v.set(size)
+
+        # Restore the enable mask value
+        if (enableMask & mask):
+            self.EnableMask.set(enableMask)
+
+    def _writeChannel(self, ch, data):
+        old = self._shadow[ch]
+
+        if old is None:
+            self.Waveform[ch].set(data, write=True)
+            self._shadow[ch] = data
+            return
+
+        # Changed samples, plus the samples beyond the previous waveform
+        size = min(old.size, data.size)
+        idx  = np.concatenate([np.flatnonzero(old[:size] != data[:size]), np.arange(size, data.size)])
+
+        # 32-bit word addresses, two samples per word in fill mode
+        words = np.unique(idx >> 1) if (self._fillMode) else idx
+        raw   = data.astype('<i2' if self._fillMode else '<i4').view(np.uint8)
+
+        # Merge the words into address ranges, closing gaps smaller than 8 words
+        if words.size > 0:
+            split  = np.flatnonzero(np.diff(words) > 8) + 1
+            starts = words[np.concatenate([[0], split])]
+            stops  = words[np.concatenate([split-1, [words.size-1]])] + 1
+            base   = 0x01000000 + (ch * 0x01000000)
+            burstWrite(self,
+                [(int(base + 4*start), int(4*(stop-start))) for start, stop in zip(starts, stops)],
+                np.concatenate([raw[4*start:4*stop] for start, stop in zip(starts, stops)]))
+
+        # Keep the variable shadow in sync with the RAM
+        if data.size < old.size:
+            data = np.concatenate([data, old[data.size:]])
+        self.Waveform[ch].set(data, write=False)
+        self._shadow[ch] = data
@@ -18,14 +18,26 @@
 
 import pyrogue as pr
 
+from AmcCarrierCore._BurstAccess import burstRead, burstVariables, burstUpdateRanges
+
+# (offset, size) of the status window, 0x38-0x3F returns a decode error and is skipped
+DaqMuxV2StatusRanges = [(0x00, 0x38), (0x40, 0x80)]
+
 class DaqMuxV2(pr.Device):
     def __init__(   self,
-            name        = "DaqMuxV2",
-            description = "Waveform Data Acquisition Module",
-            numBuffers  = 4,
+            name           = "DaqMuxV2",
+            description    = "Waveform Data Acquisition Module",
+            numBuffers     = 4,
+            statusSnapshot = False,
             **kwargs):
         super().__init__(name=name, description=description, **kwargs)
 
+        self._numBuffers = numBuffers
+
+        # In snapshot mode the status registers are not polled individually,
+        # they are set from the StatusSnapshot burst instead
+        statusPoll = 0 if statusSnapshot else 1
+
         ##############################
         # Variables
         ##############################
@@ -138,7 +150,7 @@ class DaqMuxV2(pr.Device):
             bitSize      =  1,
             bitOffset    =  0x00,
             mode         = "RO",
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         ))
 
         self.add(pr.RemoteVariable(
@@ -148,7 +160,7 @@ class DaqMuxV2(pr.Device):
             bitSize      =  1,
             bitOffset    =  0x01,
             mode         = "RO",
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         ))
 
         self.add(pr.RemoteVariable(
@@ -158,7 +170,7 @@ class DaqMuxV2(pr.Device):
             bitSize      =  1,
             bitOffset    =  0x02,
             mode         = "RO",
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         ))
 
         self.add(pr.RemoteVariable(
@@ -168,7 +180,7 @@ class DaqMuxV2(pr.Device):
             bitSize      =  1,
             bitOffset    =  0x03,
             mode         = "RO",
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         ))
 
         self.add(pr.RemoteVariable(
@@ -178,7 +190,7 @@ class DaqMuxV2(pr.Device):
             bitSize      =  1,
             bitOffset    =  0x04,
             mode         = "RO",
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         ))
 
         self.add(pr.RemoteVariable(
@@ -188,7 +200,7 @@ class DaqMuxV2(pr.Device):
             bitSize      =  1,
             bitOffset    =  0x05,
             mode         = "RO",
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         ))
 
         self.add(pr.RemoteVariable(
@@ -218,7 +230,7 @@ class DaqMuxV2(pr.Device):
             mode         = "RO",
             number       =  2,
             stride       =  4,
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         )
 
         self.addRemoteVariables(
@@ -230,7 +242,7 @@ class DaqMuxV2(pr.Device):
             mode         = "RO",
             number       =  numBuffers,
             stride       =  4,
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         )
 
         self.add(pr.RemoteVariable(
@@ -240,7 +252,7 @@ class DaqMuxV2(pr.Device):
             bitSize      =  32,
             bitOffset    =  0x00,
             mode         = "RO",
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         ))
 
         self.add(pr.RemoteVariable(
@@ -250,7 +262,7 @@ class DaqMuxV2(pr.Device):
             bitSize      =  32,
             bitOffset    =  0x00,
             mode         = "RO",
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         ))
 
         self.add(pr.RemoteVariable(
@@ -260,7 +272,7 @@ class DaqMuxV2(pr.Device):
             bitSize      =  32,
             bitOffset    =  0x00,
             mode         = "RO",
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         ))
 
         self.add(pr.RemoteVariable(
@@ -341,7 +353,7 @@ class DaqMuxV2(pr.Device):
             mode         = "RO",
             number       =  numBuffers,
             stride       =  4,
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         )
 
         self.addRemoteVariables(
@@ -353,7 +365,7 @@ class DaqMuxV2(pr.Device):
             mode         = "RO",
             number       =  numBuffers,
             stride       =  4,
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         )
 
         self.addRemoteVariables(
@@ -365,7 +377,7 @@ class DaqMuxV2(pr.Device):
             mode         = "RO",
             number       =  numBuffers,
             stride       =  4,
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         )
 
         self.addRemoteVariables(
@@ -377,7 +389,7 @@ class DaqMuxV2(pr.Device):
             mode         = "RO",
             number       =  numBuffers,
             stride       =  4,
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         )
 
         self.addRemoteVariables(
@@ -389,7 +401,7 @@ class DaqMuxV2(pr.Device):
             mode         = "RO",
             number       =  numBuffers,
             stride       =  4,
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         )
 
         self.addRemoteVariables(
@@ -401,7 +413,7 @@ class DaqMuxV2(pr.Device):
             mode         = "RO",
             number       =  numBuffers,
             stride       =  4,
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         )
 
         self.addRemoteVariables(
@@ -413,7 +425,7 @@ class DaqMuxV2(pr.Device):
             mode         = "RO",
             number       =  numBuffers,
             stride       =  4,
-            pollInterval =  1,
+            pollInterval =  statusPoll,
         )
 
         self.addRemoteVariables(
@@ -472,6 +484,15 @@ class DaqMuxV2(pr.Device):
             },
         )
 
+        self.add(pr.LocalVariable(
+            name         = "StatusSnapshot",
+            description  = "All the status registers decoded from a single burst read of the 0x00-0xBF window, the status variables are updated from it",
+            mode         = "RO",
+            value        = {},
+            localGet     = self.readStatusSnapshot,
+            pollInterval = 1 if statusSnapshot else 0,
+        ))
+
         ##############################
         # Commands
         ##############################
@@ -494,3 +515,34 @@ class DaqMuxV2(pr.Device):
         def ClearTrigStatus():
             self.TriggerClearStatus.set(1)
             self.TriggerClearStatus.set(0)
+
+        # RO status variables updated by readStatusSnapshot()
+        self._statusVariables = burstVariables(self, DaqMuxV2StatusRanges)
+
+    def readStatusSnapshot(self):
+        raw  = burstRead(self, DaqMuxV2StatusRanges)
+        burstUpdateRanges(self._statusVariables, raw, DaqMuxV2StatusRanges)
+        w    = raw.view('<u4')
+        trig = int(w[1])
+        stat = w[30:30+self._numBuffers] # 0x80 is word 30 of the burst
+
+        return {
+            'TriggerSwStatus'   : (trig >> 0) & 0x1,
+            'TriggerCascStatus' : (trig >> 1) & 0x1,
+            'TriggerHwStatus'   : (trig >> 2) & 0x1,
+            'TriggerHwArmed'    : (trig >> 3) & 0x1,
+            'TriggerStatus'     : (trig >> 4) & 0x1,
+            'FreezeStatus'      : (trig >> 5) & 0x1,
+            'Timestamp'         : (int(w[4]) << 32) | int(w[5]),
+            'Bsa'               : w[6:10].tolist(),
+            'TrigCount'         : int(w[10]),
+            'DbgInputValid'     : int(w[11]),
+            'DbgLinkReady'      : int(w[12]),
+            'StreamPause'       : ((stat >> 0) & 0x1).tolist(),
+            'StreamReady'       : ((stat >> 1) & 0x1).tolist(),
+            'StreamOverflow'    : ((stat >> 2) & 0x1).tolist(),
+            'StreamError'       : ((stat >> 3) & 0x1).tolist(),
+            'InputDataValid'    : ((stat >> 4) & 0x1).tolist(),
+            'StreamEnabled'     : ((stat >> 5) & 0x1).tolist(),
+            'FrameCnt'          : ((stat >> 6) & 0x3FFFFFF).tolist(),
+        }
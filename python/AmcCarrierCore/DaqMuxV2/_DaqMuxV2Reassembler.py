@@ -0,0 +1,207 @@
+#-----------------------------------------------------------------------------
+# Title      : PyRogue Waveform Data Acquisition Reassembler
+#-----------------------------------------------------------------------------
+# File       : DaqMuxV2Reassembler.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# Stitches the 4096 byte DaqMuxV2 frames of a triggered acquisition back
+# into a single contiguous buffer taken from a preallocated ring. The
+# packet boundaries come from the receiver packet state (SOF is set on
+# every frame), an acquisition is closed on reaching its packetSize, on
+# EOFE, on freeze or on the short last frame.
+#-----------------------------------------------------------------------------
+# This file is part of the rogue software platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue software platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import queue
+import numpy   as np
+import pyrogue as pr
+
+from AmcCarrierCore.DaqMuxV2._DaqMuxV2Receiver import DaqMuxV2Receiver
+from AmcCarrierCore.DaqMuxV2._DaqMuxV2Receiver import DaqMuxV2HeaderType
+
+class DaqMuxV2Acquisition(object):
+    """
+    Completed acquisition. data is a view of a ring slot and is only valid
+    until release() is called. The reassembler releases the slot as soon
+    as processAcquisition() returns, unless retain() was called.
+    """
+    def __init__(self, owner, slot, channel, header, bay, buffer, timestamp, expected):
+        self.channel   = channel
+        self.header    = header
+        self.bay       = bay
+        self.buffer    = buffer
+        self.timestamp = timestamp
+        self.expected  = expected
+        self.nbytes    = 0
+        self.data      = None
+        self.gaps      = []
+        self._owner    = owner
+        self._slot     = slot
+        self._retained = False
+
+    @property
+    def key(self):
+        return (self.bay, self.buffer, self.timestamp)
+
+    @property
+    def complete(self):
+        return (len(self.gaps) == 0) and (self.nbytes == self.expected)
+
+    def retain(self):
+        self._retained = True
+
+    def release(self):
+        if self._slot is not None:
+            self._owner._releaseSlot(self._slot)
+            self._slot = None
+            self.data  = None
+
+class DaqMuxV2Reassembler(DaqMuxV2Receiver):
+    def __init__(   self,
+            name        = "DaqMuxV2Reassembler",
+            description = "DaqMuxV2 multi-frame acquisition reassembler",
+            ringDepth   = 8,
+            maxSize     = 0x100000, # Units of 32-bit words
+            frameSize   = 4096,     # Units of bytes (FRAME_BWIDTH_G)
+            **kwargs):
+        super().__init__(name=name, description=description, frameSize=frameSize, **kwargs)
+
+        self._ring      = [np.empty(maxSize*4, dtype=np.uint8) for _ in range(ringDepth)]
+        self._free      = queue.SimpleQueue()
+        self._open      = {}
+        self._dropping  = set()
+        self._acqCount  = 0
+        self._gapCount  = 0
+        self._dropCount = 0
+
+        for slot in range(ringDepth):
+            self._free.put(slot)
+
+        ##############################
+        # Variables
+        ##############################
+
+        self.add(pr.LocalVariable(
+            name         = "AcquisitionCount",
+            description  = "Number of acquisitions emitted",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self._acqCount,
+            pollInterval = 1,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "GapCount",
+            description  = "Number of missing, orphaned, errored or truncated frames detected",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self._gapCount,
+            pollInterval = 1,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "DropCount",
+            description  = "Number of acquisitions dropped because no ring slot was free",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self._dropCount,
+            pollInterval = 1,
+        ))
+
+    def processAcquisition(self, acq):
+        """
+        Called for each completed DaqMuxV2Acquisition, override in sub-class.
+        """
+        pass
+
+    def _releaseSlot(self, slot):
+        self._free.put(slot)
+
+    def _gap(self, acq, msg):
+        self._gapCount += 1
+        if acq is not None:
+            acq.gaps.append(msg)
+
+    def _finish(self, acq):
+        del self._open[acq.channel]
+
+        # Cast the stitched bytes to the sample type
+        dtype    = self.sampleType(acq.buffer, None if acq.header is None else bool((int(acq.header['flags']) >> 23) & 0x1))
+        size     = (acq.nbytes // dtype.itemsize) * dtype.itemsize
+        acq.data = self._ring[acq._slot][:size].view(dtype)
+
+        self._acqCount += 1
+        self.processAcquisition(acq)
+
+        if not acq._retained:
+            acq.release()
+
+    def process(self, frame):
+        acq     = self._open.get(frame.channel)
+        payload = frame.data.view(np.uint8)
+
+        if frame.first:
+            # New packet while the previous one is still open
+            if acq is not None:
+                self._gap(acq, f'Missing {acq.expected-acq.nbytes} bytes before next packet')
+                self._finish(acq)
+
+            self._dropping.discard(frame.channel)
+
+            # Get a free ring slot
+            try:
+                slot = self._free.get_nowait()
+            except queue.Empty:
+                self._dropCount += 1
+                if not frame.last:
+                    self._dropping.add(frame.channel)
+                return
+
+            if frame.header is not None:
+                expected = (frame.packetSize - (DaqMuxV2HeaderType.itemsize >> 2)) * 4
+                acq = DaqMuxV2Acquisition(self, slot, frame.channel, frame.header, frame.bay, frame.axiNum, frame.timestamp, expected)
+            else:
+                buffer   = frame.channel & 0xF
+                expected = (self._daqMux.DataBufferSize.value() * 4) if (self._daqMux is not None) else self._ring[slot].size
+                acq = DaqMuxV2Acquisition(self, slot, frame.channel, None, None, buffer, None, expected)
+
+            if acq.expected > self._ring[slot].size:
+                self._gap(acq, f'Packet of {acq.expected} bytes truncated to {self._ring[slot].size} bytes ring slot')
+                acq.expected = self._ring[slot].size
+
+            self._open[frame.channel] = acq
+
+        elif acq is None:
+            if frame.channel not in self._dropping:
+                self._gap(None, f'Orphan frame on channel {frame.channel}')
+            elif frame.last:
+                self._dropping.discard(frame.channel)
+            return
+
+        # Stitch the payload into the ring slot
+        size = min(payload.size, acq.expected - acq.nbytes)
+        self._ring[acq._slot][acq.nbytes:acq.nbytes+size] = payload[:size]
+        acq.nbytes += size
+
+        if size < payload.size:
+            self._gap(acq, f'{payload.size-size} bytes beyond packetSize')
+
+        if frame.eofe:
+            self._gap(acq, f'Frame error after {acq.nbytes} bytes')
+            self._finish(acq)
+
+        elif acq.nbytes >= acq.expected:
+            self._finish(acq)
+
+        # End of the packet (short frame or freeze) before packetSize
+        elif frame.last or frame.freeze:
+            self._gap(acq, f'Missing {acq.expected-acq.nbytes} bytes at end of packet')
+            self._finish(acq)
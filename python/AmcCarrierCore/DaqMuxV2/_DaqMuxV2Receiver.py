@@ -0,0 +1,260 @@
+#-----------------------------------------------------------------------------
+# Title      : PyRogue Waveform Data Acquisition Stream Receiver
+#-----------------------------------------------------------------------------
+# File       : DaqMuxV2Receiver.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# Stream receiver for the frames generated by DaqLane.vhd
+#
+# Triggered mode packet with PacketHeaderEn = Enabled (first frame only):
+#    HeaderWord 0-5:  dmod(191:0)
+#    HeaderWord 6:    timeStamp(31:0)
+#    HeaderWord 7:    timeStamp(63:32)
+#    HeaderWord 8-11: bsa(127:0), MSW first
+#    HeaderWord 12:   packetSize (32-bit words, header included)
+#    HeaderWord 13:   header & dec16or32 & averaging & test & BAY_INDEX_G & axiNum & rateDiv
+#
+# The packet is split into 4096 byte frames (FRAME_BWIDTH_G = 10), each
+# one with SOF set. The receiver keeps the packet state per channel: the
+# header is only parsed on the first frame of a packet, which ends after
+# packetSize words, on a short frame or on EOFE/freeze.
+#-----------------------------------------------------------------------------
+# This file is part of the rogue software platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue software platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import numpy   as np
+import pyrogue as pr
+import rogue.interfaces.stream as ris
+
+DaqMuxV2HeaderType = np.dtype([
+    ('dmod',       '<u4', (6,)),
+    ('timestamp',  '<u4', (2,)),
+    ('bsa',        '<u4', (4,)),
+    ('packetSize', '<u4'),
+    ('flags',      '<u4'),
+])
+
+class DaqMuxV2Packet(object):
+    """
+    State of the packet being received on a channel. remaining is the
+    number of bytes still expected (None without packet header).
+    """
+    def __init__(self):
+        self.header    = None
+        self.buffer    = None
+        self.data16    = None
+        self.remaining = None
+        self.frames    = 0
+
+class DaqMuxV2Frame(object):
+    """
+    Decoded DaqMuxV2 frame. header is the DaqMuxV2HeaderType record of the
+    packet (or None without packet header) and data is a view of the
+    samples. Both share the memory of the frames, no samples are copied
+    during decode. first and last mark the frames starting and ending a
+    packet, sof is the raw SSI SOF bit (set on every frame).
+    """
+    def __init__(self, channel, raw, header, data, sof, eofe, freeze, first=True, last=True):
+        self.channel = channel
+        self.raw     = raw
+        self.header  = header
+        self.data    = data
+        self.sof     = sof
+        self.eofe    = eofe
+        self.freeze  = freeze
+        self.first   = first
+        self.last    = last
+
+    @property
+    def timestamp(self):
+        return (int(self.header['timestamp'][1]) << 32) | int(self.header['timestamp'][0])
+
+    @property
+    def packetSize(self):
+        return int(self.header['packetSize'])
+
+    @property
+    def rateDiv(self):
+        return int(self.header['flags']) & 0xFFFF
+
+    @property
+    def axiNum(self):
+        return (int(self.header['flags']) >> 16) & 0xF
+
+    @property
+    def bay(self):
+        return (int(self.header['flags']) >> 20) & 0x1
+
+    @property
+    def test(self):
+        return bool((int(self.header['flags']) >> 21) & 0x1)
+
+    @property
+    def averaging(self):
+        return bool((int(self.header['flags']) >> 22) & 0x1)
+
+    @property
+    def data16(self):
+        return bool((int(self.header['flags']) >> 23) & 0x1)
+
+    @property
+    def userHeader(self):
+        return (int(self.header['flags']) >> 24) & 0xFF
+
+class DaqMuxV2Receiver(pr.Device,ris.Slave):
+    def __init__(   self,
+            name        = "DaqMuxV2Receiver",
+            description = "DaqMuxV2 stream receiver",
+            daqMux      = None,
+            frameSize   = 4096,     # Units of bytes (FRAME_BWIDTH_G)
+            **kwargs):
+        pr.Device.__init__(self, name=name, description=description, **kwargs)
+        ris.Slave.__init__(self)
+
+        self._daqMux     = daqMux
+        self._frameSize  = frameSize
+        self._packets    = {}
+        self._frameCount = 0
+        self._errorCount = 0
+        self._byteCount  = 0
+
+        ##############################
+        # Variables
+        ##############################
+
+        self.add(pr.LocalVariable(
+            name         = "FrameCount",
+            description  = "Number of frames received",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self._frameCount,
+            pollInterval = 1,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "ErrorCount",
+            description  = "Number of frames received with errors",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self._errorCount,
+            pollInterval = 1,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "ByteCount",
+            description  = "Number of bytes received",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self._byteCount,
+            pollInterval = 1,
+        ))
+
+        ##############################
+        # Commands
+        ##############################
+        @self.command(description="Reset the counters",)
+        def CountReset():
+            self._frameCount = 0
+            self._errorCount = 0
+            self._byteCount  = 0
+
+        @self.command(description="Drop the packets being received",)
+        def PacketReset():
+            self._packets.clear()
+
+    def sampleType(self, buffer, data16=None):
+        """
+        Return the numpy dtype of the samples for a DaqMuxV2 buffer.
+        FormatDataWidth/FormatSign shadow values are used so no register
+        access is made. The data width from the packet header overrides
+        FormatDataWidth when available.
+        """
+        signed = False
+        if self._daqMux is not None:
+            if data16 is None:
+                data16 = (self._daqMux.FormatDataWidth[buffer].value() == 1)
+            signed = (self._daqMux.FormatSign[buffer].value() == 1)
+
+        if data16:
+            return np.dtype('<i2') if signed else np.dtype('<u2')
+        else:
+            return np.dtype('<i4') if signed else np.dtype('<u4')
+
+    def decode(self, raw, channel, sof=True, eofe=False, freeze=False, packet=None):
+        """
+        Decode a frame payload (numpy uint8 array) into a DaqMuxV2Frame.
+        packet is the DaqMuxV2Packet of the channel, updated with the
+        frame: the header is only present on the first frame of a triggered
+        packet with PacketHeaderEn set. Without packet the frame is decoded
+        as a complete packet.
+        """
+        if packet is None:
+            packet = DaqMuxV2Packet()
+
+        first  = (packet.frames == 0)
+        offset = 0
+
+        if first:
+            packet.buffer = channel & 0xF
+            hdrEn = (self._daqMux is not None) and (self._daqMux.PacketHeaderEn.value() == 1)
+
+            if sof and hdrEn and (raw.size >= DaqMuxV2HeaderType.itemsize):
+                offset = DaqMuxV2HeaderType.itemsize
+                packet.header    = raw[:offset].view(DaqMuxV2HeaderType)[0]
+                flags            = int(packet.header['flags'])
+                packet.buffer    = (flags >> 16) & 0xF
+                packet.data16    = bool((flags >> 23) & 0x1)
+                packet.remaining = int(packet.header['packetSize']) * 4
+
+        packet.frames += 1
+        if packet.remaining is not None:
+            packet.remaining -= raw.size
+
+        # The packet ends after packetSize words, on a short frame or on an error/freeze
+        last = eofe or freeze or (raw.size < self._frameSize) or ((packet.remaining is not None) and (packet.remaining <= 0))
+
+        dtype = self.sampleType(packet.buffer, packet.data16)
+        size  = ((raw.size - offset) // dtype.itemsize) * dtype.itemsize
+        data  = raw[offset:offset+size].view(dtype)
+
+        return DaqMuxV2Frame(channel, raw, packet.header, data, sof, eofe, freeze, first, last)
+
+    def process(self, frame):
+        """
+        Called for each decoded DaqMuxV2Frame, override in sub-class.
+        """
+        pass
+
+    def _acceptFrame(self, frame):
+        with frame.lock():
+            size    = frame.getPayload()
+            channel = frame.getChannel()
+            sof     = bool(frame.getFirstUser() & 0x2) # SSI SOF
+            eofe    = bool(frame.getLastUser()  & 0x1) or (frame.getError() != 0) # SSI EOFE
+            freeze  = bool(frame.getLastUser()  & 0x4) # FREZE_BUFFER_TUSER_G = 2
+            raw     = frame.getNumpy(0, size)
+
+        self.receive(raw, channel, sof, eofe, freeze)
+
+    def receive(self, raw, channel, sof=True, eofe=False, freeze=False):
+        """
+        Decode and process a frame payload within the packet of its channel
+        """
+        self._frameCount += 1
+        self._byteCount  += raw.size
+        if eofe:
+            self._errorCount += 1
+
+        packet = self._packets.setdefault(channel, DaqMuxV2Packet())
+        frame  = self.decode(raw, channel, sof, eofe, freeze, packet)
+        if frame.last:
+            del self._packets[channel]
+
+        self.process(frame)
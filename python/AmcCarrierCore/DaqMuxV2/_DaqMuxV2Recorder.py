@@ -0,0 +1,235 @@
+#-----------------------------------------------------------------------------
+# Title      : PyRogue Waveform Data Acquisition Recorder
+#-----------------------------------------------------------------------------
+# File       : DaqMuxV2Recorder.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# Records the reassembled DaqMuxV2 acquisitions into preallocated memory
+# mapped .npy files. One set of files is created per (bay, buffer) and per
+# chunk of chunkRecords acquisitions:
+#    bay<b>_buffer<n>_<chunk>.npy           : samples, shape (chunkRecords, samples)
+#    bay<b>_buffer<n>_<chunk>_timestamp.npy : 64-bit header timestamp of each row
+#    bay<b>_buffer<n>_<chunk>_size.npy      : number of valid samples in each row
+# The acquisitions without packet header are recorded as ch<channel>_buffer<n>
+# (stream channel in hex). The chunk numbers continue after the files found
+# in the directory, an existing file is never overwritten.
+#-----------------------------------------------------------------------------
+# This file is part of the rogue software platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue software platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import os
+import re
+import queue
+import threading
+import numpy   as np
+import pyrogue as pr
+
+from AmcCarrierCore.DaqMuxV2._DaqMuxV2Reassembler import DaqMuxV2Reassembler
+
+class _RecorderChunk(object):
+    def __init__(self, base, records, samples, dtype):
+        self.samples   = np.lib.format.open_memmap(f'{base}.npy',           mode='w+', dtype=dtype,     shape=(records,samples))
+        self.timestamp = np.lib.format.open_memmap(f'{base}_timestamp.npy', mode='w+', dtype=np.uint64, shape=(records,))
+        self.size      = np.lib.format.open_memmap(f'{base}_size.npy',      mode='w+', dtype=np.uint32, shape=(records,))
+        self.row       = 0
+
+    def full(self):
+        return self.row >= self.samples.shape[0]
+
+    def fits(self, data):
+        return (data.dtype == self.samples.dtype) and (data.size <= self.samples.shape[1])
+
+    def close(self):
+        for mm in [self.samples, self.timestamp, self.size]:
+            mm.flush()
+        self.samples   = None
+        self.timestamp = None
+        self.size      = None
+
+class DaqMuxV2Recorder(DaqMuxV2Reassembler):
+    def __init__(   self,
+            name         = "DaqMuxV2Recorder",
+            description  = "DaqMuxV2 acquisition recorder",
+            chunkRecords = 1000,
+            queueDepth   = 4,
+            **kwargs):
+        super().__init__(name=name, description=description, **kwargs)
+
+        self._chunkRecords = chunkRecords
+        self._queue        = queue.Queue(maxsize=queueDepth)
+        self._chunks       = {}
+        self._chunkCnt     = {}
+        self._thread       = None
+        self._dir          = None
+        self._recordCount  = 0
+        self._writerError  = None
+
+        ##############################
+        # Variables
+        ##############################
+
+        self.add(pr.LocalVariable(
+            name         = "DataDir",
+            description  = "Directory where the .npy files are created",
+            mode         = "RW",
+            value        = "",
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "IsOpen",
+            description  = "Recorder is open",
+            mode         = "RO",
+            value        = False,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "RecordCount",
+            description  = "Number of acquisitions written to disk",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self._recordCount,
+            pollInterval = 1,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "QueueDepth",
+            description  = "Number of acquisitions waiting for the writer thread",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self._queue.qsize(),
+            pollInterval = 1,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "WriterError",
+            description  = "Error that stopped the writer thread, empty if none",
+            mode         = "RO",
+            value        = "",
+            localGet     = lambda: '' if self._writerError is None else repr(self._writerError),
+            pollInterval = 1,
+        ))
+
+        ##############################
+        # Commands
+        ##############################
+        @self.command(description="Open the recorder",)
+        def Open():
+            self._openDir(self.DataDir.value())
+
+        @self.command(description="Close the recorder, raises the error of a failed writer thread",)
+        def Close():
+            error = self._closeDir()
+            if error is not None:
+                raise error
+
+    def _openDir(self, path):
+        self._closeDir()
+        os.makedirs(path, exist_ok=True)
+        self._dir         = path
+        self._recordCount = 0
+        self._writerError = None
+        self._thread      = threading.Thread(target=self._writer)
+        self._thread.start()
+        self.IsOpen.set(True)
+
+    def _closeDir(self):
+        """
+        Stop the writer thread, returns the exception that stopped it or None
+        """
+        if self._thread is None:
+            return None
+
+        # A dead writer no longer empties the queue
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self._thread.join()
+        self._thread = None
+        self._drain()
+        self.IsOpen.set(False)
+        return self._writerError
+
+    def _drain(self):
+        while True:
+            try:
+                acq = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if acq is not None:
+                acq.release()
+
+    def _stop(self):
+        self._closeDir()
+        super()._stop()
+
+    def processAcquisition(self, acq):
+        if (self._thread is None) or (self._writerError is not None):
+            return
+        acq.retain()
+        try:
+            self._queue.put_nowait(acq)
+        except queue.Full:
+            acq.release()
+            self._dropCount += 1
+
+    def _nextChunk(self, prefix):
+        # First chunk number after the files already in the directory
+        pattern = re.compile(re.escape(prefix) + r'_(\d+)\.npy$')
+        found   = [int(m.group(1)) for m in map(pattern.match, os.listdir(self._dir)) if m]
+        return max(found, default=-1) + 1
+
+    def _chunk(self, acq):
+        key   = f'bay{acq.bay}_buffer{acq.buffer}' if (acq.bay is not None) else f'ch{acq.channel:02x}_buffer{acq.buffer}'
+        chunk = self._chunks.get(key)
+
+        # Start a new chunk if full or if the waveform format changed
+        if (chunk is None) or chunk.full() or not chunk.fits(acq.data):
+            if chunk is not None:
+                chunk.close()
+            cnt  = self._chunkCnt[key] if (key in self._chunkCnt) else self._nextChunk(key)
+            base = os.path.join(self._dir, f'{key}_{cnt:04d}')
+            chunk = _RecorderChunk(base, self._chunkRecords, acq.data.size, acq.data.dtype)
+            self._chunks[key]   = chunk
+            self._chunkCnt[key] = cnt+1
+
+        return chunk
+
+    def _writer(self):
+        try:
+            while True:
+                acq = self._queue.get()
+                if acq is None:
+                    break
+
+                try:
+                    chunk = self._chunk(acq)
+                    chunk.samples[chunk.row,:acq.data.size] = acq.data
+                    chunk.timestamp[chunk.row] = acq.timestamp or 0
+                    chunk.size[chunk.row]      = acq.data.size
+                    chunk.row += 1
+                finally:
+                    acq.release()
+                self._recordCount += 1
+
+        except Exception as e:
+            self._writerError = e
+            self._log.error(f'{self.path}: writer stopped: {e!r}')
+
+        finally:
+            for chunk in self._chunks.values():
+                try:
+                    chunk.close()
+                except Exception as e:
+                    self._writerError = self._writerError or e
+            self._chunks.clear()
+            self._chunkCnt.clear()
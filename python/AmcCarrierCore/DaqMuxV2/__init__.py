@@ -1 +1,4 @@
 from AmcCarrierCore.DaqMuxV2._DaqMuxV2 import *
+from AmcCarrierCore.DaqMuxV2._DaqMuxV2Receiver import *
+from AmcCarrierCore.DaqMuxV2._DaqMuxV2Reassembler import *
+from AmcCarrierCore.DaqMuxV2._DaqMuxV2Recorder import *
@@ -16,6 +16,7 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
+import numpy   as np
 import pyrogue as pr
 import AmcCarrierCore.BsaCore as bsa
 
@@ -25,6 +26,7 @@ class AmcCarrierBsa(pr.Device):
             description = "AmcCarrier BSA Module",
             enableBsa   = True,
             numWaveformBuffers  = 4,
+            dram        = None, # AmcCarrierDram device, for the DDR buffer readout
             **kwargs):
         super().__init__(name=name, description=description, **kwargs)
 
@@ -42,4 +44,12 @@ class AmcCarrierBsa(pr.Device):
                 name       = f'BsaWaveformEngine[{i}]',
                 offset     =  0x00010000 + i * 0x00010000,
                 numBuffers = numWaveformBuffers,
+                dram       = dram,
             ))
+
+    def readWaveformBuffers(self, doneOnly=True, dtype=np.uint8):
+        """
+        Read the waveform buffers of both bays from DDR in a single burst.
+        Returns [bay0, bay1], one {buffer: array} dict per BsaWaveformEngine.
+        """
+        return bsa.readWaveformBuffers([self.BsaWaveformEngine[i] for i in range(2)], doneOnly=doneOnly, dtype=dtype)
@@ -20,9 +20,13 @@ class AmcCarrierCore(pr.Device):
             enablePwrI2C        = False,
             enableBsa           = True,
             enableMps           = True,
+            mpsStatusSnapshot   = False,
+            mpsLinkMonitor      = False,
             numWaveformBuffers  = 4,
             numCoreTrigs        = 16,
             enableTpgMini       = True,
+            dram                = None, # AmcCarrierDram device, for the BSA DDR buffer readout
+            lazyDevices         = False, # SysMon, boot PROM, UDP engines and RSSI cores built on first use (see LazyDevice)
             expand              = False,
             **kwargs):
         super().__init__(name=name, description=description, expand=expand, **kwargs)
@@ -35,12 +39,16 @@ class AmcCarrierCore(pr.Device):
             expand       =  False
         ))
 
-        self.add(xilinx.AxiSysMonUltraScale(
+        self.add(amcc.lazyDevice(
+            deviceClass  =  xilinx.AxiSysMonUltraScale,
+            lazy         =  lazyDevices,
             offset       =  0x01000000,
             expand       =  False
         ))
 
-        self.add(micron.AxiMicronN25Q(
+        self.add(amcc.lazyDevice(
+            deviceClass  =  micron.AxiMicronN25Q,
+            lazy         =  lazyDevices,
             name         = "MicronN25Q",
             offset       = 0x2000000,
             addrMode     = True,
@@ -99,59 +107,76 @@ class AmcCarrierCore(pr.Device):
             offset             =  0x09000000,
             enableBsa          =  enableBsa,
             numWaveformBuffers =  numWaveformBuffers,
+            dram               =  dram,
             expand             =  False,
         ))
 
-        self.add(udp.UdpEngineClient(
+        self.add(amcc.lazyDevice(
+            deviceClass  =  udp.UdpEngineClient,
+            lazy         =  lazyDevices,
             name         = "BpUdpCltApp",
             offset       =  0x0A000000,
             description  = "Backplane UDP Client for Application ASYNC Messaging",
             expand       =  False,
         ))
 
-        self.add(udp.UdpEngineServer(
+        self.add(amcc.lazyDevice(
+            deviceClass  =  udp.UdpEngineServer,
+            lazy         =  lazyDevices,
             name         = "BpUdpSrvXvc",
             offset       =  0x0A000800,
             description  = "Backplane UDP Server: Xilinx XVC",
             expand       =  False,
         ))
 
-        self.add(udp.UdpEngineServer(
+        self.add(amcc.lazyDevice(
+            deviceClass  =  udp.UdpEngineServer,
+            lazy         =  lazyDevices,
             name         = "BpUdpSrvFsbl",
             offset       =  0x0A000808,
             description  = "Backplane UDP Server: FSBL Legacy SRPv0 register access",
             expand       =  False,
         ))
 
-        self.add(udp.UdpEngineServer(
+        self.add(amcc.lazyDevice(
+            deviceClass  =  udp.UdpEngineServer,
+            lazy         =  lazyDevices,
             name         = "BpUdpSrvRssi[0]",
             offset       =  0x0A000810,
             description  = "Backplane UDP Server: Legacy Non-interleaved RSSI for Register access and ASYNC messages",
             expand       =  False,
         ))
 
-        self.add(udp.UdpEngineServer(
+        self.add(amcc.lazyDevice(
+            deviceClass  =  udp.UdpEngineServer,
+            lazy         =  lazyDevices,
             name         = "BpUdpSrvRssi[1]",
             offset       =  0x0A000818,
             description  = "Backplane UDP Server: Legacy Non-interleaved RSSI for bulk data transfer",
             expand       =  False,
         ))
 
-        self.add(udp.UdpEngineServer(
+        self.add(amcc.lazyDevice(
+            deviceClass  =  udp.UdpEngineServer,
+            lazy         =  lazyDevices,
             name         = "BpUdpSrvRssi[2]",
             offset       =  0x0A000830,
             description  = "Backplane UDP Server: Interleaved RSSI",
             expand       =  False,
         ))
 
-        self.add(udp.UdpEngineServer(
+        self.add(amcc.lazyDevice(
+            deviceClass  =  udp.UdpEngineServer,
+            lazy         =  lazyDevices,
             name         = "BpUdpSrvApp",
             offset       =  0x0A000820,
             description  = "Backplane UDP Server for Application ASYNC Messaging",
             expand       =  False,
         ))
 
-        self.add(udp.UdpEngineServer(
+        self.add(amcc.lazyDevice(
+            deviceClass  =  udp.UdpEngineServer,
+            lazy         =  lazyDevices,
             name         = "BpUdpSrvTiming",
             offset       =  0x0A000828,
             description  = "Backplane UDP Server for Timing ASYNC Messaging",
@@ -159,14 +184,18 @@ class AmcCarrierCore(pr.Device):
         ))
 
         for i in range(2):
-            self.add(rssi.RssiCore(
+            self.add(amcc.lazyDevice(
+                deviceClass  =  rssi.RssiCore,
+                lazy         =  lazyDevices,
                 name         = f'SwRssiServer[{i}]',
                 offset       =  0x0A010000 + (i * 0x1000),
                 description  = "SwRssiServer Server: %i" % (i),
                 expand       =  False,
             ))
 
-        self.add(rssi.RssiCore(
+        self.add(amcc.lazyDevice(
+            deviceClass  =  rssi.RssiCore,
+            lazy         =  lazyDevices,
             name         = "SwRssiServer[2]",
             offset       =  0x0A020000,
             description  = "SwRssiServer Server",
@@ -175,8 +204,10 @@ class AmcCarrierCore(pr.Device):
 
         if (enableMps):
             self.add(mps.AppMps(
-                offset =  0x0C000000,
-                expand =  False
+                offset         =  0x0C000000,
+                statusSnapshot =  mpsStatusSnapshot,
+                linkMonitor    =  mpsLinkMonitor,
+                expand         =  False
             ))
 
         if (enablePwrI2C):
@@ -185,11 +216,12 @@ class AmcCarrierCore(pr.Device):
                 expand =  False
             ))
 
-    def writeBlocks(self, **kwargs):
+    def writeBlocks(self, pipelined=False, **kwargs):
         super().writeBlocks(**kwargs)
 
-        # Retire any in-flight transactions before starting
-        self._root.checkBlocks(recurse=True)
+        # Retire any in-flight transactions before starting,
+        # only the ones of this subtree during a pipelined load
+        (self if pipelined else self._root).checkBlocks(recurse=True)
 
         for i in range(2):
             v = getattr(self.AmcCarrierBsa, f'BsaWaveformEngine[{i}]')
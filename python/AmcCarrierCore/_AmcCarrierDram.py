@@ -0,0 +1,43 @@
+#-----------------------------------------------------------------------------
+# Title      : PyRogue AmcCarrier DRAM Module
+#-----------------------------------------------------------------------------
+# File       : AmcCarrierDram.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# PyRogue AmcCarrier DRAM Module
+#
+# Window on the AMC carrier DDR memory. The memBase must be the SRPv3 bridged
+# to the DDR AXI bus (AmcCarrierBsa SrpV3Axi, DISABLE_DDR_SRP_G = false), not
+# the register SRPv3. Addresses are the DDR addresses used by the
+# AxiStreamDmaRingWrite StartAddr/EndAddr/WrAddr registers.
+#-----------------------------------------------------------------------------
+# This file is part of the rogue software platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue software platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import pyrogue as pr
+
+from AmcCarrierCore._BurstAccess import burstRead
+
+class AmcCarrierDram(pr.Device):
+    def __init__(   self,
+            name        = "AmcCarrierDram",
+            description = "AmcCarrier DDR memory",
+            size        = 0x100000000,
+            chunkSize   = 0x100000, # Bytes in flight per wait
+            **kwargs):
+        super().__init__(name=name, description=description, size=size, **kwargs)
+        self._chunkSize = chunkSize
+
+    def read(self, ranges, out=None):
+        """
+        Read a list of (address, size) DDR byte ranges into a uint8 array,
+        waiting for the transactions every chunkSize bytes
+        """
+        return burstRead(self, ranges, out, chunkSize=self._chunkSize)
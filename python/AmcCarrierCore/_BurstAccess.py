@@ -0,0 +1,138 @@
+#-----------------------------------------------------------------------------
+# Title      : PyRogue Burst Register Access
+#-----------------------------------------------------------------------------
+# File       : BurstAccess.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# Raw memory transactions spanning many registers of a device. Each
+# (offset, size) range is split into _reqMaxAccess() sized transactions,
+# all the transactions are issued before waiting so the ranges share a
+# single round trip (or one per chunkSize bytes for the large transfers).
+# burstUpdate() sets the scalar variables of a device from the bytes read.
+#-----------------------------------------------------------------------------
+# This file is part of the rogue software platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue software platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import numpy   as np
+import pyrogue as pr
+import rogue.interfaces.memory as rim
+
+def _burstTransaction(device, ranges, data, txnType, chunkSize=None):
+    with device._memLock:
+        device._clearError()
+
+        pos     = 0
+        pending = 0
+        for offset, size in ranges:
+            for i in range(0, size, device._reqMaxAccess()):
+                txnSize = min(device._reqMaxAccess(), size-i)
+                device._reqTransaction(device.offset | (offset+i), data, txnSize, pos+i, txnType)
+
+                # Bound the bytes in flight
+                pending += txnSize
+                if (chunkSize is not None) and (pending >= chunkSize):
+                    device._waitTransaction(0)
+                    pending = 0
+                    _checkError(device, offset+i, pos+i)
+            pos += size
+
+        device._waitTransaction(0)
+        _checkError(device, ranges[0][0], pos)
+
+def _checkError(device, offset, size):
+    if device._getError() != "":
+        raise pr.MemoryError(name=device.name, address=device.address | offset, msg=device._getError(), size=size)
+
+def burstRead(device, ranges, out=None, chunkSize=None):
+    """
+    Read a list of (offset, size) byte ranges of device.
+    Returns a uint8 array holding the ranges back to back.
+    At most chunkSize bytes are in flight if set.
+    """
+    total = sum(size for _, size in ranges)
+    if out is None:
+        out = np.empty(total, dtype=np.uint8)
+    _burstTransaction(device, ranges, out, rim.Read, chunkSize)
+    return out
+
+def burstWrite(device, ranges, data, chunkSize=None):
+    """
+    Write a list of (offset, size) byte ranges of device.
+    data holds the bytes of the ranges back to back.
+    At most chunkSize bytes are in flight if set.
+    """
+    data = np.ascontiguousarray(data).view(np.uint8)
+    _burstTransaction(device, ranges, data, rim.Write, chunkSize)
+
+def _fields(var):
+    bitOffset = var.bitOffset if isinstance(var.bitOffset, (list,tuple)) else [var.bitOffset]
+    bitSize   = var.bitSize   if isinstance(var.bitSize,   (list,tuple)) else [var.bitSize]
+    return list(zip(bitOffset, bitSize))
+
+def burstDecodable(var):
+    """
+    Returns True if burstUpdate() can decode var (scalar UInt, Int or Bool)
+    """
+    return (type(var._base) in (pr.UInt, pr.Int, pr.Bool)) and (getattr(var, '_numValues', 0) == 0)
+
+def _nbytes(var):
+    return (max(off+size for off, size in _fields(var)) + 7) // 8
+
+def burstVariables(device, ranges):
+    """
+    Returns the burstDecodable() RO variables of device held in the
+    (offset, size) ranges
+    """
+    return [var for var in device.variables.values()
+            if isinstance(var, pr.RemoteVariable) and (var.mode == 'RO') and burstDecodable(var) and
+            any((offset <= var.offset) and (var.offset + _nbytes(var) <= offset + size) for offset, size in ranges)]
+
+def burstSpan(device, variables):
+    """
+    Returns the (offset, size) range holding variables, aligned to the
+    minimum access size of device
+    """
+    align = device._reqMinAccess()
+    lo    = min(var.offset for var in variables)
+    hi    = max(var.offset + _nbytes(var) for var in variables)
+    lo    = (lo // align) * align
+    hi    = -(-hi // align) * align
+    return (lo, hi-lo)
+
+def burstUpdate(variables, raw, offset):
+    """
+    Set the burstDecodable() variables from raw, the bytes read at offset,
+    and notify their listeners. The hardware is not accessed.
+    """
+    buf = int.from_bytes(np.ascontiguousarray(raw).view(np.uint8).tobytes(), 'little')
+    for var in variables:
+        value = 0
+        width = 0
+        for off, size in _fields(var):
+            value |= ((buf >> (8*(var.offset-offset) + off)) & ((1 << size) - 1)) << width
+            width += size
+
+        if type(var._base) is pr.Int and (value >> (width-1)):
+            value -= 1 << width
+        elif type(var._base) is pr.Bool:
+            value = bool(value)
+
+        var.set(value, write=False)
+        var._queueUpdate()
+
+def burstUpdateRanges(variables, raw, ranges):
+    """
+    burstUpdate() of the variables from raw holding the (offset, size)
+    ranges back to back, as returned by burstRead()
+    """
+    pos = 0
+    for offset, size in ranges:
+        burstUpdate([var for var in variables if offset <= var.offset < offset+size], raw[pos:pos+size], offset)
+        pos += size
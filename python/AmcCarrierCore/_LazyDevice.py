@@ -0,0 +1,142 @@
+#-----------------------------------------------------------------------------
+# Title      : PyRogue Lazy Device Placeholder
+#-----------------------------------------------------------------------------
+# File       : LazyDevice.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# Placeholder of a device whose variables, blocks and YAML bindings are only
+# built when the device is used.
+#
+# The placeholder is an empty device with the name, offset and GUI flags of
+# the real one. On the first access to a node or method it is not providing
+# (or an explicit build()), the real device is constructed and replaces the
+# placeholder in its parent, at the same position. The placeholder forwards
+# to the real device afterwards. The tree can only change before
+# Root.start(): buildLazyDevices() builds the placeholders used by a YAML
+# configuration beforehand, the ones still unbuilt when the root starts stay
+# empty (no blocks, not in the YAML dumps, their YAML entries ignored).
+#-----------------------------------------------------------------------------
+# This file is part of the rogue software platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue software platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import pyrogue as pr
+
+# pr.Device arguments kept by the placeholder
+LazyDeviceArgs = ['name', 'description', 'offset', 'memBase', 'hidden', 'expand', 'enabled']
+
+class LazyDevice(pr.Device):
+    def __init__(self, deviceClass, **kwargs):
+        kwargs.setdefault('name', deviceClass.__name__)
+        pr.Device.__init__(self, **{k: v for k, v in kwargs.items() if k in LazyDeviceArgs})
+        self._lazyClass  = deviceClass
+        self._lazyArgs   = kwargs
+        self._lazyDevice = None
+        self._lazyWarn   = True
+
+    def build(self):
+        """
+        Build the real device and put it in place of the placeholder in the
+        parent, only possible before the root starts. Returns the device.
+        """
+        if self._lazyDevice is not None:
+            return self._lazyDevice
+        if self._root is not None:
+            raise pr.NodeError(f'{self.path}: lazy device can not be built once the root is started')
+
+        dev    = self._lazyClass(**self._lazyArgs)
+        parent = self._parent
+
+        if parent is not None:
+            # Swap the placeholder for the device, keeping the node order
+            order = list(parent._nodes.keys())
+            del parent._nodes[self.name]
+            _removeArrayNode(parent.__dict__.get('_anodes', {}), self)
+            parent.add(dev)
+            nodes = {key: parent._nodes[key] for key in order}
+            parent._nodes.clear()
+            parent._nodes.update(nodes)
+            if parent.__dict__.get(self.name) is self:
+                setattr(parent, self.name, dev)
+
+        self._lazyDevice = dev
+        return dev
+
+    def __getattr__(self, name):
+        # Only the attributes of the real device, once the placeholder is constructed
+        if name.startswith('_') or ('_lazyArgs' not in self.__dict__):
+            raise AttributeError(name)
+        if self._lazyDevice is not None:
+            return getattr(self._lazyDevice, name)
+        if name in self._nodes:
+            return self._nodes[name]
+        if self._root is not None:
+            raise AttributeError(f'{self.path}.{name}: lazy device not built before the root started')
+        return getattr(self.build(), name)
+
+    def _setDict(self, d, *args, **kwargs):
+        if self._lazyDevice is not None:
+            return self._lazyDevice._setDict(d, *args, **kwargs)
+        if self._root is None:
+            return self.build()._setDict(d, *args, **kwargs)
+        if self._lazyWarn:
+            self._lazyWarn = False
+            self._log.warning(f'{self.path}: lazy device not built before the root started, its configuration is ignored')
+
+def _removeArrayNode(anodes, node):
+    # Name[i] nodes are also indexed in the (nested) array node dicts
+    for key, value in list(anodes.items()):
+        if value is node:
+            del anodes[key]
+        elif isinstance(value, dict):
+            _removeArrayNode(value, node)
+
+def lazyDevice(deviceClass, lazy=True, **kwargs):
+    """
+    Returns a LazyDevice placeholder of deviceClass(**kwargs), or the device
+    itself if lazy is False
+    """
+    return LazyDevice(deviceClass, **kwargs) if lazy else deviceClass(**kwargs)
+
+def _matchKey(key, name):
+    # YAML keys may address array nodes with a pattern (Name[*], Name[0:2], ...)
+    return (key == name) or (key.split('[')[0] == name.split('[')[0])
+
+def _buildFromDict(dev, data):
+    for node in list(dev.nodes.values()):
+        keys = [key for key in data if _matchKey(key, node.name)]
+        if not keys:
+            continue
+        if isinstance(node, LazyDevice):
+            node = node.build()
+        if isinstance(node, pr.Device):
+            for key in keys:
+                if isinstance(data[key], dict):
+                    _buildFromDict(node, data[key])
+
+def _buildAll(dev):
+    for node in list(dev.nodes.values()):
+        if isinstance(node, LazyDevice):
+            node = node.build()
+        if isinstance(node, pr.Device):
+            _buildAll(node)
+
+def buildLazyDevices(root, config=None):
+    """
+    Build the lazy devices under root (before Root.start()) addressed by the
+    YAML configuration file(s), or all of them if config is None
+    """
+    if config is None:
+        _buildAll(root)
+        return
+
+    for fName in ([config] if isinstance(config, str) else config):
+        data = pr.yamlToData(fName=fName)
+        if isinstance(data, dict) and (root.name in data):
+            _buildFromDict(root, data[root.name])
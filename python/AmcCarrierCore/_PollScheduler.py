@@ -0,0 +1,267 @@
+#-----------------------------------------------------------------------------
+# Title      : PyRogue Adaptive Poll Scheduler
+#-----------------------------------------------------------------------------
+# File       : PollScheduler.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# Takes over the polling of the remote variables with a pollInterval.
+#
+# The polled variables of a device are grouped by address window. The
+# groups due on a device are read by a single burst (each group span issued
+# before one wait) and the variables set from the bytes read, the variables
+# the burst can not decode (arrays, floats, ...) are read by readBlocks().
+# A group whose values did not change is polled less often (up to
+# MaxInterval), a change brings it back to its pollInterval. All the
+# intervals are stretched while the round trip of a device burst shows a
+# busy link. The RO build generics (*_G) are read by the root start/ReadAll only.
+#-----------------------------------------------------------------------------
+# This file is part of the rogue software platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue software platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import re
+import time
+import threading
+import numpy   as np
+import pyrogue as pr
+
+from AmcCarrierCore._BurstAccess import burstRead, burstUpdate, burstDecodable, burstSpan
+
+# RO variables holding build constants, never polled
+PollStaticPattern = re.compile(r'.*_G$')
+PollStaticNames   = ['MaxWaveformSize']
+
+# Limit of the busy link interval scale
+PollMaxBusyScale = 16
+
+def _equal(a, b):
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    return a == b
+
+class _PollGroup(object):
+    def __init__(self, device, variables, interval):
+        self.device    = device
+        self.variables = variables
+        self.base      = interval
+        self.interval  = interval
+        self.due       = 0.0
+        self.last      = None
+        self.decoded   = [var for var in variables if burstDecodable(var)]
+        self.other     = [var for var in variables if not burstDecodable(var)]
+        self.span      = burstSpan(device, self.decoded) if self.decoded else None
+
+class PollScheduler(pr.Device):
+    def __init__(   self,
+            name         = "PollScheduler",
+            description  = "Adaptive, coalesced polling of the pollInterval variables",
+            scope        = None,   # Device whose variables are polled, None for the whole root
+            window       = 0x40,   # Largest address gap (bytes) within a group
+            maxInterval  = 30.0,
+            backoff      = 2.0,
+            busyLatency  = 0.05,
+            **kwargs):
+        super().__init__(name=name, description=description, **kwargs)
+
+        self._scope      = scope
+        self._window     = window
+        self._groups     = []
+        self._polled     = {}
+        self._static     = 0
+        self._readCount  = 0
+        self._busyScale  = 1
+        self._lock       = threading.Lock()
+        self._stopEvent  = threading.Event()
+        self._thread     = None
+
+        ##############################
+        # Variables
+        ##############################
+
+        self.add(pr.LocalVariable(
+            name         = "MaxInterval",
+            description  = "Longest poll interval (seconds) of a group whose values do not change",
+            mode         = "RW",
+            value        = maxInterval,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "Backoff",
+            description  = "Poll interval factor applied after each read without change",
+            mode         = "RW",
+            value        = backoff,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "BusyLatency",
+            description  = "Round trip (seconds) of a single device burst above which the link is considered busy",
+            mode         = "RW",
+            value        = busyLatency,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "Groups",
+            description  = "Number of polled address windows",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: len(self._groups),
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "Static",
+            description  = "Number of build constants removed from polling",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self._static,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "ReadCount",
+            description  = "Number of group reads since start",
+            mode         = "RO",
+            value        = 0,
+            localGet     = lambda: self._readCount,
+            pollInterval = 1,
+        ))
+
+        self.add(pr.LocalVariable(
+            name         = "BusyScale",
+            description  = "Poll interval scale applied while the link is busy",
+            mode         = "RO",
+            value        = 1,
+            localGet     = lambda: self._busyScale,
+            pollInterval = 1,
+        ))
+
+        ##############################
+        # Commands
+        ##############################
+        @self.command(description="Poll all the groups at their pollInterval again",)
+        def Reset():
+            with self._lock:
+                self._busyScale = 1
+                for group in self._groups:
+                    group.interval = group.base
+                    group.due      = 0.0
+
+    ##############################
+    # Take over / release
+    ##############################
+
+    def _takeOver(self, scope):
+        byDevice = {}
+        for var in scope.find(typ=pr.RemoteVariable):
+            if var.pollInterval <= 0:
+                continue
+
+            self._polled[var] = var.pollInterval
+            var.pollInterval  = 0
+
+            if (var.mode == 'RO') and (PollStaticPattern.match(var.name) or (var.name in PollStaticNames)):
+                self._static += 1
+            else:
+                byDevice.setdefault(var.parent, []).append(var)
+
+        # Split the variables of a device at the address gaps larger than the window
+        for dev, variables in byDevice.items():
+            variables.sort(key=lambda var: var.offset)
+            group = [variables[0]]
+            for var in variables[1:]:
+                if (var.offset - group[-1].offset) > self._window:
+                    self._addGroup(dev, group)
+                    group = []
+                group.append(var)
+            self._addGroup(dev, group)
+
+    def _addGroup(self, dev, variables):
+        self._groups.append(_PollGroup(dev, variables, min(self._polled[var] for var in variables)))
+
+    def _release(self):
+        for var, interval in self._polled.items():
+            var.pollInterval = interval
+        self._polled.clear()
+        self._groups = []
+        self._static = 0
+
+    def _start(self):
+        super()._start()
+        self._takeOver(self._scope if self._scope is not None else self._root)
+        self._stopEvent.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _stop(self):
+        if self._thread is not None:
+            self._stopEvent.set()
+            self._thread.join()
+            self._thread = None
+        self._release()
+        super()._stop()
+
+    ##############################
+    # Polling
+    ##############################
+
+    def _run(self):
+        while not self._stopEvent.is_set():
+            now = time.monotonic()
+            with self._lock:
+                due  = [group for group in self._groups if group.due <= now]
+                wait = min([group.due for group in self._groups], default=now+1.0) - now
+
+            if due and self._root.PollEn.value():
+                self._poll(due)
+            else:
+                self._stopEvent.wait(min(max(wait, 0.01), 1.0))
+
+    def _poll(self, groups):
+        # Slowest device burst, the bursts of a poll are issued one after the other
+        latency = 0.0
+        try:
+            byDevice = {}
+            for group in groups:
+                byDevice.setdefault(group.device, []).append(group)
+
+            for dev, devGroups in byDevice.items():
+                start = time.monotonic()
+                other = [var for group in devGroups for var in group.other]
+                if other:
+                    dev.readBlocks(recurse=False, variable=other)
+
+                burst = [group for group in devGroups if group.span is not None]
+                if burst:
+                    raw = burstRead(dev, [group.span for group in burst])
+                    pos = 0
+                    for group in burst:
+                        burstUpdate(group.decoded, raw[pos:pos+group.span[1]], group.span[0])
+                        pos += group.span[1]
+
+                if other:
+                    dev.checkBlocks(recurse=False, variable=other)
+                latency = max(latency, time.monotonic() - start)
+            error = False
+        except Exception as e:
+            self._log.warning(f'{self.path}: poll failed: {e}')
+            error = True
+        now = time.monotonic()
+
+        with self._lock:
+            busy = error or (latency > self.BusyLatency.value())
+            self._busyScale = min(2*self._busyScale, PollMaxBusyScale) if busy else max(self._busyScale//2, 1)
+            self._readCount += len(groups)
+
+            maxInterval = self.MaxInterval.value()
+            backoff     = self.Backoff.value()
+            for group in groups:
+                values  = None if error else [var.value() for var in group.variables]
+                changed = (values is not None) and ((group.last is None) or not all(_equal(a, b) for a, b in zip(values, group.last)))
+                if values is not None:
+                    group.last = values
+                group.interval = group.base if changed else min(group.interval*backoff, max(maxInterval, group.base))
+                group.due      = now + group.interval*self._busyScale
@@ -0,0 +1,268 @@
+#-----------------------------------------------------------------------------
+# Title      : PyRogue Startup Profiler
+#-----------------------------------------------------------------------------
+# File       : StartupProfiler.py
+# Created    : 2026-10-18
+#-----------------------------------------------------------------------------
+# Description:
+# Phase instrumentation of the root construction, YAML load and Init().
+#
+# A phase records its wall time and the memory transactions, bytes and
+# time.sleep() time of its thread while it is open (nested phases are
+# included in their parents). time.sleep, and the sleep attribute of the
+# modules that imported it with "from time import sleep", are replaced
+# while a phase is open only. A worker thread started within a phase
+# attributes its activity to the phases of its parent thread with
+# profileContext()/adoptProfileContext() (sleep times are summed over the
+# threads). The transactions are counted by a hub placed
+# between the tree and the SRP, instrument() wraps the writeBlocks()
+# overrides and the Init commands of the devices of a tree in phases named
+# after the device path. The phases are summarized per name and exported
+# as a Chrome trace (chrome://tracing, Perfetto).
+#-----------------------------------------------------------------------------
+# This file is part of the rogue software platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue software platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import sys
+import time
+import json
+import threading
+import contextlib
+import pyrogue as pr
+import rogue.interfaces.memory as rim
+
+# Device methods and commands wrapped by StartupProfiler.instrument()
+ProfileMethods = ['writeBlocks', 'Init', 'InitAmcCard', 'InitRtm', 'LoadConfig']
+
+# time.sleep() is replaced while at least one outermost phase is open
+_sleep          = time.sleep
+_sleepLock      = threading.Lock()
+_sleepProfilers = {}  # profiler: open outermost phases
+_sleepPatched   = []  # modules whose sleep attribute is replaced
+
+def _profiledSleep(seconds):
+    start = time.monotonic()
+    _sleep(seconds)
+    dt = time.monotonic() - start
+    for profiler in list(_sleepProfilers):
+        with profiler._lock:
+            for phase in profiler._stack():
+                phase.sleep += dt
+
+def _patchSleep(profiler):
+    with _sleepLock:
+        if not _sleepProfilers:
+            for module in list(sys.modules.values()):
+                if getattr(module, '__dict__', {}).get('sleep') is _sleep:
+                    module.sleep = _profiledSleep
+                    _sleepPatched.append(module)
+        _sleepProfilers[profiler] = _sleepProfilers.get(profiler, 0) + 1
+
+def _restoreSleep(profiler):
+    with _sleepLock:
+        _sleepProfilers[profiler] -= 1
+        if _sleepProfilers[profiler] == 0:
+            del _sleepProfilers[profiler]
+        if not _sleepProfilers:
+            for module in _sleepPatched:
+                module.sleep = _sleep
+            _sleepPatched.clear()
+
+def profileContext():
+    """
+    Returns the open phases of the calling thread, for adoptProfileContext()
+    """
+    with _sleepLock:
+        profilers = list(_sleepProfilers)
+    return [(profiler, list(profiler._stack())) for profiler in profilers if profiler._stack()]
+
+@contextlib.contextmanager
+def adoptProfileContext(context):
+    """
+    Context manager attributing the transactions, sleeps and phases of the
+    calling (worker) thread to the phases of profileContext()
+    """
+    prev = []
+    for profiler, stack in context:
+        prev.append((profiler, profiler._stack()))
+        profiler._local.stack = list(stack)
+    try:
+        yield
+    finally:
+        for profiler, stack in prev:
+            profiler._local.stack = stack
+
+class ProfileHub(rim.Hub):
+    # Pass-through hub counting the transactions and bytes
+    def __init__(self, profiler):
+        rim.Hub.__init__(self, 0, 0, 0)
+        self._profiler = profiler
+
+    def _doTransaction(self, transaction):
+        self._profiler._count(transaction.size())
+        rim.Hub._doTransaction(self, transaction)
+
+class _Phase(object):
+    def __init__(self, name, start, tid, depth):
+        self.name         = name
+        self.start        = start
+        self.end          = None
+        self.tid          = tid
+        self.depth        = depth
+        self.transactions = 0
+        self.bytes        = 0
+        self.sleep        = 0.0
+
+class StartupProfiler(object):
+    def __init__(self):
+        self._lock   = threading.Lock()
+        self._local  = threading.local()
+        self._t0     = time.monotonic()
+        self._phases = []
+        self._tids   = {}
+        self.transactions = 0
+        self.bytes        = 0
+
+    def hub(self, slave):
+        """
+        Returns a counting hub forwarding to slave, to be used as memBase
+        """
+        hub = ProfileHub(self)
+        hub._setSlave(slave)
+        return hub
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def _count(self, size):
+        with self._lock:
+            self.transactions += 1
+            self.bytes        += size
+            for phase in self._stack():
+                phase.transactions += 1
+                phase.bytes        += size
+
+    ##############################
+    # Phases
+    ##############################
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Context manager recording a phase of the calling thread
+        """
+        stack = self._stack()
+        with self._lock:
+            tid = self._tids.setdefault(threading.get_ident(), len(self._tids))
+            phase = _Phase(name, time.monotonic(), tid, len(stack))
+            self._phases.append(phase)
+        if not stack:
+            _patchSleep(self)
+        stack.append(phase)
+        try:
+            yield phase
+        finally:
+            stack.pop()
+            phase.end = time.monotonic()
+            if not stack:
+                _restoreSleep(self)
+
+    def record(self, name, start, end):
+        """
+        Record a phase measured by the caller (time.monotonic() values)
+        """
+        with self._lock:
+            tid   = self._tids.setdefault(threading.get_ident(), len(self._tids))
+            phase = _Phase(name, start, tid, len(self._stack()))
+            phase.end = end
+            self._phases.append(phase)
+
+    def wrap(self, name, func):
+        """
+        Returns func recorded as a phase on every call
+        """
+        def wrapper(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def instrument(self, root, methods=ProfileMethods, allDevices=False):
+        """
+        Wrap the methods (writeBlocks() overrides and commands) of the devices
+        of root in phases named <path>.<method>. Only the devices overriding
+        writeBlocks() are instrumented for it unless allDevices is set.
+        """
+        for dev in [root] + root.deviceList:
+            for name in methods:
+                func = getattr(dev, name, None)
+                if func is None:
+                    continue
+                if (name == 'writeBlocks') and not (allDevices or (type(dev).writeBlocks is not pr.Device.writeBlocks)):
+                    continue
+                setattr(dev, name, self.wrap(f'{dev.path}.{name}', func))
+
+    ##############################
+    # Results
+    ##############################
+
+    def reset(self):
+        with self._lock:
+            self._t0     = time.monotonic()
+            self._phases = []
+            self.transactions = 0
+            self.bytes        = 0
+
+    def summary(self):
+        """
+        Returns {phase name: {Calls, Wall, Transactions, Bytes, Sleep}}
+        of the completed phases, in start order (times in seconds)
+        """
+        ret = {}
+        with self._lock:
+            phases = [phase for phase in self._phases if phase.end is not None]
+        for phase in phases:
+            s = ret.setdefault(phase.name, {'Calls': 0, 'Wall': 0.0, 'Transactions': 0, 'Bytes': 0, 'Sleep': 0.0})
+            s['Calls']        += 1
+            s['Wall']         += phase.end - phase.start
+            s['Transactions'] += phase.transactions
+            s['Bytes']        += phase.bytes
+            s['Sleep']        += phase.sleep
+        return ret
+
+    def chromeTrace(self):
+        """
+        Returns the completed phases in the Chrome trace event format
+        """
+        with self._lock:
+            phases = [phase for phase in self._phases if phase.end is not None]
+        return {
+            'traceEvents' : [{
+                'name' : phase.name,
+                'ph'   : 'X',
+                'ts'   : (phase.start - self._t0) * 1e6,
+                'dur'  : (phase.end - phase.start) * 1e6,
+                'pid'  : 0,
+                'tid'  : phase.tid,
+                'args' : {
+                    'Transactions' : phase.transactions,
+                    'Bytes'        : phase.bytes,
+                    'Sleep'        : phase.sleep,
+                },
+            } for phase in phases],
+            'displayTimeUnit' : 'ms',
+        }
+
+    def exportChromeTrace(self, fName):
+        """
+        Write the Chrome trace JSON file
+        """
+        with open(fName, 'w') as f:
+            json.dump(self.chromeTrace(), f)
@@ -1,4 +1,9 @@
+from AmcCarrierCore._BurstAccess import *
+from AmcCarrierCore._LazyDevice import *
+from AmcCarrierCore._StartupProfiler import *
+from AmcCarrierCore._PollScheduler import *
 from AmcCarrierCore._AmcCarrierBsa import *
 from AmcCarrierCore._AmcCarrierBsi import *
+from AmcCarrierCore._AmcCarrierDram import *
 from AmcCarrierCore._AmcCarrierTiming import *
 from AmcCarrierCore._AmcCarrierCore import *
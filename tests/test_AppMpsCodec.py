@@ -0,0 +1,135 @@
+#-----------------------------------------------------------------------------
+# This file is part of the AmcCarrier Core. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the AmcCarrierCore, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import numpy  as np
+import pytest
+
+pytest.importorskip('pyrogue')
+
+from AmcCarrierCore.AppMps._AppMpsCodec import *  # noqa: E402,F403
+
+def _assignSlv(bits, value, width):
+    # AppMpsPkg assignSlv(): fields appended LSB first from bit 0
+    bits.extend((int(value) >> b) & 0x1 for b in range(width))
+
+def _vector(bits, nbits):
+    bits = bits + [0] * (nbits - len(bits))
+    return np.packbits(np.array(bits[:nbits], dtype=np.uint8), bitorder='little')
+
+def _handPackMessage(m):
+    bits = []
+    _assignSlv(bits, m['valid'],     1)
+    _assignSlv(bits, m['version'],   5)
+    _assignSlv(bits, m['lcls'],      1)
+    _assignSlv(bits, m['inputType'], 1)
+    _assignSlv(bits, m['msgSize'],   8)
+    _assignSlv(bits, m['appId'],     16)
+    _assignSlv(bits, m['timeStamp'], 16)
+    for byte in m['message']:
+        _assignSlv(bits, byte, 8)
+    return _vector(bits, MpsMessageBits)  # noqa: F405
+
+def _handPackMitigation(m):
+    bits = []
+    _assignSlv(bits, m['strobe'],    1)
+    _assignSlv(bits, m['latchDiag'], 1)
+    _assignSlv(bits, m['tag'],       16)
+    _assignSlv(bits, m['timeStamp'], 16)
+    for cls in m['class']:
+        _assignSlv(bits, cls, 4)
+    return _vector(bits, MpsMitigationBits)  # noqa: F405
+
+def _randomMessages(n, rng, msgSize=None):
+    msgs = np.zeros(n, dtype=MpsMessageType)  # noqa: F405
+    msgs['valid']     = 1
+    msgs['version']   = rng.integers(0, 32, n)
+    msgs['lcls']      = rng.integers(0, 2, n)
+    msgs['inputType'] = rng.integers(0, 2, n)
+    msgs['timeStamp'] = rng.integers(0, 1 << 16, n)
+    msgs['appId']     = rng.integers(0, 1 << 10, n)
+    msgs['msgSize']   = rng.integers(1, MpsChanCount+1, n) if msgSize is None else msgSize  # noqa: F405
+    msgs['message']   = rng.integers(0, 256, (n, MpsChanCount))  # noqa: F405
+    msgs['message']   = np.where(np.arange(MpsChanCount) < msgs['msgSize'][:,None], msgs['message'], 0)  # noqa: F405
+    return msgs
+
+def _randomMitigations(n, rng):
+    msgs = np.zeros(n, dtype=MpsMitigationMsgType)  # noqa: F405
+    msgs['strobe']    = 1
+    msgs['latchDiag'] = rng.integers(0, 2, n)
+    msgs['tag']       = rng.integers(0, 1 << 16, n)
+    msgs['timeStamp'] = rng.integers(0, 1 << 16, n)
+    msgs['class']     = rng.integers(0, 16, (n, MpsDestCount))  # noqa: F405
+    return msgs
+
+def test_pack_message_vectors():
+    rng  = np.random.default_rng(1)
+    msgs = _randomMessages(64, rng)
+    vec  = packMpsMessages(msgs)  # noqa: F405
+
+    for i, m in enumerate(msgs):
+        np.testing.assert_array_equal(vec[i], _handPackMessage(m))
+    np.testing.assert_array_equal(unpackMpsMessages(vec), msgs)  # noqa: F405
+
+def test_pack_mitigation_vectors():
+    rng  = np.random.default_rng(2)
+    msgs = _randomMitigations(64, rng)
+    vec  = packMpsMitigationMsgs(msgs)  # noqa: F405
+
+    for i, m in enumerate(msgs):
+        np.testing.assert_array_equal(vec[i], _handPackMitigation(m))
+    np.testing.assert_array_equal(unpackMpsMitigationMsgs(vec), msgs)  # noqa: F405
+
+def test_message_stream_frame():
+    # MpsMsgCore frame: header (msgSize + 5 bytes), appId, timeStamp, payload low byte first
+    m = np.zeros(1, dtype=MpsMessageType)  # noqa: F405
+    m['valid']      = 1
+    m['version']    = 3
+    m['inputType']  = 1
+    m['msgSize']    = 3
+    m['appId']      = 0x1234
+    m['timeStamp']  = 0xBEEF
+    m['message'][0,:3] = [0x11, 0x22, 0x33]
+
+    words, offsets = encodeMpsStream(m)  # noqa: F405
+    np.testing.assert_array_equal(words, [0x2308, 0x1234, 0xBEEF, 0x2211, 0x0033])
+    np.testing.assert_array_equal(offsets, [0, 5])
+    np.testing.assert_array_equal(decodeMpsStream(words), m)  # noqa: F405
+
+@pytest.mark.parametrize('msgSize', [None, 6, 7])
+def test_message_stream_round_trip(msgSize):
+    rng  = np.random.default_rng(3)
+    msgs = _randomMessages(100, rng, msgSize)
+    words, offsets = encodeMpsStream(msgs)  # noqa: F405
+
+    np.testing.assert_array_equal(decodeMpsStream(words, offsets), msgs)  # noqa: F405
+    np.testing.assert_array_equal(decodeMpsStream(words), msgs)           # noqa: F405
+
+def test_message_stream_skips_invalid():
+    rng  = np.random.default_rng(4)
+    msgs = _randomMessages(10, rng)
+    msgs['valid'][::2] = 0
+    words, _ = encodeMpsStream(msgs)  # noqa: F405
+    np.testing.assert_array_equal(decodeMpsStream(words), msgs[1::2])  # noqa: F405
+
+def test_mitigation_stream_round_trip():
+    rng  = np.random.default_rng(5)
+    msgs = _randomMitigations(50, rng)
+    frames = encodeMpsMitigationStream(msgs)  # noqa: F405
+
+    assert np.all((frames[:,0] & 0x80FF) == 0x800E)
+    cls = [int(c) for c in msgs['class'][0,:4]]
+    assert frames[0,3] == cls[0] | (cls[1] << 4) | (cls[2] << 8) | (cls[3] << 12)
+    np.testing.assert_array_equal(decodeMpsMitigationStream(frames), msgs)          # noqa: F405
+    np.testing.assert_array_equal(decodeMpsMitigationStream(frames.ravel()), msgs)  # noqa: F405
+
+def test_mitigation_in_update_stream():
+    frames = encodeMpsMitigationStream(_randomMitigations(1, np.random.default_rng(6)))  # noqa: F405
+    with pytest.raises(ValueError):
+        decodeMpsStream(frames.ravel(), [0, MpsMitigationWords])  # noqa: F405
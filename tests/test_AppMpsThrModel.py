@@ -0,0 +1,72 @@
+#-----------------------------------------------------------------------------
+# This file is part of the AmcCarrier Core. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the AmcCarrierCore, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import numpy  as np
+import pytest
+
+pytest.importorskip('pyrogue')
+
+from AmcCarrierCore.AppMps._AppMpsCodec    import MpsChanCount, encodeMpsStream, decodeMpsStream  # noqa: E402
+from AmcCarrierCore.AppMps._AppMpsThrModel import AppMpsThrModel, MpsChanConfigType, MpsTholdHold  # noqa: E402
+
+def _model():
+    cfg = np.zeros(MpsChanCount, dtype=MpsChanConfigType)
+    cfg[0] = (2, False, False, False, 0)
+    cfg[1] = (1, False, False, False, 1)
+
+    model = AppMpsThrModel(chanConfig=cfg, byteCount=2, lcls2Count=2)
+    model.mpsAppId     = 0x12
+    model.beamDestMask = 0xFFFF
+    model.chanReg['stdTholds'][0,0] = (False, True, 0, 100)   # Chan 0 thold 0: max 100
+    model.chanReg['stdTholds'][0,1] = (True,  False, -50, 0)  # Chan 0 thold 1: min -50
+    model.chanReg['stdTholds'][1,0] = (False, True, 0, 10)    # Chan 1 thold 0: max 10
+    return model
+
+def _data(n):
+    data = np.zeros((n, MpsChanCount), dtype=np.int32)
+    data[2,0]  = 101   # Trips chan 0 thold 0
+    data[30,0] = -51   # Trips chan 0 thold 1
+    data[40,1] = 11    # Trips chan 1 thold 0
+    return data
+
+def test_hold():
+    n    = 64
+    msgs = _model().evaluate(np.arange(n), np.zeros(n), _data(n))
+
+    # A tripped bit is set on its strobe and held the MpsTholdHold following ones
+    byte0 = msgs['message'][:,0]
+    expect = np.zeros(n, dtype=np.uint8)
+    expect[2:2+MpsTholdHold+1]   |= 0x1
+    expect[30:30+MpsTholdHold+1] |= 0x2
+    np.testing.assert_array_equal(byte0, expect)
+
+    expect = np.zeros(n, dtype=np.uint8)
+    expect[40:40+MpsTholdHold+1] = 0x1
+    np.testing.assert_array_equal(msgs['message'][:,1], expect)
+    assert np.all(msgs['message'][:,2:] == 0)
+    assert np.all(msgs['msgSize'] == 2) and np.all(msgs['appId'] == 0x12)
+
+@pytest.mark.parametrize('chunk', [1, 7, 16])
+def test_chunked_evaluation(chunk):
+    # The threshold memory is carried from one evaluate() call to the next
+    n     = 64
+    data  = _data(n)
+    whole = _model().evaluate(np.arange(n), np.zeros(n), data)
+
+    model = _model()
+    parts = [model.evaluate(np.arange(i, min(i+chunk, n)), np.zeros(min(chunk, n-i)), data[i:i+chunk]) for i in range(0, n, chunk)]
+    np.testing.assert_array_equal(np.concatenate(parts), whole)
+    assert model.tripValue[0] == -51 and model.tripPulseId[1] == 40
+
+def test_stream_round_trip():
+    n    = 64
+    msgs = _model().evaluate(np.arange(n), np.zeros(n), _data(n))
+    words, offsets = encodeMpsStream(msgs)
+    np.testing.assert_array_equal(decodeMpsStream(words, offsets), msgs)
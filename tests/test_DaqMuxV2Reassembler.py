@@ -0,0 +1,59 @@
+#-----------------------------------------------------------------------------
+# This file is part of the AmcCarrier Core. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the AmcCarrierCore, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import numpy  as np
+import pytest
+
+pytest.importorskip('pyrogue')
+
+from AmcCarrierCore.DaqMuxV2._DaqMuxV2Reassembler import DaqMuxV2Reassembler # noqa: E402
+from test_DaqMuxV2Receiver import _daqMux, _packet, _frames                    # noqa: E402
+
+class _Collector(DaqMuxV2Reassembler):
+    def __init__(self, **kwargs):
+        super().__init__(ringDepth=4, maxSize=0x4000, **kwargs)
+        self.acqs = []
+
+    def processAcquisition(self, acq):
+        self.acqs.append((acq.timestamp, acq.complete, list(acq.gaps), acq.data.copy()))
+
+def test_multi_frame_reassembly():
+    rx      = _Collector(daqMux=_daqMux())
+    samples = np.arange(10000, dtype='<i2')
+    for raw in _frames(_packet(samples, timestamp=7)):
+        rx.receive(raw, channel=0, sof=True)
+
+    assert len(rx.acqs) == 1
+    ts, complete, gaps, data = rx.acqs[0]
+    assert (ts, complete, gaps) == (7, True, [])
+    np.testing.assert_array_equal(data, samples)
+
+def test_truncated_packet():
+    # Errored last frame: the acquisition closes incomplete with a gap
+    rx     = _Collector(daqMux=_daqMux())
+    frames = _frames(_packet(np.arange(5000, dtype='<i2'), timestamp=1))
+    for raw in frames[:2]:
+        rx.receive(raw, channel=0, sof=True, eofe=False)
+    rx.receive(frames[2][:0], channel=0, sof=True, eofe=True)
+
+    assert len(rx.acqs) == 1
+    assert rx.acqs[0][1] is False
+    assert rx.GapCount.value() > 0
+
+def test_interleaved_channels():
+    rx = _Collector(daqMux=_daqMux())
+    a  = _frames(_packet(np.arange(5000, dtype='<i2'), timestamp=1, axiNum=0))
+    b  = _frames(_packet(-np.arange(5000, dtype='<i2'), timestamp=2, axiNum=1))
+    for fa, fb in zip(a, b):
+        rx.receive(fa, channel=0, sof=True)
+        rx.receive(fb, channel=1, sof=True)
+
+    assert [(ts, complete) for ts, complete, _, _ in rx.acqs] == [(1, True), (2, True)]
+    np.testing.assert_array_equal(rx.acqs[1][3], -np.arange(5000, dtype='<i2'))
@@ -0,0 +1,111 @@
+#-----------------------------------------------------------------------------
+# This file is part of the AmcCarrier Core. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the AmcCarrierCore, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import types
+import numpy  as np
+import pytest
+
+pytest.importorskip('pyrogue')
+
+from AmcCarrierCore.DaqMuxV2._DaqMuxV2Receiver import DaqMuxV2Receiver, DaqMuxV2HeaderType # noqa: E402
+
+FrameSize = 4096
+
+class _Value(object):
+    def __init__(self, value):
+        self._value = value
+
+    def value(self):
+        return self._value
+
+def _daqMux(headerEn=True):
+    # Shadow values read by the receiver, no register access
+    return types.SimpleNamespace(
+        PacketHeaderEn  = _Value(1 if headerEn else 0),
+        FormatDataWidth = [_Value(1) for _ in range(16)],
+        FormatSign      = [_Value(1) for _ in range(16)],
+    )
+
+class _Collector(DaqMuxV2Receiver):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.frames = []
+
+    def process(self, frame):
+        self.frames.append(frame)
+
+def _packet(samples, timestamp=0x123456789, axiNum=3, bay=1, rateDiv=5):
+    # DaqLane.vhd packet: header (packetSize includes it) followed by 16-bit samples
+    hdr = np.zeros(1, dtype=DaqMuxV2HeaderType)
+    hdr['timestamp']  = [timestamp & 0xFFFFFFFF, timestamp >> 32]
+    hdr['packetSize'] = (DaqMuxV2HeaderType.itemsize + samples.nbytes) // 4
+    hdr['flags']      = (1 << 23) | (bay << 20) | (axiNum << 16) | rateDiv
+    return np.concatenate([hdr.view(np.uint8), samples.view(np.uint8)])
+
+def _frames(raw):
+    # Every frame of a packet has SOF set
+    return [raw[i:i+FrameSize] for i in range(0, raw.size, FrameSize)]
+
+def test_multi_frame_decode():
+    rx      = _Collector(daqMux=_daqMux())
+    samples = np.arange(5000, dtype='<i2')
+
+    for raw in _frames(_packet(samples)):
+        rx.receive(raw, channel=0, sof=True)
+
+    frames = rx.frames
+    assert len(frames) == 3
+    assert [f.first for f in frames] == [True, False, False]
+    assert [f.last  for f in frames] == [False, False, True]
+
+    # Only the first frame has its header stripped
+    assert frames[0].data.size == (FrameSize - DaqMuxV2HeaderType.itemsize) // 2
+    assert frames[1].data.size == FrameSize // 2
+
+    # The continuation frames carry the packet header, not sample data
+    for f in frames:
+        assert f.timestamp == 0x123456789
+        assert (f.axiNum, f.bay, f.rateDiv, f.data16) == (3, 1, 5, True)
+
+    np.testing.assert_array_equal(np.concatenate([f.data for f in frames]), samples)
+
+def test_packet_size_boundary():
+    # A packet filling exactly two frames ends on packetSize, the next one starts with a header
+    rx = _Collector(daqMux=_daqMux())
+    n  = (2*FrameSize - DaqMuxV2HeaderType.itemsize) // 2
+    for ts in [1, 2]:
+        for raw in _frames(_packet(np.full(n, ts, dtype='<i2'), timestamp=ts)):
+            rx.receive(raw, channel=0, sof=True)
+
+    assert [f.first for f in rx.frames] == [True, False, True, False]
+    assert [f.last  for f in rx.frames] == [False, True, False, True]
+    assert [f.timestamp for f in rx.frames] == [1, 1, 2, 2]
+
+def test_channels_independent():
+    # Interleaved channels keep their own packet state
+    rx = _Collector(daqMux=_daqMux())
+    a  = _frames(_packet(np.arange(3000, dtype='<i2'), axiNum=0))
+    b  = _frames(_packet(np.arange(3000, dtype='<i2'), axiNum=1))
+    for fa, fb in zip(a, b):
+        rx.receive(fa, channel=0, sof=True)
+        rx.receive(fb, channel=1, sof=True)
+
+    assert [(f.channel, f.first, f.axiNum) for f in rx.frames] == [(0, True, 0), (1, True, 1), (0, False, 0), (1, False, 1)]
+
+def test_no_header_short_frame():
+    # Without packet header the packet ends on the short frame
+    rx = _Collector(daqMux=_daqMux(headerEn=False))
+    for raw in _frames(np.arange(5000, dtype='<i2').view(np.uint8)):
+        rx.receive(raw, channel=2, sof=True)
+
+    assert [f.first for f in rx.frames] == [True, False, False]
+    assert [f.last  for f in rx.frames] == [False, False, True]
+    assert all(f.header is None for f in rx.frames)
+    assert sum(f.data.size for f in rx.frames) == 5000
@@ -0,0 +1,94 @@
+#-----------------------------------------------------------------------------
+# This file is part of the AmcCarrier Core. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the AmcCarrierCore, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import pytest
+
+pr = pytest.importorskip('pyrogue')
+pytest.importorskip('surf')
+
+import pyrogue.interfaces.simulation                                                 # noqa: E402
+from AmcCarrierCore._LazyDevice import LazyDevice, lazyDevice, buildLazyDevices      # noqa: E402
+
+class _Regs(pr.Device):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.add(pr.RemoteVariable(
+            name         = "Scratch",
+            offset       = 0x0,
+            bitSize      = 32,
+            base         = pr.UInt,
+            mode         = "RW",
+        ))
+
+class _Top(pr.Device):
+    def __init__(self, lazy=True, **kwargs):
+        super().__init__(**kwargs)
+        self.add(_Regs(name='Before', offset=0x0000))
+        self.add(lazyDevice(deviceClass=_Regs, lazy=lazy, name='Regs', offset=0x1000))
+        for i in range(2):
+            self.add(lazyDevice(deviceClass=_Regs, lazy=lazy, name=f'Array[{i}]', offset=0x2000+i*0x1000))
+        self.add(_Regs(name='After', offset=0x8000))
+
+class _Root(pr.Root):
+    def __init__(self, **kwargs):
+        super().__init__(name='root', pollEn=False, **kwargs)
+        mem = pyrogue.interfaces.simulation.MemEmulate()
+        self.addInterface(mem)
+        self.add(_Top(name='Top', memBase=mem))
+
+def _deviceNames(dev):
+    return [name for name, node in dev.nodes.items() if isinstance(node, pr.Device)]
+
+def test_build_before_start():
+    root = _Root()
+    top  = root.Top
+    assert isinstance(top.Regs, LazyDevice)
+
+    # First access builds the device in place, keeping the node order
+    scratch = top.Regs.Scratch
+    assert type(top.nodes['Regs']) is _Regs
+    assert top.nodes['Regs'].Scratch is scratch
+    assert _deviceNames(top) == ['Before', 'Regs', 'Array[0]', 'Array[1]', 'After']
+
+    top.Array[1].build()
+    assert type(top.Array[1]) is _Regs
+    assert isinstance(top.Array[0], LazyDevice)
+
+    with root:
+        top.Regs.Scratch.set(0x1234)
+        assert top.Regs.Scratch.get() == 0x1234
+        assert top.Regs.path == 'root.Top.Regs'
+        top.Array[1].Scratch.set(0x55)
+        assert top.Array[1].Scratch.get() == 0x55
+
+def test_unbuilt_after_start():
+    root = _Root()
+    with root:
+        assert isinstance(root.Top.Regs, LazyDevice)
+        with pytest.raises(AttributeError):
+            root.Top.Regs.Scratch
+
+def test_build_from_config(tmp_path):
+    cfg = tmp_path / 'config.yml'
+    cfg.write_text('root:\n  Top:\n    Regs:\n      Scratch: 0x42\n')
+
+    root = _Root()
+    buildLazyDevices(root, str(cfg))
+    assert type(root.Top.nodes['Regs']) is _Regs
+    assert isinstance(root.Top.nodes['Array[0]'], LazyDevice)
+
+    with root:
+        root.LoadConfig(str(cfg))
+        assert root.Top.Regs.Scratch.get() == 0x42
+
+def test_not_lazy():
+    root = _Root()
+    assert type(root.Top.nodes['Regs']) is _Regs
+    assert type(root.Top.nodes['Array[0]']) is _Regs